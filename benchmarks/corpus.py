@@ -0,0 +1,116 @@
+"""
+Synthetic inputs for the benchmark suite (benchmarks/suite.py).
+
+Every generator takes a size n and returns a JSON-compatible document
+whose node count grows linearly with n, so that stage times can be
+checked for near-linear scaling. Generators are deterministic: a given
+n always yields the same document.
+"""
+from __future__ import annotations
+
+import json
+import random
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+
+def wide(n: int) -> dict:
+    """One object with n keys: scalars, with a small object every 10th key."""
+    doc: Dict[str, Any] = {}
+    for i in range(n):
+        if i % 10 == 9:
+            doc[f"group{i}"] = {"id": i, "label": f"g{i}", "enabled": True}
+        else:
+            doc[f"field{i}"] = (i, f"s{i}", i * 0.5, i % 2 == 0, None)[i % 5]
+    return doc
+
+
+def deep(n: int) -> dict:
+    """Objects nested n levels deep, each with a few scalars and an array."""
+    value: dict = {"leaf": [[1.5]]}
+    for i in reversed(range(n)):
+        value = {"level": i, f"child{i}": value, "tags": ["a", "b"]}
+    return value
+
+
+def homogeneous_array(n: int) -> dict:
+    """One array of n records sharing the same shape."""
+    return {
+        "items": [
+            {
+                "id": i,
+                "name": f"item {i}",
+                "price": i * 1.25,
+                "active": i % 3 == 0,
+                "tags": ["x", "y"],
+                "owner": {"id": i % 50, "name": f"owner {i % 50}"},
+            }
+            for i in range(n)
+        ]
+    }
+
+
+_HETERO_KEYS = [f"k{i}" for i in range(40)]
+
+
+def _hetero_value(rng: random.Random, depth: int = 0) -> Any:
+    choice = rng.randrange(8 if depth < 2 else 6)
+    if choice == 0:
+        return rng.randrange(1000)
+    if choice == 1:
+        return rng.random()
+    if choice == 2:
+        return f"s{rng.randrange(1000)}"
+    if choice == 3:
+        return rng.random() < 0.5
+    if choice == 4:
+        return None
+    if choice == 5:
+        return [rng.randrange(10) for _ in range(rng.randrange(3))]
+    if choice == 6:
+        return {k: _hetero_value(rng, depth + 1) for k in rng.sample(_HETERO_KEYS[:8], 3)}
+    return [{k: _hetero_value(rng, depth + 1) for k in rng.sample(_HETERO_KEYS[:8], 2)}]
+
+
+def heterogeneous_array(n: int) -> dict:
+    """One array of n records with varying key sets and value types."""
+    rng = random.Random(n)
+    return {"records": [{k: _hetero_value(rng) for k in rng.sample(_HETERO_KEYS, 6)} for _ in range(n)]}
+
+
+_DIRTY_STEMS = ["user-id", "user id", "user_id", "User.ID", "éléphant", "1st", "if", "FIN", "Structure", "a/b", "c$d", "", " "]
+
+
+def dirty_keys(n: int) -> dict:
+    """n keys needing sanitizing: separators, accents, reserved words, collisions."""
+    doc: Dict[str, Any] = {}
+    for i in range(n):
+        cycle, stem = divmod(i, len(_DIRTY_STEMS))
+        # Bare stems first (reserved words), then suffixes that sanitize
+        # to colliding names
+        key = _DIRTY_STEMS[stem] + (f"{'-' * (cycle % 3)}{cycle // 3}" if cycle else "")
+        doc[key] = {"value": i} if i % 7 == 0 else i
+    return doc
+
+
+# name -> (generator, base size at --scale 1)
+DOCUMENTS: Dict[str, tuple[Callable[[int], Any], int]] = {
+    "wide": (wide, 4000),
+    # Below the C json encoder / decoder nesting limit, even at scale 4
+    "deep": (deep, 200),
+    "homogeneous": (homogeneous_array, 20000),
+    "heterogeneous": (heterogeneous_array, 4000),
+    "dirty_keys": (dirty_keys, 2000),
+}
+
+
+def many_files(directory: Path, n: int) -> List[Path]:
+    """Write n small documents of a few shapes into directory (batch mode input)."""
+    directory.mkdir(parents=True, exist_ok=True)
+    makers = (homogeneous_array, heterogeneous_array, wide, dirty_keys)
+    paths = []
+    for i in range(n):
+        path = directory / f"doc{i:05d}.json"
+        path.write_text(json.dumps(makers[i % len(makers)](20 + i % 10)), encoding="utf-8")
+        paths.append(path)
+    return paths
@@ -0,0 +1,90 @@
+"""
+Deep nesting benchmark: infer, merge, name and render synthetic documents
+nested well past the interpreter recursion limit.
+
+    python benchmarks/deep_nesting.py [--depths 100,1000,5000] [--repeat 3]
+
+Prints the best time per stage and the cost per schema node.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO / "src"))
+
+from json2windev.core.infer import infer_schema  # noqa: E402
+from json2windev.core.merge import merge  # noqa: E402
+from json2windev.rules.loader import load_rules  # noqa: E402
+from json2windev.renderers.markdown import MarkdownRenderer  # noqa: E402
+from json2windev.renderers.windev import WinDevRenderer  # noqa: E402
+
+
+def nested_objects(depth: int) -> dict:
+    value: dict = {"leaf": [[1.5]]}
+    for i in reversed(range(depth)):
+        value = {"level": i, f"child{i}": value, "tags": ["a", "b"]}
+    return value
+
+
+def nested_arrays(depth: int) -> list:
+    value: list = [{"x": 1}]
+    for _ in range(depth):
+        value = [value]
+    return value
+
+
+def count_nodes(node) -> int:
+    n, stack = 0, [node]
+    while stack:
+        node = stack.pop()
+        n += 1
+        stack.extend(node.fields.values())
+        if node.item is not None:
+            stack.append(node.item)
+    return n
+
+
+def best_of(repeat: int, fn):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t)
+    return best, result
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--depths", default="100,1000,3000")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    rules = load_rules(REPO / "config" / "windev_rules.yaml")
+    print(f"recursion limit: {sys.getrecursionlimit()}")
+    print(f"{'doc':<8}{'depth':>7}{'nodes':>8}  {'stage':<9}{'total s':>10}{'us/node':>10}")
+
+    for depth in (int(d) for d in args.depths.split(",")):
+        for label, make in (("objects", nested_objects), ("arrays", nested_arrays)):
+            doc = make(depth)
+            t_infer, schema = best_of(args.repeat, lambda: infer_schema(doc))
+            nodes = count_nodes(schema)
+            # A separately inferred copy: same shape, no shared nodes
+            other = infer_schema(doc)
+            t_merge, _ = best_of(args.repeat, lambda: merge(schema, other))
+            stages = [("infer", t_infer), ("merge", t_merge)]
+            if label == "objects":
+                # Renderers name structures in place: render a fresh schema each time
+                t_wd, _ = best_of(args.repeat, lambda: WinDevRenderer(rules).render(infer_schema(doc)))
+                t_md, _ = best_of(args.repeat, lambda: MarkdownRenderer(rules).render(infer_schema(doc)))
+                stages += [("windev", t_wd - t_infer), ("markdown", t_md - t_infer)]
+            for stage, t in stages:
+                print(f"{label:<8}{depth:>7}{nodes:>8}  {stage:<9}{t:>10.4f}{t / nodes * 1e6:>10.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
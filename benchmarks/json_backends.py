@@ -0,0 +1,54 @@
+"""
+JSON backend benchmark: parse_json with each installed decoder on the
+synthetic corpora of benchmarks/corpus.py.
+
+    python benchmarks/json_backends.py [--scale 1] [--repeat 3]
+
+"json.loads" is the bare stdlib call, for reference: parse_json also
+pauses the cyclic garbage collector while decoding.
+"""
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import sys
+import time
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO / "src"))
+
+from corpus import DOCUMENTS  # noqa: E402
+from json2windev.core.input import parse_json  # noqa: E402
+
+
+def best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--scale", type=float, default=1.0, help="Multiply every corpus size")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    backends = ["stdlib"] + [name for name in ("msgspec",) if importlib.util.find_spec(name)]
+    print(f"{'corpus':<15}{'MB':>7}{'json.loads':>12}" + "".join(f"{name:>10}" for name in backends))
+    for name, (generate, base) in DOCUMENTS.items():
+        # 4x the suite's base size: large enough to time the decoder, not the call
+        text = json.dumps(generate(max(1, round(base * 4 * args.scale))))
+        row = [best_of(args.repeat, lambda: json.loads(text))]
+        row += [best_of(args.repeat, lambda: parse_json(text, backend=backend)) for backend in backends]
+        print(f"{name:<15}{len(text) / 1e6:>7.1f}" + "".join(f"{t * 1000:>10.1f}" for t in row[:1]) + "  " + "".join(f"{t * 1000:>10.1f}" for t in row[1:]))
+    print("(ms, best of --repeat)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,110 @@
+"""
+CLI start-up benchmark: one process per run, as in scripts/dev_run_cli.sh.
+
+    python benchmarks/startup.py [--repeat 10] [--budget-ms 40]
+
+For each mode, prints the best wall-clock time of a full CLI run and the
+import time of json2windev's own modules (python -X importtime). Exits
+with 1 when importing the CLI exceeds --budget-ms, or when --pretty /
+--validate-only import PyYAML or a renderer.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+REPO = Path(__file__).resolve().parents[1]
+
+# Modules the in-memory --pretty / --validate-only paths must not import
+FORBIDDEN = ("yaml", "json2windev.renderers", "json2windev.rules")
+
+
+def importtime(args: List[str], env: Dict[str, str]) -> Dict[str, Tuple[int, bool]]:
+    """
+    Modules imported by a python -X importtime run:
+    name -> (cumulative import time in microseconds, imported at top level).
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+        cwd=REPO,
+        env=env,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"{' '.join(args)} failed:\n{proc.stderr}")
+    modules: Dict[str, Tuple[int, bool]] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if cumulative.strip().isdigit():  # skips the header line
+            # Nested imports are indented (and counted in their importer)
+            modules[name.strip()] = (int(cumulative), not name[1:].startswith(" "))
+    return modules
+
+
+def best_run(args: List[str], env: Dict[str, str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        subprocess.run([sys.executable, *args], capture_output=True, cwd=REPO, env=env, check=True)
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--repeat", type=int, default=10)
+    ap.add_argument("--budget-ms", type=float, default=40.0, help="Max import time of json2windev.app.cli")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        doc = Path(tmp) / "doc.json"
+        doc.write_text('{"id": 1, "name": "a", "tags": ["x"], "owner": {"id": 2}}', encoding="utf-8")
+        env = {
+            **os.environ,
+            "PYTHONPATH": str(REPO / "src"),
+            "JSON2WINDEV_CACHE_DIR": str(Path(tmp) / "cache"),
+        }
+        cli = ["-m", "json2windev", str(doc)]
+        modes: List[Tuple[str, List[str]]] = [
+            ("import", ["-c", "import json2windev.app.cli"]),
+            ("validate", [*cli, "--validate-only"]),
+            ("pretty", [*cli, "--pretty"]),
+            ("windev", cli),
+            ("markdown", [*cli, "--format", "markdown"]),
+        ]
+        # Warm the rules cache (and the bytecode caches)
+        best_run(cli, env, 1)
+        baseline = best_run(["-c", "pass"], env, args.repeat)
+
+        failures: List[str] = []
+        print(f"interpreter start-up: {baseline * 1000:.1f} ms")
+        print(f"{'mode':<10}{'run ms':>9}{'pkg import ms':>15}")
+        for label, mode_args in modes:
+            modules = importtime(mode_args, env)
+            own = sum(us for name, (us, top) in modules.items() if top and name.startswith("json2windev")) / 1000
+            wall = best_run(mode_args, env, args.repeat)
+            print(f"{label:<10}{wall * 1000:>9.1f}{own:>15.1f}")
+
+            if label == "import" and own > args.budget_ms:
+                failures.append(f"importing the CLI takes {own:.1f} ms (budget {args.budget_ms:.1f} ms)")
+            if label in ("validate", "pretty"):
+                bad = sorted(name for name in modules if name.startswith(FORBIDDEN))
+                if bad:
+                    failures.append(f"--{label} imports {', '.join(bad)}")
+
+    for failure in failures:
+        print(f"REGRESSION: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
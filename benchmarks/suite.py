@@ -0,0 +1,261 @@
+"""
+Benchmark suite: per-stage timings and peak memory on synthetic corpora
+(benchmarks/corpus.py), scaling checks and regression gates.
+
+    python benchmarks/suite.py run [--out results.json] [--scale 1] [--repeat 3]
+                                   [--corpus wide,deep,...] [--no-memory]
+                                   [--baseline baseline.json] [--threshold 0.2]
+    python benchmarks/suite.py compare baseline.json results.json [--threshold 0.2]
+
+Each document corpus is generated at 1x, 2x and 4x its base size; stages
+(parse, infer, compact, names, windev, markdown) are timed separately, best of
+--repeat. The batch corpus runs the CLI end to end on a directory of small
+files. A stage whose time grows faster than size**--max-exponent between the
+smallest and largest size is reported as superlinear. The compact stage
+is parse + infer in one pass (core.compact), to compare against the sum of
+the two and against the parse stage's memory peak.
+
+`run` exits with 1 on superlinear stages, or on regressions when
+--baseline is given; `compare` exits with 1 on regressions: a stage
+slower (or a memory peak larger) than the baseline by more than
+--threshold.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO / "src"))
+
+from corpus import DOCUMENTS, many_files  # noqa: E402
+from json2windev import __version__  # noqa: E402
+from json2windev.core.compact import infer_compact  # noqa: E402
+from json2windev.core.infer import infer_schema  # noqa: E402
+from json2windev.core.input import parse_json  # noqa: E402
+from json2windev.core.type_naming import assign_type_names, clear_type_names  # noqa: E402
+from json2windev.renderers.markdown import MarkdownRenderer  # noqa: E402
+from json2windev.renderers.windev import WinDevRenderer  # noqa: E402
+from json2windev.rules.loader import load_rules  # noqa: E402
+
+SCALES = (1, 2, 4)
+BATCH_FILES = 100
+# Times below this are too noisy to gate on (scaling and regressions)
+MIN_SECONDS = 0.005
+
+
+def best_of(repeat: int, fn: Callable[[], Any]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def peak_kib(fn: Callable[[], Any]) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] // 1024
+    finally:
+        tracemalloc.stop()
+
+
+def document_stages(doc: Any, rules) -> Dict[str, Callable[[], Any]]:
+    text = json.dumps(doc)
+    data = parse_json(text)
+    schema = infer_schema(data)
+
+    def names() -> None:
+        clear_type_names(schema)
+        assign_type_names(schema, rules)
+
+    # Renderers name the schema themselves: their time includes naming
+    return {
+        "parse": lambda: parse_json(text),
+        "infer": lambda: infer_schema(data),
+        "compact": lambda: infer_compact(text),
+        "names": names,
+        "windev": lambda: WinDevRenderer(rules).render(schema),
+        "markdown": lambda: MarkdownRenderer(rules).render(schema),
+    }
+
+
+def batch_stages(directory: Path, out_dir: Path) -> Dict[str, Callable[[], Any]]:
+    from json2windev.app.cli import main
+
+    def run() -> None:
+        argv = [str(directory), "--output-dir", str(out_dir), "--format", "windev", "--format", "markdown", "--no-cache", "--jobs", "1"]
+        with contextlib.redirect_stdout(io.StringIO()):
+            main(argv)
+
+    return {"end_to_end": run}
+
+
+def exponent(sizes: List[int], seconds: List[float]) -> Optional[float]:
+    """Growth exponent between the smallest and largest size (1.0 = linear)."""
+    if seconds[-1] < MIN_SECONDS or seconds[0] <= 0:
+        return None
+    return math.log(seconds[-1] / seconds[0]) / math.log(sizes[-1] / sizes[0])
+
+
+def run_corpus(
+    make_stages: Callable[[int], Dict[str, Callable[[], Any]]],
+    sizes: List[int],
+    repeat: int,
+    memory: bool,
+) -> Dict[str, Any]:
+    stages: Dict[str, Dict[str, Any]] = {}
+    for i, size in enumerate(sizes):
+        for stage, fn in make_stages(size).items():
+            entry = stages.setdefault(stage, {"seconds": []})
+            entry["seconds"].append(best_of(repeat, fn))
+            if memory and i == len(sizes) - 1:
+                entry["peak_kib"] = peak_kib(fn)
+    for entry in stages.values():
+        entry["exponent"] = exponent(sizes, entry["seconds"])
+    return {"sizes": sizes, "stages": stages}
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    rules = load_rules(REPO / "config" / "windev_rules.yaml")
+    selected = args.corpus.split(",") if args.corpus else [*DOCUMENTS, "batch"]
+    results: Dict[str, Any] = {}
+
+    for name in selected:
+        if name == "batch":
+            continue
+        generate, base = DOCUMENTS[name]
+        sizes = [max(1, round(base * args.scale * s)) for s in SCALES]
+        print(f"{name}: sizes {sizes}", file=sys.stderr)
+        results[name] = run_corpus(lambda n: document_stages(generate(n), rules), sizes, args.repeat, args.memory)
+
+    if "batch" in selected:
+        with tempfile.TemporaryDirectory() as tmp:
+            os.environ["JSON2WINDEV_CACHE_DIR"] = str(Path(tmp) / "cache")
+
+            def make(n: int) -> Dict[str, Callable[[], Any]]:
+                directory = Path(tmp) / f"in{n}"
+                many_files(directory, n)
+                return batch_stages(directory, Path(tmp) / f"out{n}")
+
+            sizes = [max(1, round(BATCH_FILES * args.scale * s)) for s in SCALES]
+            print(f"batch: files {sizes}", file=sys.stderr)
+            results["batch"] = run_corpus(make, sizes, args.repeat, args.memory)
+
+    return {
+        "meta": {
+            "version": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scale": args.scale,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+
+def print_results(report: Dict[str, Any]) -> None:
+    print(f"{'corpus':<15}{'stage':<12}{'ms per size':>28}{'exp':>7}{'peak KiB':>11}")
+    for name, corpus in report["results"].items():
+        for stage, entry in corpus["stages"].items():
+            ms = " ".join(f"{s * 1000:8.1f}" for s in entry["seconds"])
+            exp = "-" if entry["exponent"] is None else f"{entry['exponent']:.2f}"
+            print(f"{name:<15}{stage:<12}{ms:>28}{exp:>7}{entry.get('peak_kib', '-'):>11}")
+
+
+def superlinear(report: Dict[str, Any], max_exponent: float) -> List[str]:
+    return [
+        f"{name}/{stage} grows as size^{entry['exponent']:.2f} (max {max_exponent:.2f})"
+        for name, corpus in report["results"].items()
+        for stage, entry in corpus["stages"].items()
+        if entry["exponent"] is not None and entry["exponent"] > max_exponent
+    ]
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Regressions of current against baseline: stages slower (at any size both
+    runs measured) or with a larger memory peak by more than threshold.
+    """
+    regressions: List[str] = []
+    for name, corpus in current["results"].items():
+        base_corpus = baseline["results"].get(name)
+        if base_corpus is None:
+            continue
+        base_sizes = base_corpus["sizes"]
+        for stage, entry in corpus["stages"].items():
+            base = base_corpus["stages"].get(stage)
+            if base is None:
+                continue
+            pairs: List[Tuple[int, float, float]] = [
+                (size, base["seconds"][base_sizes.index(size)], seconds)
+                for size, seconds in zip(corpus["sizes"], entry["seconds"])
+                if size in base_sizes
+            ]
+            for size, before, after in pairs:
+                if after >= MIN_SECONDS and after > before * (1 + threshold):
+                    regressions.append(f"{name}/{stage} n={size}: {before * 1000:.1f} -> {after * 1000:.1f} ms")
+            before_kib, after_kib = base.get("peak_kib"), entry.get("peak_kib")
+            if before_kib and after_kib and after_kib > before_kib * (1 + threshold):
+                regressions.append(f"{name}/{stage} peak memory: {before_kib} -> {after_kib} KiB")
+    return regressions
+
+
+def report_failures(failures: List[str], label: str) -> int:
+    for failure in failures:
+        print(f"{label}: {failure}")
+    return 1 if failures else 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    r = sub.add_parser("run", help="Run the suite")
+    r.add_argument("--out", default=None, help="Write the results (JSON) to this file")
+    r.add_argument("--scale", type=float, default=1.0, help="Multiply every corpus size")
+    r.add_argument("--repeat", type=int, default=3)
+    r.add_argument("--corpus", default=None, help=f"Comma-separated subset of: {', '.join([*DOCUMENTS, 'batch'])}")
+    r.add_argument("--no-memory", dest="memory", action="store_false", help="Skip the peak memory runs")
+    r.add_argument("--max-exponent", type=float, default=1.3, help="Max growth exponent before a stage is superlinear")
+    r.add_argument("--baseline", default=None, help="Results file to compare against")
+    r.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown ratio over the baseline")
+
+    c = sub.add_parser("compare", help="Compare two results files")
+    c.add_argument("baseline")
+    c.add_argument("current")
+    c.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown ratio over the baseline")
+
+    args = ap.parse_args()
+
+    if args.command == "compare":
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        current = json.loads(Path(args.current).read_text(encoding="utf-8"))
+        return report_failures(compare(baseline, current, args.threshold), "REGRESSION")
+
+    report = run(args)
+    print_results(report)
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    status = report_failures(superlinear(report, args.max_exponent), "SUPERLINEAR")
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        status |= report_failures(compare(baseline, report, args.threshold), "REGRESSION")
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,10 +1,13 @@
-from json2windev.core.input import parse_json
-from json2windev.core.infer import infer_schema
-from json2windev.renderers.windev import WinDevRenderer
-from json2windev.rules.loader import load_rules
+__version__ = "0.1.0"
 
 
 def generate_windev_from_json(json_text: str, rules_path: str = "config/windev_rules.yaml") -> str:
+    # Imported here: `import json2windev` (and so the CLI) stays cheap
+    from json2windev.core.input import parse_json
+    from json2windev.core.infer import infer_schema
+    from json2windev.renderers.windev import WinDevRenderer
+    from json2windev.rules.loader import load_rules
+
     rules = load_rules(rules_path)
     data = parse_json(json_text)
     schema = infer_schema(data)
@@ -1,59 +1,617 @@
 from __future__ import annotations
 
 import argparse
+import os
 import sys
+import time
+from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Tuple
 
-from json2windev.rules.loader import load_rules
-from json2windev.renderers.windev import WinDevRenderer
-from json2windev.core.infer import infer_schema
-from json2windev.core.input import parse_json, pretty_json, JsonParseError
+from json2windev import __version__
+from json2windev.core.input import input_size, parse_json, pretty_json, read_input, JsonParseError
 
+# Everything else is imported by the code paths that need it: one file per
+# process is the common use, so start-up time matters (see
+# benchmarks/startup.py). --pretty and --validate-only never load the rules
+# (PyYAML) nor a renderer.
+if TYPE_CHECKING:
+    from json2windev.core.infer import InferStats, SamplingOptions
+    from json2windev.core.schema import SchemaNode
+    from json2windev.core.type_naming import NameMap
+    from json2windev.renderers.ir import RenderIR
+    from json2windev.renderers.name_map import NameMapState
+    from json2windev.rules.loader import Rules
+    from json2windev.utils.cache import RenderCache
+    from json2windev.utils.metrics import Metrics
 
-def _read_input(path: str) -> str:
-    if path != "-":
-        return Path(path).read_text(encoding="utf-8")
-    return sys.stdin.read()
+# Same values as core.infer.SAMPLING_MODES (not imported for --help)
+_SAMPLING_MODES = ("off", "first", "reservoir", "spread")
 
+# Same values as core.backends.JSON_BACKENDS
+_JSON_BACKENDS = ("auto", "stdlib", "msgspec")
 
-def _write_output(path: str, content: str) -> None:
+# Same value as core.stream.AUTO_STREAM_THRESHOLD
+_AUTO_STREAM_THRESHOLD = 64 * 1024 * 1024
+
+# Characters encoded at a time when counting the bytes of a piped input
+_COUNT_SLICE = 1024 * 1024
+
+FORMATS = ("windev", "markdown")
+DEFAULT_RULES = "config/windev_rules.yaml"
+
+
+def _write_output(path: str, content: str, metrics: Optional[Metrics] = None) -> None:
+    _write_chunks(path, (content,), metrics)
+
+
+def _write_chunks(path: str, chunks: Iterable[str], metrics: Optional[Metrics] = None) -> None:
+    """
+    Write chunks as they come (renderers produce one structure at a time).
+    With metrics, time spent writing goes to the "write" stage.
+    """
     if path == "-":
-        sys.stdout.write(content)
-    else:
-        Path(path).write_text(content, encoding="utf-8")
+        _write_all(sys.stdout.write, chunks, metrics)
+        return
+    with open(path, "w", encoding="utf-8") as fp:
+        _write_all(fp.write, chunks, metrics)
+
+
+def _write_all(write, chunks: Iterable[str], metrics: Optional[Metrics]) -> None:
+    if metrics is None:
+        for chunk in chunks:
+            write(chunk)
+        return
+    spent = 0.0
+    written = 0
+    for chunk in chunks:
+        written += len(chunk.encode("utf-8"))
+        t = time.perf_counter()
+        write(chunk)
+        spent += time.perf_counter() - t
+    metrics.add("write", spent)
+    metrics.count("bytes_written", written)
+    metrics.count("outputs")
 
 
 def _default_ext(fmt: str) -> str:
     return ".md" if fmt == "markdown" else ".txt"
 
 
+def _should_stream(path: str, stream: bool) -> bool:
+    if stream:
+        return True
+    # Stdin is streamed automatically only when redirected from a large file
+    size = input_size(path)
+    return size is not None and size >= _AUTO_STREAM_THRESHOLD
+
+
+def _infer_jsonl(path: str, args: argparse.Namespace, sampling, stats, metrics: Optional[Metrics] = None) -> SchemaNode:
+    from json2windev.core.jsonl import infer_jsonl
+
+    def report(err: JsonParseError) -> None:
+        print(f"[SKIP] line {err.lineno}: {err.message}", file=sys.stderr)
+
+    if path == "-":
+        schema, jstats = infer_jsonl(sys.stdin.buffer, args.skip_bad_lines, report, sampling, stats, args.json_backend)
+    else:
+        with open(path, "rb") as fp:
+            schema, jstats = infer_jsonl(fp, args.skip_bad_lines, report, sampling, stats, args.json_backend)
+    print(jstats.summary(), file=sys.stderr)
+    if metrics is not None:
+        metrics.count("bytes_read", jstats.bytes_read)
+        metrics.count("records", jstats.records)
+    return schema
+
+
+def _infer_input(
+    path: str,
+    args: argparse.Namespace,
+    sampling: Optional[SamplingOptions] = None,
+    stats: Optional[InferStats] = None,
+    metrics: Optional[Metrics] = None,
+) -> SchemaNode:
+    """
+    Infer the schema of an input file (or stdin), streaming large inputs
+    instead of materializing the whole document.
+    Sampling only applies to in-memory inference: the streaming engine
+    still has to tokenize every element, so it always merges them all.
+    With --compact, inputs stay in memory whatever their size (unless
+    --stream) but are decoded straight into shapes (see core.compact);
+    stats are left untouched.
+
+    With metrics, in-memory inputs are timed as the read, parse and infer
+    stages; JSON Lines and streamed inputs interleave the three, timed as
+    one infer stage, like compact decoding.
+    """
+    if args.jsonl:
+        schema = _infer_jsonl(path, args, sampling, stats, metrics)
+        note = "jsonl"
+    elif not args.stream and (args.compact or not _should_stream(path, False)):
+        from json2windev.core.compact import infer_compact
+        from json2windev.core.infer import infer_schema
+
+        if metrics is not None:
+            # Modules are imported on first use: keep that out of the stages
+            metrics.lap("imports")
+        text = read_input(path)
+        if metrics is not None:
+            metrics.lap("read")
+            size = input_size(path)
+            if size is None:
+                # Pipe: count the UTF-8 bytes a slice at a time, never a
+                # second copy of the whole input
+                size = sum(len(text[i:i + _COUNT_SLICE].encode("utf-8")) for i in range(0, len(text), _COUNT_SLICE))
+            metrics.count("bytes_read", size)
+        if args.compact:
+            # No inference counters (see core.compact)
+            return _count_inference(infer_compact(text, sampling), None, metrics, "compact")
+        # One-shot, single-threaded run: the GC can be paused while decoding
+        data = parse_json(text, backend=args.json_backend, pause_gc=True)
+        if metrics is not None:
+            metrics.lap("parse")
+        return _count_inference(infer_schema(data, sampling, stats), stats, metrics)
+    else:
+        from json2windev.core.stream import infer_schema_stream
+
+        note = "streamed"
+        if path == "-":
+            schema = infer_schema_stream(sys.stdin)
+        else:
+            with open(path, encoding="utf-8") as fp:
+                schema = infer_schema_stream(fp)
+            if metrics is not None:
+                metrics.count("bytes_read", os.path.getsize(path))
+    return _count_inference(schema, stats, metrics, note)
+
+
+def _rules_key(rules: Rules) -> str:
+    import hashlib
+    import json
+
+    raw = json.dumps(rules.raw, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+
+def _infer_with_snapshot(
+    args: argparse.Namespace,
+    rules: Optional[Rules],
+    sampling: Optional[SamplingOptions],
+    stats: Optional[InferStats],
+    metrics: Optional[Metrics],
+) -> SchemaNode:
+    """
+    Schema of the input, merged into the --load-schema snapshot when given
+    (only the new input is read and inferred). Without an input, the
+    snapshot itself, keeping its type names if rules named it.
+    """
+    if not args.load_schema:
+        return _infer_input(args.input, args, sampling, stats, metrics)
+
+    from json2windev.core.snapshot import load_schema, merge_samples
+
+    snapshot = load_schema(args.load_schema)
+    if metrics is not None:
+        metrics.lap("load_schema")
+    if args.input is None:
+        if rules is not None and snapshot.rules_key != _rules_key(rules):
+            from json2windev.core.type_naming import clear_type_names
+
+            clear_type_names(snapshot.root)
+        return snapshot.root
+    schema = merge_samples(snapshot.root, _infer_input(args.input, args, sampling, stats, metrics))
+    if metrics is not None:
+        metrics.lap("merge")
+    return schema
+
+
+def _save_snapshot(
+    schema: SchemaNode,
+    path: str,
+    rules: Optional[Rules],
+    metrics: Optional[Metrics],
+    name_map: Optional[NameMap] = None,
+) -> None:
+    """
+    Save schema for --save-schema, named with rules (the names the first
+    rules set renders with, kept stable with the --name-map name_map)
+    when there are rules to name it with.
+    """
+    from json2windev.core.snapshot import save_schema
+
+    rules_key = None
+    if rules is not None and schema.kind == "object":
+        from json2windev.core.type_naming import assign_type_names
+
+        assign_type_names(schema, rules, name_map)
+        rules_key = _rules_key(rules)
+    save_schema(schema, path, rules_key)
+    if metrics is not None:
+        metrics.lap("save_schema")
+
+
+def _save_name_map(state: NameMapState, names: NameMap, ir: RenderIR, path: str, metrics: Optional[Metrics]) -> None:
+    """
+    Update the --name-map file with this run and report the changes on
+    stderr.
+    """
+    from json2windev.renderers.name_map import save_name_map, update_state
+
+    changes = update_state(state, names, ir)
+    save_name_map(state, path)
+    print(changes.summary(), file=sys.stderr)
+    if metrics is not None:
+        metrics.lap("save_name_map")
+
+
+def _count_inference(
+    schema: SchemaNode,
+    stats: Optional[InferStats],
+    metrics: Optional[Metrics],
+    note: str = "",
+) -> SchemaNode:
+    if metrics is not None:
+        from json2windev.core.schema import schema_footprint
+
+        metrics.count("nodes", schema_footprint(schema).unique_nodes)
+        if stats is not None:
+            metrics.count("elements_merged", stats.elements_merged)
+            metrics.count("elements_absorbed", stats.elements_absorbed)
+            metrics.count("elements_saturated", stats.elements_saturated)
+        metrics.lap("infer", note)
+    return schema
+
+
 def _render_one(json_text: str, rules, fmt: str) -> str:
+    from json2windev.app.render import render_schema
+    from json2windev.core.infer import infer_schema
     data = parse_json(json_text)
     schema = infer_schema(data)
+    return render_schema(schema, rules, fmt)
+
+
+@dataclass(frozen=True)
+class _Output:
+    """
+    One output of a run: a rules set rendered in one format.
+    """
+    rules: Rules
+    fmt: str
+    # Rules profile inserted before the extension when several rules sets are used
+    tag: str = ""
+
+    def path_for(self, base: Path) -> Path:
+        ext = _default_ext(self.fmt)
+        return base.with_suffix(f".{self.tag}{ext}" if self.tag else ext)
+
+
+def _iter_outputs(
+    schema: SchemaNode,
+    outputs: List[_Output],
+    metrics: Optional[Metrics] = None,
+    name_map: Optional[NameMap] = None,
+    irs: Optional[List[RenderIR]] = None,
+) -> Iterator[Tuple[_Output, Iterator[str]]]:
+    """
+    (output, rendered chunks) for every output. Names are resolved once per
+    rules set and shared by its formats; outputs of one rules set must be
+    adjacent. Each output's chunks must be consumed before the next one.
+    name_map (--name-map) is for a single rules set; irs, when given,
+    collects the render IR of each rules set.
+    """
+    from json2windev.app.render import renderer
+    from json2windev.core.type_naming import clear_type_names
+    from json2windev.renderers.ir import build_ir
+
+    if metrics is not None:
+        metrics.lap("imports")
+    ir = None
+    for i, out in enumerate(outputs):
+        if i == 0 or out.rules is not outputs[i - 1].rules:
+            if ir is not None:
+                # Names depend on the rules (type prefix, result name)
+                clear_type_names(schema)
+            ir = build_ir(schema, out.rules, metrics, name_map)
+            if irs is not None:
+                irs.append(ir)
+        yield out, renderer(out.rules, out.fmt).iter_chunks(ir)
+
+
+def _render_outputs(schema: SchemaNode, outputs: List[_Output], metrics: Optional[Metrics] = None) -> List[str]:
+    return ["".join(chunks) for _, chunks in _iter_outputs(schema, outputs, metrics)]
+
+
+def _positive_int(value: str) -> int:
+    n = int(value)
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {n}")
+    return n
+
+
+def _parse_formats(values: Optional[List[str]]) -> List[str]:
+    """
+    --format values (repeatable, or comma separated), in order, without
+    duplicates.
+    """
+    formats: List[str] = []
+    for value in values or ["windev"]:
+        for fmt in value.split(","):
+            fmt = fmt.strip()
+            if fmt not in FORMATS:
+                raise ValueError(f"Unsupported format: {fmt} (choose from {', '.join(FORMATS)})")
+            if fmt not in formats:
+                formats.append(fmt)
+    return formats
+
+
+def _rules_tags(paths: List[str]) -> List[str]:
+    # File stems tell rules profiles apart in output names (numbered on clashes)
+    if len(paths) == 1:
+        return [""]
+    tags: List[str] = []
+    for path in paths:
+        stem = Path(path).stem
+        tag, n = stem, 2
+        while tag in tags:
+            tag, n = f"{stem}{n}", n + 1
+        tags.append(tag)
+    return tags
+
+
+def _can_forward(args: argparse.Namespace, batch: bool) -> bool:
+    # Only plain single-file renders go to the daemon (it renders in memory
+    # with the rules' own sampling settings)
+    if batch or args.no_server or args.input in ("-", None):
+        return False
+    if args.load_schema or args.save_schema or args.name_map:
+        return False
+    if len(args.format) > 1 or len(args.rules) > 1:
+        return False
+    if args.print_rules or args.pretty or args.validate_only or args.infer_stats:
+        return False
+    if args.jsonl or args.stream or args.compact or args.sample or args.sample_size is not None or args.sample_escalate:
+        return False
+    return not _should_stream(args.input, False)
+
+
+def _forward_render(args: argparse.Namespace, cache_dir: Path) -> Optional[str]:
+    """
+    Rendered output from a running `json2windev serve` daemon, or None when
+    there is none.
+    """
+    from json2windev.app.client import find_daemon, render
+
+    daemon = find_daemon(cache_dir)
+    if daemon is None:
+        return None
+    params = {"format": args.format[0], "rules": str(Path(args.rules[0]).resolve())}
+    if args.no_prefixes:
+        params["no_prefixes"] = "1"
+    if args.no_serialize:
+        params["no_serialize"] = "1"
+    return render(daemon, Path(args.input).read_bytes(), params)
+
+
+def _load_effective_rules(args: argparse.Namespace, path: str, cache_dir: Optional[Path] = None):
+    """
+    Load the rules file at path (through the rules cache when cache_dir is
+    given) and apply runtime overrides. Returns (rules, served from cache).
+    """
+    from json2windev.app.render import with_naming_overrides
+    from json2windev.rules.loader import load_rules, load_rules_cached
+
+    if cache_dir is None:
+        rules, cached = load_rules(path), False
+    else:
+        rules, cached = load_rules_cached(path, cache_dir)
+
+    # Small runtime overrides without touching YAML
+    return with_naming_overrides(rules, args.no_prefixes, args.no_serialize), cached
+
+
+@dataclass(frozen=True)
+class _BatchJob:
+    input_path: Path
+    out_dir: Path
+    args: argparse.Namespace
+    outputs: List[_Output]
+    sampling: Optional[SamplingOptions] = None
+    cache: Optional[RenderCache] = None
+    # One per output
+    cache_contexts: Tuple[bytes, ...] = ()
+    # Measure each file (--timings / --metrics-json)
+    metrics: bool = False
+
+
+def _cache_context(out: _Output, args: argparse.Namespace, sampling: Optional[SamplingOptions]) -> bytes:
+    import json
+
+    from json2windev.utils.cache import code_version
+
+    # Everything besides the input bytes that changes the rendered output
+    return json.dumps(
+        {
+            "version": code_version(),
+            "format": out.fmt,
+            "rules": out.rules.raw,
+            "jsonl": args.jsonl,
+            "skip_bad_lines": args.skip_bad_lines,
+            "sampling": repr(sampling),
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    ).encode("utf-8")
+
+
+def _write_if_changed(target: Path, content: str) -> None:
+    if not (target.exists() and target.read_text(encoding="utf-8") == content):
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(content, encoding="utf-8")
+
+
+def _process_batch_file(f: Path, job: _BatchJob) -> Tuple[Path, bool, Optional[dict]]:
+    """
+    Render every output of one batch file, inferring it at most once.
+    Returns (relative input path, all outputs served from cache, the file's
+    metrics when job.metrics).
+    """
+    rel = f.relative_to(job.input_path)
+    base = job.out_dir / rel
+    metrics = None
+    if job.metrics:
+        from json2windev.utils.metrics import Metrics
+
+        metrics = Metrics()
+
+    keys: List[Optional[str]] = [None] * len(job.outputs)
+    missing = list(range(len(job.outputs)))
+    if job.cache is not None:
+        keys = job.cache.keys(f, job.cache_contexts)
+        missing = []
+        for i, (out, key) in enumerate(zip(job.outputs, keys)):
+            cached = job.cache.get(key)
+            if cached is None:
+                missing.append(i)
+            else:
+                _write_if_changed(out.path_for(base), cached)
+        if metrics is not None:
+            metrics.lap("cache")
+            metrics.count("cache_hits", len(job.outputs) - len(missing))
+        if not missing:
+            return rel, True, metrics.to_dict() if metrics is not None else None
+
+    stats = None
+    if metrics is not None:
+        from json2windev.core.infer import InferStats
+
+        stats = InferStats()
+    schema = _infer_input(str(f), job.args, job.sampling, stats, metrics)
+    rendered = _render_outputs(schema, [job.outputs[i] for i in missing], metrics)
+    if metrics is not None:
+        metrics.lap("render")
+
+    for i, content in zip(missing, rendered):
+        target = job.outputs[i].path_for(base)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(content, encoding="utf-8")
+        if metrics is not None:
+            metrics.count("bytes_written", len(content.encode("utf-8")))
+            metrics.count("outputs")
+        if keys[i] is not None:
+            job.cache.put(keys[i], content)
+    if metrics is not None:
+        metrics.lap("write")
+        return rel, False, metrics.to_dict()
+    return rel, False, None
+
+
+# Per-process state of batch workers (set once by _init_batch_worker)
+_worker_state: Optional[tuple] = None
+
+
+def _init_batch_worker(job: _BatchJob) -> None:
+    global _worker_state
+    _worker_state = job
+
+
+def _batch_worker(f: Path) -> Tuple[Optional[Path], bool, Optional[dict], Optional[str]]:
+    job = _worker_state
+    try:
+        return (*_process_batch_file(f, job), None)
+    except Exception as e:
+        return None, False, None, str(e)
+
+
+def _iter_batch_results(
+    json_files: List[Path], job: _BatchJob
+) -> Iterator[Tuple[Optional[Path], bool, Optional[dict], Optional[str]]]:
+    """
+    Yield (relative input path, cached, metrics, error) per input file, in
+    input order, whatever the number of jobs.
+    """
+    jobs = job.args.jobs or os.cpu_count() or 1
+    if jobs <= 1 or len(json_files) <= 1:
+        for f in json_files:
+            try:
+                yield (*_process_batch_file(f, job), None)
+            except Exception as e:
+                yield None, False, None, str(e)
+        return
 
-    if fmt == "windev":
-        renderer = WinDevRenderer(rules)
-        return renderer.render(schema)
-
-    if fmt == "markdown":
-        from json2windev.renderers.markdown import MarkdownRenderer
-        renderer = MarkdownRenderer(rules)
-        return renderer.render(schema)
-
-    raise ValueError(f"Unsupported format: {fmt}")
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Workers receive the loaded rules once, in their initializer; tasks only
+    # carry a path. Compile first so the tables are pickled along.
+    for out in job.outputs:
+        _ = out.rules.compiled
+    chunksize = max(1, min(64, len(json_files) // (jobs * 4)))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_batch_worker, initargs=(job,)) as ex:
+        try:
+            yield from ex.map(_batch_worker, json_files, chunksize=chunksize)
+        finally:
+            # Stop queued work when the caller bails out (fail fast)
+            ex.shutdown(wait=True, cancel_futures=True)
+
+
+def _report_metrics(args: argparse.Namespace, metrics: Metrics, file_metrics: dict) -> None:
+    """
+    --timings summary on stderr and --metrics-json file. In batch mode, each
+    file's metrics are reported along with their sum over all files.
+    """
+    from json2windev.utils.metrics import Metrics, summarize
+
+    report = {"version": __version__, **metrics.to_dict()}
+    if file_metrics:
+        summed = Metrics()
+        for measured in file_metrics.values():
+            summed.merge(measured)
+        report["files"] = file_metrics
+        report["files_total"] = {"stages_ms": summed.to_dict()["stages_ms"], "counters": summed.counters}
+
+    if args.timings:
+        for rel, measured in file_metrics.items():
+            print(summarize(measured, f"Timings {rel}"), file=sys.stderr)
+        if file_metrics:
+            print(summarize(report["files_total"], f"Timings all {len(file_metrics)} files"), file=sys.stderr)
+        print(summarize(report), file=sys.stderr)
+    if args.metrics_json:
+        import json
+
+        Path(args.metrics_json).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
 
 
 def main(argv: list[str] | None = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["serve"]:
+        from json2windev.app.server import serve_main
+        serve_main(argv[1:])
+        return
+
     p = argparse.ArgumentParser(
         prog="json2windev",
         description="Generate WinDev structures from JSON (prefixes + <serialize> supported).",
     )
 
-    p.add_argument("input", nargs="?", default="-", help="Input JSON file path, or '-' for stdin")
-    p.add_argument("--rules", default="config/windev_rules.yaml", help="Path to windev rules YAML")
-    p.add_argument("-o", "--output", default="-", help="Output file path, or '-' for stdout")
+    p.add_argument("input", nargs="?", default=None, help="Input JSON file path, or '-' for stdin (default)")
+    p.add_argument(
+        "--rules",
+        action="append",
+        default=None,
+        help=f"Path to windev rules YAML (default: {DEFAULT_RULES}); repeat to render with several rules sets",
+    )
+    p.add_argument(
+        "-o",
+        "--output",
+        default="-",
+        help="Output file path, or '-' for stdout; with several outputs, the base name they are derived from",
+    )
 
-    p.add_argument("--format", default="windev", choices=["windev", "markdown"], help="Output format")
+    p.add_argument(
+        "--format",
+        action="append",
+        default=None,
+        help="Output format: windev (default) or markdown; repeat or comma-separate for several",
+    )
     p.add_argument("--no-prefixes", action="store_true", help="Disable WinDev variable prefixes (runtime override)")
     p.add_argument("--no-serialize", action="store_true", help="Disable <serialize=\"...\"> (runtime override)")
     p.add_argument("--print-rules", action="store_true", help="Print effective rules (after overrides) and exit")
@@ -61,99 +619,267 @@ def main(argv: list[str] | None = None) -> None:
 
     p.add_argument("--validate-only", action="store_true", help="Validate JSON and infer schema, then exit")
     p.add_argument("--pretty", action="store_true", help="Pretty-print the input JSON (after parsing) and exit")
+    p.add_argument(
+        "--stream",
+        action="store_true",
+        help="Infer the schema from parse events without loading the whole JSON (automatic for files >= 64 MiB)",
+    )
+    p.add_argument(
+        "--json-backend",
+        choices=_JSON_BACKENDS,
+        default="auto",
+        help="JSON decoder: auto (msgspec when installed, else stdlib), stdlib or msgspec; results are identical",
+    )
+    p.add_argument(
+        "--compact",
+        action="store_true",
+        help="Decode objects straight into their shapes instead of keeping the parsed JSON (less memory; never auto-streamed)",
+    )
+    p.add_argument("--jsonl", action="store_true", help="Input is JSON Lines (one record per line), merged into one schema")
+    p.add_argument("--skip-bad-lines", action="store_true", help="Report and skip unparsable JSON Lines records")
+    p.add_argument(
+        "--sample",
+        choices=_SAMPLING_MODES,
+        default=None,
+        help="Infer large arrays from a sample of their elements (overrides rules inference.sampling.mode)",
+    )
+    p.add_argument("--infer-stats", action="store_true", help="Print inference work counters and schema size on stderr")
+    p.add_argument("--sample-size", type=_positive_int, default=None, help="Number of elements inspected per sampled array")
+    p.add_argument(
+        "--sample-escalate",
+        action="store_true",
+        help="Scan the whole array when its sample still adds fields late",
+    )
+
+    p.add_argument(
+        "--load-schema",
+        default=None,
+        help="Start from a schema saved with --save-schema; the input (optional) is merged into it",
+    )
+    p.add_argument(
+        "--save-schema",
+        default=None,
+        help="Save the inferred (or merged) schema, type names included, to this file",
+    )
+    p.add_argument(
+        "--name-map",
+        default=None,
+        help="Keep type names stable across runs with this name map file (created, then updated); "
+        "changed structures are reported on stderr",
+    )
 
     p.add_argument("--output-dir", default=None, help="Output directory for batch mode (when input is a directory)")
     p.add_argument("--continue-on-error", action="store_true", help="Continue processing other files on error (batch mode)")
+    p.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes for batch mode (0 = one per CPU)",
+    )
+    p.add_argument("--no-cache", action="store_true", help="Do not reuse or store cached rules and rendered outputs")
+    p.add_argument("--clear-cache", action="store_true", help="Empty the rules and output caches before running")
+    p.add_argument("--cache-dir", default=None, help="Cache directory (default: per-user cache dir)")
+    p.add_argument("--cache-max-mb", type=int, default=256, help="Output cache size cap in MB (LRU eviction)")
+    p.add_argument("--timings", action="store_true", help="Print the time spent in each stage and work counters on stderr")
+    p.add_argument("--metrics-json", default=None, help="Write stage timings and counters as JSON to this file (per file in batch mode)")
+    p.add_argument("--no-server", action="store_true", help="Do not forward to a running `json2windev serve` daemon")
 
     args = p.parse_args(argv)
+    try:
+        args.format = _parse_formats(args.format)
+    except ValueError as e:
+        p.error(str(e))
+    args.rules = args.rules or [DEFAULT_RULES]
+    metrics: Optional[Metrics] = None
+    if args.timings or args.metrics_json:
+        from json2windev.utils.metrics import Metrics
+
+        metrics = Metrics()
+    # Batch mode: relative input path -> that file's metrics
+    file_metrics: dict = {}
 
     if args.gui:
         from json2windev.app.gui_tk import run_gui
         run_gui()
         return
 
-    try:
-        # Load rules + apply runtime overrides
-        rules = load_rules(args.rules)
+    if args.input is None and not (args.clear_cache or args.load_schema):
+        args.input = "-"
+    input_path = Path(args.input) if args.input is not None else None
+    batch = input_path is not None and input_path.is_dir()
+    # Single-file --pretty / --validate-only need neither rules nor renderer
+    needs_rules = batch or args.print_rules or not (args.pretty or args.validate_only)
+
+    cache_dir = None
+    if needs_rules or args.clear_cache:
+        from json2windev.utils.cache import RenderCache, RulesCache, code_version, default_cache_dir
+
+        cache_dir = Path(args.cache_dir) if args.cache_dir else default_cache_dir()
+    if args.clear_cache:
+        RenderCache(cache_dir, 0).clear()
+        RulesCache(cache_dir, code_version()).clear()
+        if args.input is None:
+            print(f"Cache cleared: {cache_dir}", file=sys.stderr)
+            return
 
-        # Small runtime overrides without touching YAML
-        if args.no_prefixes:
-            rules.raw["naming"]["use_variable_prefixes"] = False
-        if args.no_serialize:
-            rules.raw["naming"]["serialize_attribute"] = False
+    try:
+        if _can_forward(args, batch):
+            rendered = _forward_render(args, cache_dir)
+            if rendered is not None:
+                if metrics is not None:
+                    metrics.lap("server")
+                _write_output(args.output, rendered, metrics)
+                return
+
+        rules_sets: list = []
+        outputs: List[_Output] = []
+        if needs_rules:
+            all_cached = True
+            for path, tag in zip(args.rules, _rules_tags(args.rules)):
+                rules, cached = _load_effective_rules(args, path, None if args.no_cache else cache_dir)
+                all_cached = all_cached and cached
+                rules_sets.append(rules)
+                # Rules-major: each rules set's formats share its naming
+                outputs.extend(_Output(rules, fmt, tag) for fmt in args.format)
+            if metrics is not None:
+                metrics.lap("rules", "cached" if all_cached else "parsed")
 
         if args.print_rules:
             import yaml
-            _write_output(args.output, yaml.safe_dump(rules.raw, sort_keys=False, allow_unicode=True))
+            docs = [rules.raw for rules in rules_sets]
+            _write_output(args.output, yaml.safe_dump_all(docs, sort_keys=False, allow_unicode=True))
             return
 
-        input_path = Path(args.input)
+        from json2windev.app.render import sampling_options
+
+        # Sampling settings come from the first rules set: inference is shared
+        # (without rules, validate-only, only the CLI flags apply)
+        sampling = sampling_options(rules_sets[0] if rules_sets else None, args.sample, args.sample_size, args.sample_escalate)
 
         # ===== BATCH MODE =====
-        if input_path.exists() and input_path.is_dir():
+        if batch:
             if not args.output_dir:
                 print("ERROR: --output-dir is required when input is a directory.", file=sys.stderr)
                 raise SystemExit(2)
+            if args.load_schema or args.save_schema:
+                print("ERROR: --load-schema / --save-schema need a single input (use --jsonl for many samples).", file=sys.stderr)
+                raise SystemExit(2)
+            if args.name_map:
+                print("ERROR: --name-map needs a single input.", file=sys.stderr)
+                raise SystemExit(2)
 
             out_dir = Path(args.output_dir)
             out_dir.mkdir(parents=True, exist_ok=True)
 
-            json_files = sorted(input_path.rglob("*.json"))
+            pattern = "*.jsonl" if args.jsonl else "*.json"
+            json_files = sorted(input_path.rglob(pattern))
             if not json_files:
-                print(f"ERROR: No .json files found in directory: {input_path}", file=sys.stderr)
+                print(f"ERROR: No {pattern[1:]} files found in directory: {input_path}", file=sys.stderr)
                 raise SystemExit(2)
 
+            job = _BatchJob(
+                input_path=input_path,
+                out_dir=out_dir,
+                args=args,
+                outputs=outputs,
+                sampling=sampling,
+                cache=None if args.no_cache else RenderCache(cache_dir, args.cache_max_mb * 1024 * 1024),
+                cache_contexts=tuple(_cache_context(out, args, sampling) for out in outputs),
+                metrics=metrics is not None,
+            )
+
             ok = 0
             failed = 0
+            cache_hits = 0
 
-            for f in json_files:
-                try:
-                    json_text = f.read_text(encoding="utf-8")
-                    rendered = _render_one(json_text, rules, args.format)
-
-                    rel = f.relative_to(input_path)
-                    target = (out_dir / rel).with_suffix(_default_ext(args.format))
-                    target.parent.mkdir(parents=True, exist_ok=True)
-                    target.write_text(rendered, encoding="utf-8")
-
+            results = _iter_batch_results(json_files, job)
+            for f, (rel, cached, measured, error) in zip(json_files, results):
+                if error is None:
                     ok += 1
+                    cache_hits += cached
                     print(f"[OK] {rel}")
-
-                except Exception as e:
+                    if measured is not None:
+                        file_metrics[rel.as_posix()] = measured
+                else:
                     failed += 1
-                    print(f"[FAIL] {f}: {e}", file=sys.stderr)
+                    print(f"[FAIL] {f}: {error}", file=sys.stderr)
                     if not args.continue_on_error:
+                        results.close()
                         raise SystemExit(2)
 
+            if job.cache is not None:
+                job.cache.prune()
+                # Not on the [OK] lines: stdout does not depend on the cache state
+                print(f"Cache: {cache_hits} of {ok} files served from the cache", file=sys.stderr)
+            if metrics is not None:
+                metrics.lap("batch")
             print(f"Done. OK={ok}, FAIL={failed}")
             return
 
         # Pipeline (explicit, format-ready)
-        json_text = _read_input(args.input)
-        data = parse_json(json_text)
-
         if args.pretty:
+            if args.input is None:
+                print("ERROR: --pretty needs an input.", file=sys.stderr)
+                raise SystemExit(2)
+            data = parse_json(read_input(args.input), backend=args.json_backend, pause_gc=True)
             _write_output(args.output, pretty_json(data))
             return
 
-        schema = infer_schema(data)
+        if len(outputs) > 1 and args.output == "-" and not args.validate_only:
+            print("ERROR: several outputs need --output (the base name of the files to write).", file=sys.stderr)
+            raise SystemExit(2)
+        if args.name_map and len(rules_sets) > 1:
+            print("ERROR: --name-map names with a single rules set.", file=sys.stderr)
+            raise SystemExit(2)
+        if args.compact and args.infer_stats:
+            print("ERROR: --infer-stats is not available with --compact (it does not count inference work).", file=sys.stderr)
+            raise SystemExit(2)
+
+        names_state = name_map = None
+        if args.name_map and not args.validate_only:
+            from json2windev.core.type_naming import NameMap
+            from json2windev.renderers.name_map import NameMapState, load_name_map
+
+            names_state = load_name_map(args.name_map)
+            if names_state.rules_key != _rules_key(rules_sets[0]):
+                # Names given with other rules: start over
+                names_state = NameMapState(rules_key=_rules_key(rules_sets[0]))
+            # Updated by naming; names_state keeps the previous run's (renames)
+            name_map = NameMap(names_state.names.names, names_state.names.paths)
+            if metrics is not None:
+                metrics.lap("load_name_map")
+
+        from json2windev.core.infer import InferStats
+
+        stats = InferStats()
+        schema = _infer_with_snapshot(args, rules_sets[0] if rules_sets else None, sampling, stats, metrics)
+        if stats.arrays_sampled:
+            print(stats.sampling_summary(), file=sys.stderr)
+        if args.infer_stats:
+            from json2windev.core.schema import schema_footprint
+
+            print(stats.work_summary(), file=sys.stderr)
+            print(schema_footprint(schema).summary(), file=sys.stderr)
+
+        if args.save_schema:
+            _save_snapshot(schema, args.save_schema, rules_sets[0] if rules_sets else None, metrics, name_map)
 
         if args.validate_only:
             # If we reached here, JSON was valid and schema inference succeeded
             _write_output(args.output, "OK\n")
             return
 
-        if args.format == "windev":
-            renderer = WinDevRenderer(rules)
-            out = renderer.render(schema)
-        elif args.format == "markdown":
-            from json2windev.renderers.markdown import MarkdownRenderer
-            renderer = MarkdownRenderer(rules)
-            out = renderer.render(schema)
-        else:
-            raise ValueError(f"Unsupported format: {args.format}")
+        irs: List[RenderIR] = []
+        for out, chunks in _iter_outputs(schema, outputs, metrics, name_map, irs):
+            target = args.output if len(outputs) == 1 else str(out.path_for(Path(args.output)))
+            _write_chunks(target, chunks, metrics)
+            if metrics is not None:
+                # Before the next rules set is named (its "names" lap)
+                metrics.lap("render")
 
-        _write_output(args.output, out)
+        if names_state is not None:
+            _save_name_map(names_state, name_map, irs[0], args.name_map, metrics)
 
     except JsonParseError as e:
         print(f"ERROR: {e}", file=sys.stderr)
@@ -161,6 +887,9 @@ def main(argv: list[str] | None = None) -> None:
     except Exception as e:
         print(f"ERROR: {e}", file=sys.stderr)
         raise SystemExit(2)
+    finally:
+        if metrics is not None:
+            _report_metrics(args, metrics, file_metrics)
 
 
 if __name__ == "__main__":
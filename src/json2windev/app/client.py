@@ -0,0 +1,143 @@
+"""
+Thin client of the `json2windev serve` daemon (see app.server).
+
+Imported by the CLI on every single-file render: keep its imports minimal.
+"""
+from __future__ import annotations
+
+import json
+import socket
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from json2windev import __version__
+
+# Written in the cache dir by the daemon: {"host", "port", "pid", "version"}
+STATE_FILE = "server.json"
+
+# First product token of the Server header of every daemon reply (see app.server)
+_SERVER = f"json2windev/{__version__}".encode("ascii")
+
+_UNRESERVED = frozenset(b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~/")
+
+
+class ServerError(RuntimeError):
+    """
+    The daemon answered with an error (its message is the error text).
+    """
+
+
+def _query(params: Dict[str, str]) -> str:
+    # Percent-encoding, as decoded by parse_qs on the daemon side
+    def quote(value: str) -> str:
+        return "".join(chr(b) if b in _UNRESERVED else f"%{b:02X}" for b in value.encode("utf-8"))
+
+    return "&".join(f"{quote(k)}={quote(v)}" for k, v in params.items())
+
+
+def find_daemon(cache_dir: Path, timeout: float = 1.0) -> Optional[Dict[str, Any]]:
+    """
+    State of the daemon running for cache_dir, or None when there is none.
+
+    The state file may be stale (daemon killed, port reused by another
+    service): the peer must answer GET /health with this version and the
+    pid the daemon wrote, within timeout.
+    """
+    try:
+        state = json.loads((Path(cache_dir) / STATE_FILE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(state, dict) or state.get("version") != __version__ or "host" not in state or "port" not in state:
+        return None
+    reply = _request(state, f"GET /health HTTP/1.0\r\nHost: {state['host']}\r\n\r\n".encode("ascii"), timeout)
+    if reply is None or reply[0] != 200:
+        return None
+    try:
+        health = json.loads(reply[1])
+    except ValueError:
+        return None
+    if not isinstance(health, dict) or health.get("version") != __version__ or health.get("pid") != state.get("pid"):
+        return None
+    return state
+
+
+def render(daemon: Dict[str, Any], json_bytes: bytes, params: Dict[str, str], timeout: float = 30.0) -> Optional[str]:
+    """
+    Render through daemon (as returned by find_daemon). Returns None when
+    it does not answer as the daemon (it went away meanwhile) or does not
+    serve these rules (403); raises ServerError when the daemon rejects the
+    request.
+    """
+    head = (
+        f"POST /render?{_query(params)} HTTP/1.0\r\n"
+        f"Host: {daemon['host']}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(json_bytes)}\r\n\r\n"
+    )
+    reply = _request(daemon, head.encode("ascii") + json_bytes, timeout)
+    if reply is None:
+        return None
+    status, body = reply
+    if status == 403:
+        return None  # rules file the daemon was not started with: render locally
+    if status != 200:
+        raise ServerError(body)
+    return body
+
+
+def forward(
+    cache_dir: Path,
+    json_bytes: bytes,
+    params: Dict[str, str],
+    timeout: float = 30.0,
+) -> Optional[str]:
+    """
+    Render through the running daemon. Returns None when no daemon is
+    running (or it belongs to another version); raises ServerError when
+    the daemon rejects the request.
+    """
+    daemon = find_daemon(cache_dir)
+    return None if daemon is None else render(daemon, json_bytes, params, timeout)
+
+
+def _request(state: Dict[str, Any], request: bytes, timeout: float) -> Optional[Tuple[int, str]]:
+    """
+    (status, body) of the daemon's reply to request, or None when the peer
+    is unreachable, times out or is not the daemon (no json2windev Server
+    header).
+
+    Speaks just enough HTTP/1.0 over a plain socket: http.client (or even
+    urllib) would cost more to import than most conversions take.
+    """
+    try:
+        with socket.create_connection((state["host"], state["port"]), timeout=min(timeout, 0.5)) as sock:
+            sock.settimeout(timeout)
+            sock.sendall(request)
+            chunks = []
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+    except (OSError, TypeError, ValueError):
+        return None
+
+    response = b"".join(chunks)
+    head_end = response.find(b"\r\n\r\n")
+    if head_end == -1:
+        return None
+    lines = response[:head_end].split(b"\r\n")
+    status = lines[0].split(b" ", 2)
+    if len(status) < 2 or not status[0].startswith(b"HTTP/") or not status[1].isdigit():
+        return None
+    if not any(_is_daemon_server(line) for line in lines[1:]):
+        return None
+    try:
+        return int(status[1]), response[head_end + 4:].decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+
+
+def _is_daemon_server(header: bytes) -> bool:
+    name, _, value = header.partition(b":")
+    return name.strip().lower() == b"server" and value.split()[:1] == [_SERVER]
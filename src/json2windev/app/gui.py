@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import io
 import tkinter as tk
 import tkinter.font as tkfont
 from tkinter import ttk, filedialog, messagebox
@@ -7,6 +8,8 @@ from pathlib import Path
 
 from json2windev.core.input import parse_json, pretty_json, JsonParseError
 from json2windev.core.infer import infer_schema
+from json2windev.core.schema import SchemaNode
+from json2windev.core.stream import AUTO_STREAM_THRESHOLD, infer_schema_stream
 from json2windev.rules.loader import load_rules, RulesError
 from json2windev.renderers.windev import WinDevRenderer
 from json2windev.renderers.markdown import MarkdownRenderer
@@ -21,6 +24,7 @@ class Json2WinDevGUI(tk.Tk):
 
         self.var_format = tk.StringVar(value="windev")
         self.var_rules = tk.StringVar(value=str(Path("config") / "windev_rules.yaml"))
+        self.var_stream = tk.BooleanVar(value=False)
 
         self._build_ui()
 
@@ -39,6 +43,8 @@ class Json2WinDevGUI(tk.Tk):
 
         ttk.Button(top, text="Browse…", command=self._browse_rules).pack(side=tk.LEFT, padx=(0, 14))
 
+        ttk.Checkbutton(top, text="Streaming", variable=self.var_stream).pack(side=tk.LEFT, padx=(0, 14))
+
         ttk.Button(top, text="Validate", command=self._on_validate).pack(side=tk.LEFT)
         ttk.Button(top, text="Generate", command=self._on_generate).pack(side=tk.LEFT, padx=(6, 0))
         ttk.Button(top, text="Pretty JSON", command=self._on_pretty).pack(side=tk.LEFT, padx=(14, 0))
@@ -200,8 +206,7 @@ class Json2WinDevGUI(tk.Tk):
         try:
             rules = self._load_rules()
             _ = rules  # currently unused, but keeps parity with CLI (rules must exist)
-            data = parse_json(self._get_input())
-            _ = infer_schema(data)
+            _ = self._infer(self._get_input())
             self.status.set("OK: JSON valid and schema inferred.")
             messagebox.showinfo("Validate", "OK: JSON valid and schema inferred.")
         except (JsonParseError, RulesError) as e:
@@ -214,8 +219,7 @@ class Json2WinDevGUI(tk.Tk):
     def _on_generate(self) -> None:
         try:
             rules = self._load_rules()
-            data = parse_json(self._get_input())
-            schema = infer_schema(data)
+            schema = self._infer(self._get_input())
 
             fmt = self.var_format.get()
             if fmt == "windev":
@@ -240,6 +244,12 @@ class Json2WinDevGUI(tk.Tk):
         rules_path = Path(self.var_rules.get())
         return load_rules(rules_path)
 
+    def _infer(self, text: str) -> SchemaNode:
+        # Large inputs go through the event-based engine (no object graph)
+        if self.var_stream.get() or len(text) >= AUTO_STREAM_THRESHOLD:
+            return infer_schema_stream(io.StringIO(text))
+        return infer_schema(parse_json(text))
+
     def _get_input(self) -> str:
         return self.txt_in.get("1.0", tk.END).strip()
 
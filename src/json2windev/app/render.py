@@ -0,0 +1,67 @@
+"""
+Rendering steps shared by the entry points (CLI, `serve` daemon). They take
+explicit parameters, not parsed command-line arguments, and import what they
+need on first use (the CLI start-up stays cheap).
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from json2windev.core.infer import SamplingOptions
+    from json2windev.core.schema import SchemaNode
+    from json2windev.renderers.base import Renderer
+    from json2windev.rules.loader import Rules
+
+
+def with_naming_overrides(rules: Rules, no_prefixes: bool = False, no_serialize: bool = False) -> Rules:
+    """
+    rules with the --no-prefixes / --no-serialize switches applied (rules
+    itself when neither is set).
+    """
+    naming: dict = {}
+    if no_prefixes:
+        naming["use_variable_prefixes"] = False
+    if no_serialize:
+        naming["serialize_attribute"] = False
+    return rules.with_overrides({"naming": naming}) if naming else rules
+
+
+def sampling_options(
+    rules: Optional[Rules],
+    mode: Optional[str] = None,
+    size: Optional[int] = None,
+    escalate: bool = False,
+) -> Optional[SamplingOptions]:
+    """
+    Array sampling from rules (inference.sampling), the given mode, size
+    and escalate taking precedence. Without rules (validate-only), only
+    those apply. None when sampling is off.
+    """
+    cfg = (rules.inference.get("sampling") or {}) if rules is not None else {}
+    mode = mode or cfg.get("mode") or "off"
+    if mode == "off":
+        return None
+    from json2windev.core.infer import SamplingOptions
+
+    return SamplingOptions(
+        mode=mode,
+        size=size if size is not None else cfg.get("size", 1000),
+        escalate=escalate or bool(cfg.get("escalate", False)),
+    )
+
+
+def renderer(rules: Rules, fmt: str) -> Renderer:
+    if fmt == "windev":
+        from json2windev.renderers.windev import WinDevRenderer
+        return WinDevRenderer(rules)
+
+    if fmt == "markdown":
+        from json2windev.renderers.markdown import MarkdownRenderer
+        return MarkdownRenderer(rules)
+
+    raise ValueError(f"Unsupported format: {fmt}")
+
+
+def render_schema(schema: SchemaNode, rules: Rules, fmt: str) -> str:
+    return renderer(rules, fmt).render(schema)
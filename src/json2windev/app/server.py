@@ -0,0 +1,228 @@
+"""
+`json2windev serve`: a local HTTP daemon keeping rules and outputs warm, so
+that editor and build integrations skip start-up, imports and rules loading.
+
+    POST /render?format=windev&rules=<path>[&no_prefixes=1][&no_serialize=1]
+        body: the JSON document (UTF-8) -> 200 text/plain rendered output,
+        400 with the error message on invalid JSON or rules, 403 when the
+        rules file is not one the daemon was started with
+    GET /health -> 200 {"version": ..., "pid": ...}
+
+The daemon has no authentication: it refuses to listen on anything but the
+loopback interface, and only loads the rules files it was started with (a
+request cannot make it read any other file). It writes its port to
+server.json in the cache dir; clients find it there (see app.client).
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import ipaddress
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from json2windev import __version__
+from json2windev.app.client import STATE_FILE
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_RULES = "config/windev_rules.yaml"
+
+
+class RulesNotServed(LookupError):
+    """
+    The requested rules file is not one the daemon serves.
+    """
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class RenderService:
+    """
+    Warm conversion engine for the rules files in rules_paths (no other
+    file is read): rules are loaded once per rules file and reloaded when
+    the file changes; rendered outputs are kept in an LRU keyed by the
+    input bytes, the options and the rules file stamp.
+    """
+
+    def __init__(self, rules_paths: Iterable[str] = (DEFAULT_RULES,), max_outputs: int = 512) -> None:
+        self.rules_paths = frozenset(str(Path(p).resolve()) for p in rules_paths)
+        self.max_outputs = max_outputs
+        self._lock = threading.Lock()
+        # resolved rules path -> ((mtime_ns, size), Rules)
+        self._rules: Dict[str, Tuple[Tuple[int, int], object]] = {}
+        self._outputs: "OrderedDict[tuple, str]" = OrderedDict()
+        self.rules_loads = 0
+        self.output_hits = 0
+
+    def rules(self, path: str) -> Tuple[object, Tuple[int, int]]:
+        """
+        Rules for the file at path (reloaded when its mtime or size changed)
+        and the file stamp they were loaded from. Raises RulesNotServed,
+        without touching the file, when path is not in rules_paths.
+        """
+        from json2windev.rules.loader import RulesError, load_rules
+
+        resolved = str(Path(path).resolve())
+        if resolved not in self.rules_paths:
+            raise RulesNotServed("Rules file not served by this daemon")
+        try:
+            st = os.stat(resolved)
+        except OSError:
+            raise RulesError(f"Rules file not found: {path}") from None
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            loaded = self._rules.get(resolved)
+        if loaded is not None and loaded[0] == stamp:
+            return loaded[1], stamp
+        rules = load_rules(resolved)
+        _ = rules.compiled
+        with self._lock:
+            self._rules[resolved] = (stamp, rules)
+            self.rules_loads += 1
+        return rules, stamp
+
+    def render(
+        self,
+        json_bytes: bytes,
+        rules_path: str,
+        fmt: str = "windev",
+        no_prefixes: bool = False,
+        no_serialize: bool = False,
+    ) -> str:
+        from json2windev.app.render import render_schema, sampling_options, with_naming_overrides
+        from json2windev.core.infer import infer_schema
+        from json2windev.core.input import parse_json
+
+        rules, stamp = self.rules(rules_path)
+        key = (hashlib.sha256(json_bytes).digest(), str(Path(rules_path).resolve()), stamp, fmt, no_prefixes, no_serialize)
+        with self._lock:
+            out = self._outputs.get(key)
+            if out is not None:
+                self._outputs.move_to_end(key)
+                self.output_hits += 1
+                return out
+
+        rules = with_naming_overrides(rules, no_prefixes, no_serialize)
+        # The rules' own sampling settings
+        schema = infer_schema(parse_json(json_bytes.decode("utf-8")), sampling_options(rules))
+        out = render_schema(schema, rules, fmt)
+
+        with self._lock:
+            self._outputs[key] = out
+            while len(self._outputs) > self.max_outputs:
+                self._outputs.popitem(last=False)
+        return out
+
+
+def make_server(service: RenderService, host: str = DEFAULT_HOST, port: int = 0):
+    """
+    Threaded HTTP server bound to host:port (port 0 = any free port).
+    host must be a loopback address: the daemon has no authentication.
+    """
+    if not _is_loopback(host):
+        raise ValueError(f"refusing to listen on {host}: the daemon only listens on loopback (127.0.0.1)")
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        server_version = f"json2windev/{__version__}"
+
+        def _reply(self, status: int, body: str, content_type: str = "text/plain; charset=utf-8") -> None:
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self) -> None:
+            if urlsplit(self.path).path != "/health":
+                self._reply(404, "Not found")
+                return
+            self._reply(200, json.dumps({"version": __version__, "pid": os.getpid()}), "application/json")
+
+        def do_POST(self) -> None:
+            url = urlsplit(self.path)
+            if url.path != "/render":
+                self._reply(404, "Not found")
+                return
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            try:
+                out = service.render(
+                    body,
+                    rules_path=query.get("rules", DEFAULT_RULES),
+                    fmt=query.get("format", "windev"),
+                    no_prefixes=query.get("no_prefixes") == "1",
+                    no_serialize=query.get("no_serialize") == "1",
+                )
+            except RulesNotServed as e:
+                self._reply(403, str(e))
+                return
+            except Exception as e:
+                self._reply(400, str(e))
+                return
+            self._reply(200, out)
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def serve(cache_dir: Path, host: str = DEFAULT_HOST, port: int = 0, rules_paths: Iterable[str] = (DEFAULT_RULES,)) -> None:
+    """
+    Run the daemon until interrupted, serving the rules files in
+    rules_paths (loaded up front).
+    """
+    service = RenderService(rules_paths)
+    for path in service.rules_paths:
+        service.rules(path)
+    server = make_server(service, host, port)
+    host, port = server.server_address[:2]
+    state = Path(cache_dir) / STATE_FILE
+    state.parent.mkdir(parents=True, exist_ok=True)
+    state.write_text(json.dumps({"host": host, "port": port, "pid": os.getpid(), "version": __version__}), encoding="utf-8")
+    print(f"Serving on http://{host}:{port} (state: {state})", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        try:
+            if json.loads(state.read_text(encoding="utf-8")).get("pid") == os.getpid():
+                state.unlink()
+        except (OSError, ValueError):
+            pass
+
+
+def serve_main(argv: list[str]) -> None:
+    from json2windev.utils.cache import default_cache_dir
+
+    p = argparse.ArgumentParser(prog="json2windev serve", description="Run the local conversion daemon.")
+    p.add_argument("--host", default=DEFAULT_HOST, help="Loopback address to listen on (default: 127.0.0.1)")
+    p.add_argument("--port", type=int, default=0, help="Port to listen on (default: any free port)")
+    p.add_argument(
+        "--rules",
+        action="append",
+        default=None,
+        help=f"Rules YAML to serve (repeatable; default: {DEFAULT_RULES}); requests for other rules files are refused",
+    )
+    p.add_argument("--cache-dir", default=None, help="Where the state file is written (default: per-user cache dir)")
+    args = p.parse_args(argv)
+    if not _is_loopback(args.host):
+        p.error(f"--host must be a loopback address, got {args.host} (the daemon has no authentication)")
+    serve(Path(args.cache_dir) if args.cache_dir else default_cache_dir(), args.host, args.port, args.rules or [DEFAULT_RULES])
@@ -0,0 +1,49 @@
+"""
+JSON decoders behind parse_json: the stdlib one, or a faster optional C
+decoder (msgspec) when installed.
+
+A backend only has to be right on the documents it accepts. Any error
+(invalid JSON, but also NaN / Infinity, lone surrogates or out-of-range
+floats, which the stdlib accepts and msgspec rejects) sends the document
+back to the stdlib decoder. Results are therefore those of json.loads,
+and errors carry the same line / col / snippet.
+
+orjson is not offered: it decodes integers >= 2**64 as floats, and
+scanning the text for such literals costs more than orjson saves.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Callable, Optional, Tuple
+
+JSON_BACKENDS = ("auto", "stdlib", "msgspec")
+
+Loads = Callable[[str], Any]
+
+
+@lru_cache(maxsize=None)
+def get_backend(name: str = "auto") -> Tuple[str, Optional[Loads]]:
+    """
+    (resolved backend name, decode function); the function is None for
+    the stdlib backend. "auto" picks msgspec when installed, else stdlib.
+    """
+    if name not in JSON_BACKENDS:
+        raise ValueError(f"Unknown JSON backend: {name} (expected one of: {', '.join(JSON_BACKENDS)})")
+    if name == "stdlib":
+        return "stdlib", None
+    try:
+        return "msgspec", _LOADERS["msgspec"]()
+    except ImportError:
+        if name != "auto":
+            raise ValueError(f"JSON backend '{name}' is not installed (pip install {name})") from None
+    return "stdlib", None
+
+
+def _msgspec() -> Loads:
+    import msgspec
+
+    # Same int / float split as json.loads, integers of any size included
+    return msgspec.json.Decoder().decode
+
+
+_LOADERS = {"msgspec": _msgspec}
@@ -0,0 +1,118 @@
+"""
+Compact decoding: infer the schema of an in-memory document while it is
+decoded, instead of materializing it first.
+
+The stdlib decoder calls an object_pairs_hook for every JSON object, inner
+ones first. CompactDecoder returns the object's schema node in place of
+a dict, so a record is reduced to one shared pointer as soon as it is
+decoded: an array of a million records with the same shape holds a
+million references to one node, not a million dicts. Keys are shared too:
+the decoder memoizes them per document, and a node keeps its field names
+once per distinct shape.
+
+The schema is the one infer_schema gives on the fully decoded document,
+sampling included (sampled arrays pick the same elements). Inference
+counters (InferStats) are not collected: arrays nested in the elements of
+a sampled array are decoded, and inferred, before sampling skips any of
+those elements, so they could not count what infer_schema counts.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from .infer import SamplingOptions, SchemaAccumulator, infer_schema
+from .input import parse_json
+from .schema import SchemaNode, leaf
+from .shapes import ShapeTable
+
+_LEAVES = {
+    type(None): leaf("null"),
+    bool: leaf("boolean"),
+    int: leaf("number_int"),
+    float: leaf("number_real"),
+    str: leaf("string"),
+}
+
+# Signature cache entries kept before starting over: documents whose
+# objects rarely share a shape should not pay for a key per object
+CACHE_LIMIT = 4096
+
+
+class CompactDecoder:
+    """
+    object_pairs_hook turning every decoded object into a schema node
+    shared by the objects of the same shape: the same keys and child nodes
+    map to the same node through a signature lookup, without building it.
+
+    Nodes are shared within the decoder only; infer_compact interns the
+    final schema in shapes.
+    """
+
+    def __init__(
+        self,
+        sampling: Optional[SamplingOptions] = None,
+        shapes: Optional[ShapeTable] = None,
+    ) -> None:
+        self.sampling = sampling if sampling is not None and sampling.mode != "off" else None
+        self.shapes = shapes if shapes is not None else ShapeTable()
+        # (keys..., child node ids...) -> object node. Cached nodes keep
+        # their children alive, so the ids can't be reused while cached.
+        self._objects: Dict[tuple, SchemaNode] = {}
+        # id(item node) -> array node, for arrays of one repeated item
+        self._arrays: Dict[int, SchemaNode] = {}
+
+    def __call__(self, pairs: List[Tuple[str, Any]]) -> SchemaNode:
+        leaf_of, schema_of = _LEAVES.get, self.schema_of
+        nodes = [leaf_of(type(v)) or schema_of(v) for _, v in pairs]
+        signature = (*[k for k, _ in pairs], *map(id, nodes))
+        node = self._objects.get(signature)
+        if node is None:
+            # Duplicate keys as in a dict: first position, last value
+            fields = dict(zip([k for k, _ in pairs], nodes))
+            node = SchemaNode("object", fields)
+            if len(self._objects) >= CACHE_LIMIT:
+                self._objects.clear()
+                self._arrays.clear()
+            self._objects[signature] = node
+        return node
+
+    def schema_of(self, value: Any) -> SchemaNode:
+        """
+        Schema of a value decoded with this hook (objects already replaced
+        by their nodes).
+        """
+        if type(value) is SchemaNode:
+            return value
+        if type(value) is not list:
+            return infer_schema(value, self.sampling, shapes=self.shapes)
+        if value and (self.sampling is None or len(value) <= self.sampling.size):
+            first = value[0]
+            item = first if type(first) is SchemaNode else _LEAVES.get(type(first))
+            if item is not None:
+                if item is first:
+                    same = all(v is first for v in value)
+                else:
+                    kind = type(first)
+                    same = all(type(v) is kind for v in value)
+                if same:
+                    node = self._arrays.get(id(item))
+                    if node is None:
+                        node = self._arrays[id(item)] = SchemaNode("array", item=item)
+                    return node
+        acc = SchemaAccumulator(self.sampling, shapes=self.shapes)
+        acc.add(value)
+        return acc.result()
+
+
+def infer_compact(
+    text: str,
+    sampling: Optional[SamplingOptions] = None,
+    shapes: Optional[ShapeTable] = None,
+    line_offset: int = 0,
+) -> SchemaNode:
+    """
+    Same schema as infer_schema(parse_json(text)), decoded compactly (see
+    module docstring). Parse errors are those of parse_json.
+    """
+    decoder = CompactDecoder(sampling, shapes)
+    return decoder.shapes.intern(decoder.schema_of(parse_json(text, line_offset, object_pairs_hook=decoder)))
@@ -1,30 +1,570 @@
 from __future__ import annotations
 import json
-from typing import Any
+import random
+from dataclasses import dataclass
+from typing import Any, List, Optional
 from .schema import SchemaNode
-from .merge import merge
+from .shapes import ShapeTable
 
-def infer_schema(value: Any) -> SchemaNode:
-    if value is None:
-        return SchemaNode("null")
+SAMPLING_MODES = ("off", "first", "reservoir", "spread")
+
+
+@dataclass(frozen=True)
+class SamplingOptions:
+    """
+    How many elements of large arrays are inspected.
+    - first: the first `size` elements
+    - reservoir: `size` elements drawn uniformly (fixed seed, deterministic)
+    - spread: head + tail + evenly strided middle
+    With escalate, an array whose item schema still changes in the second
+    half of its sample is scanned in full.
+    """
+    mode: str = "off"
+    size: int = 1000
+    escalate: bool = False
+
+
+@dataclass
+class InferStats:
+    arrays_sampled: int = 0
+    elements_total: int = 0
+    elements_inspected: int = 0
+    escalations: int = 0
+    unsettled_arrays: int = 0
+    # Array elements merged the regular way, absorbed without building a
+    # schema (only known keys/kinds), or skipped once the item was Variant.
+    elements_merged: int = 0
+    elements_absorbed: int = 0
+    elements_saturated: int = 0
+
+    def sampling_summary(self) -> str:
+        s = (
+            f"Sampling: inspected {self.elements_inspected} of {self.elements_total} elements "
+            f"in {self.arrays_sampled} large arrays ({self.escalations} escalated to a full scan)"
+        )
+        if self.unsettled_arrays:
+            s += f"; {self.unsettled_arrays} arrays were still changing shape, the schema may have missed fields"
+        else:
+            s += "; every sampled array settled early"
+        return s
+
+    def work_summary(self) -> str:
+        return (
+            f"Array elements: {self.elements_merged} merged, "
+            f"{self.elements_absorbed} absorbed (shape already known), "
+            f"{self.elements_saturated} skipped (item already Variant)"
+        )
+
+
+def _sample_indices(n: int, opts: SamplingOptions) -> List[int]:
+    size = opts.size
+    if opts.mode == "first":
+        return list(range(size))
+    if opts.mode == "reservoir":
+        return sorted(random.Random(0).sample(range(n), size))
+    # spread
+    head = size // 3
+    tail = size // 3
+    middle = size - head - tail
+    picked = set(range(head)) | set(range(n - tail, n))
+    span = n - head - tail
+    picked.update(head + (i * span) // middle for i in range(middle))
+    return sorted(picked)
+
+
+_KINDS = {
+    type(None): "null",
+    bool: "boolean",
+    int: "number_int",
+    float: "number_real",
+    str: "string",
+    list: "array",
+    dict: "object",
+    # Already inferred (compact decoding): merged as a schema
+    SchemaNode: "schema",
+}
+_SCALARS = frozenset(("null", "boolean", "number_int", "number_real", "string"))
+
+
+def _kind_of(value: Any) -> str:
+    kind = _KINDS.get(type(value))
+    if kind is not None:
+        return kind
+    # Subclasses (OrderedDict, IntEnum, ...)
     if isinstance(value, bool):
-        return SchemaNode("boolean")
-    if isinstance(value, int) and not isinstance(value, bool):
-        return SchemaNode("number_int")
+        return "boolean"
+    if isinstance(value, int):
+        return "number_int"
     if isinstance(value, float):
-        return SchemaNode("number_real")
+        return "number_real"
     if isinstance(value, str):
-        return SchemaNode("string")
+        return "string"
     if isinstance(value, list):
-        if not value:
-            return SchemaNode("array", item=SchemaNode("null"))
-        item = infer_schema(value[0])
-        for v in value[1:]:
-            item = merge(item, infer_schema(v))
-        return SchemaNode("array", item=item)
+        return "array"
     if isinstance(value, dict):
-        node = SchemaNode("object")
+        return "object"
+    return "variant"
+
+
+def _absorbs(node: SchemaNode, value: Any, sampling: Optional[SamplingOptions]) -> bool:
+    """
+    True when merge(node, infer_schema(value)) would equal node, checked on
+    the raw value without building any schema.
+    """
+    kind = node.kind
+    if kind == "variant" or value is None:
+        return True
+    vkind = _kind_of(value)
+    if vkind in _SCALARS:
+        return vkind == kind or (vkind == "number_int" and kind == "number_real")
+
+    # Containers: scalar children are checked in place, nested containers
+    # go on the stack.
+    stack = [(node, value, vkind)]
+    while stack:
+        node, value, vkind = stack.pop()
+        if vkind == "object":
+            if node.kind != "object":
+                return False
+            fields = node.fields
+            for k, v in value.items():
+                child = fields.get(k)
+                if child is None:
+                    return False
+                ckind = child.kind
+                if ckind == "variant" or v is None:
+                    continue
+                vk = _kind_of(v)
+                if vk in _SCALARS:
+                    if vk != ckind and not (vk == "number_int" and ckind == "number_real"):
+                        return False
+                else:
+                    stack.append((child, v, vk))
+        elif vkind == "array":
+            item = node.item
+            if node.kind != "array" or item is None:
+                return False
+            if sampling is not None and sampling.mode != "off" and len(value) > sampling.size:
+                # Sampled arrays keep going through infer_schema
+                return False
+            ikind = item.kind
+            if ikind == "variant":
+                continue
+            for v in value:
+                if v is None:
+                    continue
+                vk = _kind_of(v)
+                if vk in _SCALARS:
+                    if vk != ikind and not (vk == "number_int" and ikind == "number_real"):
+                        return False
+                else:
+                    stack.append((item, v, vk))
+        elif vkind == "schema":
+            if not _schema_absorbs(node, value):
+                return False
+        elif node.kind != "variant":
+            # Unknown value type, inferred as Variant
+            return False
+    return True
+
+
+def _schema_absorbs(node: SchemaNode, other: SchemaNode) -> bool:
+    """
+    True when merging the schema other into node would leave node unchanged.
+    """
+    stack = [(node, other)]
+    while stack:
+        node, other = stack.pop()
+        kind, okind = node.kind, other.kind
+        if node is other or kind == "variant" or okind == "null":
+            continue
+        if kind != okind:
+            if (kind, okind) == ("number_real", "number_int"):
+                continue
+            return False
+        if kind == "object":
+            fields = node.fields
+            for k, child in other.fields.items():
+                mine = fields.get(k)
+                if mine is None:
+                    return False
+                stack.append((mine, child))
+        elif kind == "array" and other.item is not None:
+            if node.item is None:
+                return False
+            stack.append((node.item, other.item))
+    return True
+
+
+def _scalar_merge_table() -> dict:
+    """
+    (node kind, scalar kind) -> kind of merge(node, scalar), for the pairs
+    where merge() changes the node (absent pairs leave it as is).
+    """
+    table = {}
+    for n in _SCALARS | {"array", "object"}:
+        for v in _SCALARS - {"null"}:
+            if n == v or (n, v) == ("number_real", "number_int"):
+                continue
+            if n == "null":
+                table[(n, v)] = v
+            elif (n, v) == ("number_int", "number_real"):
+                table[(n, v)] = "number_real"
+            else:
+                table[(n, v)] = "variant"
+    return table
+
+
+_SCALAR_MERGE = _scalar_merge_table()
+
+# Accumulator tasks
+_VALUE, _ITEMS, _SCHEMA = range(3)
+
+
+class SchemaAccumulator:
+    """
+    A schema that values are merged into in place.
+
+    After add(v1) ... add(vn), result() equals the pairwise fold
+    merge(...merge(infer_schema(v1), infer_schema(v2))..., infer_schema(vn)),
+    but nothing is built for the parts of a value whose shape is already
+    known, and no dict is copied. add_schema() merges an inferred schema
+    the same way (e.g. results of other files).
+
+    Nested values are walked with an explicit stack, so nesting depth never
+    hits the interpreter recursion limit.
+    """
+
+    def __init__(
+        self,
+        sampling: Optional[SamplingOptions] = None,
+        stats: Optional[InferStats] = None,
+        shapes: Optional[ShapeTable] = None,
+    ) -> None:
+        self.sampling = sampling if sampling is not None and sampling.mode != "off" else None
+        self.stats = stats
+        self.shapes = shapes if shapes is not None else ShapeTable()
+        # The working tree is private and mutated in place. It lives in
+        # holder.item so that every node, root included, sits in a
+        # (parent, key) slot that can be replaced when its kind changes.
+        self._holder = SchemaNode("array")
+        self._frozen: Optional[SchemaNode] = None
+        self._changes = 0
+        # Schema elements found absorbed by an array item, valid while the
+        # item is unchanged: arrays of compact-decoded records repeat the
+        # same few canonical nodes. (item, changes, {id: schema})
+        self._absorbed: tuple = (None, -1, {})
+
+    def add(self, value: Any) -> bool:
+        """
+        Merge a parsed JSON value. Returns True if the schema changed.
+        """
+        root = self._frozen if self._frozen is not None else self._holder.item
+        if root is not None and _absorbs(root, value, self.sampling):
+            return False
+        self._thaw()
+        before = self._changes
+        self._run([(_VALUE, self._holder, None, value)])
+        return self._changes != before
+
+    def add_schema(self, node: SchemaNode) -> bool:
+        """
+        Merge an inferred schema. Returns True if the schema changed.
+        """
+        self._thaw()
+        before = self._changes
+        self._run([(_SCHEMA, self._holder, None, node)])
+        return self._changes != before
+
+    def result(self) -> SchemaNode:
+        """
+        The accumulated schema, hash-consed. Further adds work on a copy.
+        """
+        if self._frozen is None:
+            root = self._holder.item
+            if root is None:
+                raise ValueError("Nothing was added to the schema accumulator.")
+            self._frozen = self.shapes.intern(root)
+            self._holder.item = None
+        return self._frozen
+
+    def _thaw(self) -> None:
+        if self._frozen is not None:
+            self._holder.item = self._copy(self._frozen)
+            self._frozen = None
+
+    def _copy(self, node: SchemaNode) -> SchemaNode:
+        # Private copy of objects and arrays; scalar leaves are never mutated
+        # and stay shared.
+        leaf = self.shapes.leaf
+        out = SchemaNode(node.kind, type_name=node.type_name)
+        stack = [(node, out)]
+        while stack:
+            src, dst = stack.pop()
+            for k, child in src.fields.items():
+                if child.kind in _SCALARS or child.kind == "variant":
+                    dst.fields[k] = leaf(child.kind)
+                else:
+                    dst.fields[k] = SchemaNode(child.kind, type_name=child.type_name)
+                    stack.append((child, dst.fields[k]))
+            if src.item is not None:
+                child = src.item
+                if child.kind in _SCALARS or child.kind == "variant":
+                    dst.item = leaf(child.kind)
+                else:
+                    dst.item = SchemaNode(child.kind, type_name=child.type_name)
+                    stack.append((child, dst.item))
+        if out.kind in _SCALARS or out.kind == "variant":
+            return leaf(out.kind)
+        return out
+
+    def _build(self, value: Any, kind: str, stack: list) -> SchemaNode:
+        """
+        New private node for a value landing in an empty (or null) slot.
+        Containers are filled by the tasks pushed on stack.
+        """
+        self._changes += 1
+        leaf = self.shapes.leaf
+        if kind == "object":
+            node = SchemaNode("object")
+            fields = node.fields
+            for k, v in value.items():
+                ckind = _KINDS.get(type(v))
+                if ckind in _SCALARS:
+                    fields[k] = leaf(ckind)
+                else:
+                    # Placeholder keeps the field order
+                    fields[k] = None
+                    stack.append((_VALUE, node, k, v))
+            return node
+        if kind == "array":
+            node = SchemaNode("array")
+            if not value:
+                node.item = leaf("null")
+            else:
+                self._push_items(node, value, stack)
+            return node
+        return leaf(kind)
+
+    def _push_items(self, node: SchemaNode, values: list, stack: list) -> None:
+        if self.sampling is not None and len(values) > self.sampling.size:
+            item = self._sampled_item(values)
+            if node.item is None:
+                node.item = item
+                self._changes += 1
+            else:
+                stack.append((_SCHEMA, node, None, item))
+            return
+        # Elements are counted in stats when folded into the array's own
+        # item, i.e. all but the first one of a new array.
+        counted = node.item is None and self.stats is not None
+        stack.append((_ITEMS, node, values, 0, self._changes, counted))
+
+    def _sampled_item(self, values: list) -> SchemaNode:
+        sampling, stats = self.sampling, self.stats
+        indices = _sample_indices(len(values), sampling)
+        late = len(indices) // 2
+        changed_late = False
+        sub = SchemaAccumulator(sampling, stats, self.shapes)
+        for pos, index in enumerate(indices):
+            item = sub._holder.item
+            if item is not None and item.kind == "variant":
+                # Fixed point: merging anything into Variant yields Variant
+                if stats is not None:
+                    stats.elements_saturated += len(indices) - pos
+                break
+            changed = sub.add(values[index])
+            if pos and stats is not None:
+                if changed:
+                    stats.elements_merged += 1
+                else:
+                    stats.elements_absorbed += 1
+            if changed and pos >= late:
+                changed_late = True
+
+        escalate = changed_late and sampling.escalate
+        if stats is not None:
+            stats.arrays_sampled += 1
+            stats.elements_total += len(values)
+            stats.elements_inspected += len(values) if escalate else len(indices)
+            if escalate:
+                stats.escalations += 1
+            elif changed_late:
+                stats.unsettled_arrays += 1
+        if escalate:
+            sub = SchemaAccumulator(sampling, stats, self.shapes)
+            holder = sub._holder
+            sub._run([(_ITEMS, holder, values, 0, 0, stats is not None)])
+            return holder.item
+        return sub._holder.item
+
+    def _merge_object(self, node: SchemaNode, value: dict, stack: list) -> None:
+        leaf = self.shapes.leaf
+        fields = node.fields
         for k, v in value.items():
-            node.fields[k] = infer_schema(v)
-        return node
-    return SchemaNode("variant")
+            child = fields.get(k)
+            ckind = _KINDS.get(type(v))
+            if child is None:
+                self._changes += 1
+                if ckind in _SCALARS:
+                    fields[k] = leaf(ckind)
+                else:
+                    # Placeholder keeps the field order
+                    fields[k] = None
+                    stack.append((_VALUE, node, k, v))
+            elif ckind in _SCALARS:
+                if ckind != child.kind:
+                    new = _SCALAR_MERGE.get((child.kind, ckind))
+                    if new is not None:
+                        fields[k] = leaf(new)
+                        self._changes += 1
+            elif child.kind != "variant":
+                stack.append((_VALUE, node, k, v))
+
+    def _run(self, stack: list) -> None:
+        stats = self.stats
+        leaf = self.shapes.leaf
+        while stack:
+            task = stack.pop()
+            tag = task[0]
+
+            if tag == _VALUE:
+                _, parent, key, value = task
+                vkind = _KINDS.get(type(value)) or _kind_of(value)
+                if vkind == "schema":
+                    stack.append((_SCHEMA, parent, key, value))
+                    continue
+                node = parent.item if key is None else parent.fields[key]
+                if node is None or (node.kind == "null" and vkind != "null"):
+                    node = self._build(value, vkind, stack)
+                    if key is None:
+                        parent.item = node
+                    else:
+                        parent.fields[key] = node
+                    continue
+                nkind = node.kind
+                if nkind == "variant" or vkind == "null":
+                    continue
+                if nkind == vkind:
+                    if vkind == "object":
+                        self._merge_object(node, value, stack)
+                    elif vkind == "array":
+                        if value:
+                            if node.item is None or node.item.kind != "variant":
+                                self._push_items(node, value, stack)
+                        elif node.item is None:
+                            node.item = leaf("null")
+                            self._changes += 1
+                    continue
+                if vkind in _SCALARS:
+                    new = _SCALAR_MERGE.get((nkind, vkind))
+                    if new is None:
+                        continue
+                    node = leaf(new)
+                else:
+                    node = leaf("variant")
+                self._changes += 1
+                if key is None:
+                    parent.item = node
+                else:
+                    parent.fields[key] = node
+
+            elif tag == _ITEMS:
+                _, node, values, i, before, counted = task
+                n = len(values)
+                if counted and i > 1:
+                    # Previous element was a container, now fully merged
+                    if self._changes != before:
+                        stats.elements_merged += 1
+                    else:
+                        stats.elements_absorbed += 1
+                while i < n:
+                    item = node.item
+                    if item is not None and item.kind == "variant":
+                        if counted:
+                            stats.elements_saturated += n - i
+                        break
+                    v = values[i]
+                    vkind = _KINDS.get(type(v))
+                    if vkind == "schema":
+                        memo = self._absorbed
+                        if memo[0] is not item or memo[1] != self._changes:
+                            memo = self._absorbed = (item, self._changes, {})
+                        absorbed = id(v) in memo[2]
+                        if not absorbed and item is not None and _schema_absorbs(item, v):
+                            absorbed = True
+                            memo[2][id(v)] = v
+                    else:
+                        absorbed = item is not None and vkind not in _SCALARS and _absorbs(item, v, self.sampling)
+                    if absorbed:
+                        # Read-only check first: in the steady state most
+                        # elements change nothing and no task is queued.
+                        if counted and i:
+                            stats.elements_absorbed += 1
+                        i += 1
+                        continue
+                    if item is None or vkind not in _SCALARS:
+                        stack.append((_ITEMS, node, values, i + 1, self._changes, counted))
+                        stack.append((_VALUE, node, None, v))
+                        break
+                    new = _SCALAR_MERGE.get((item.kind, vkind)) if vkind != item.kind else None
+                    if new is not None:
+                        node.item = leaf(new)
+                        self._changes += 1
+                    if counted and i:
+                        if new is not None:
+                            stats.elements_merged += 1
+                        else:
+                            stats.elements_absorbed += 1
+                    i += 1
+
+            else:  # _SCHEMA
+                _, parent, key, other = task
+                node = parent.item if key is None else parent.fields[key]
+                okind = other.kind
+                if node is None or (node.kind == "null" and okind != "null"):
+                    node = self._copy(other)
+                elif okind == "null" or node.kind == "variant":
+                    continue
+                elif node.kind == okind:
+                    if okind == "object":
+                        fields = node.fields
+                        for k, child in other.fields.items():
+                            if k in fields:
+                                stack.append((_SCHEMA, node, k, child))
+                            else:
+                                fields[k] = self._copy(child)
+                                self._changes += 1
+                    elif okind == "array" and other.item is not None:
+                        if node.item is None:
+                            node.item = self._copy(other.item)
+                            self._changes += 1
+                        else:
+                            stack.append((_SCHEMA, node, None, other.item))
+                    continue
+                elif (node.kind, okind) == ("number_real", "number_int"):
+                    continue
+                elif (node.kind, okind) == ("number_int", "number_real"):
+                    node = leaf("number_real")
+                else:
+                    node = leaf("variant")
+                self._changes += 1
+                if key is None:
+                    parent.item = node
+                else:
+                    parent.fields[key] = node
+
+
+def infer_schema(
+    value: Any,
+    sampling: Optional[SamplingOptions] = None,
+    stats: Optional[InferStats] = None,
+    shapes: Optional[ShapeTable] = None,
+) -> SchemaNode:
+    """
+    Schema of a parsed JSON value. Pass the same ShapeTable to several calls
+    to share shapes between their results.
+    """
+    acc = SchemaAccumulator(sampling, stats, shapes)
+    acc.add(value)
+    return acc.result()
@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+import gc
 import json
+import os
+import sys
 from dataclasses import dataclass
-from typing import Any, Optional
+from typing import Any, Callable, List, Optional, Tuple
+
+# Input files at least this large are decoded straight from a memory map
+MMAP_THRESHOLD = 1024 * 1024
 
 
 @dataclass(frozen=True)
@@ -22,20 +28,115 @@ class JsonParseError(ValueError):
         return s
 
 
-def parse_json(text: str) -> Any:
+def read_input(path: str) -> str:
+    """
+    Text of a UTF-8 JSON input file, or of stdin for "-".
+
+    Read as bytes and decoded once, with no newline translation. Files of
+    MMAP_THRESHOLD bytes or more (stdin included, when redirected from a
+    file) are decoded from a read-only memory map: only the decoded text
+    is allocated, not a bytes copy of the file as well.
+    """
+    if path == "-":
+        stdin = getattr(sys.stdin, "buffer", None)
+        if stdin is None:
+            return sys.stdin.read()
+        size = _regular_file_size(stdin)
+        if size is None or size < MMAP_THRESHOLD or stdin.tell() != 0:
+            return str(stdin.read(), "utf-8")
+        return _decode_mapped(stdin.fileno())
+    with open(path, "rb") as fp:
+        if os.fstat(fp.fileno()).st_size < MMAP_THRESHOLD:
+            return str(fp.read(), "utf-8")
+        return _decode_mapped(fp.fileno())
+
+
+def input_size(path: str) -> Optional[int]:
+    """
+    Size in bytes of an input file, or of stdin for "-" when it is redirected
+    from a file (None for pipes and terminals).
+    """
+    if path != "-":
+        return os.path.getsize(path)
+    return _regular_file_size(getattr(sys.stdin, "buffer", sys.stdin))
+
+
+def _regular_file_size(fp) -> Optional[int]:
+    import stat
+
+    try:
+        st = os.fstat(fp.fileno())
+    except (AttributeError, OSError, ValueError):
+        # In-memory streams (tests, embedding) have no file descriptor
+        return None
+    return st.st_size if stat.S_ISREG(st.st_mode) else None
+
+
+def _decode_mapped(fd: int) -> str:
+    import mmap
+
+    with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+        if hasattr(mmap, "MADV_SEQUENTIAL"):
+            # Read-ahead for the single front-to-back decoding pass
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+        return str(mm, "utf-8")
+
+
+def parse_json(
+    text: str,
+    line_offset: int = 0,
+    backend: str = "auto",
+    object_pairs_hook: Optional[Callable[[List[Tuple[str, Any]]], Any]] = None,
+    pause_gc: bool = False,
+) -> Any:
     """
     Parse JSON with friendlier errors (line/col + context snippet).
+    line_offset shifts reported line numbers when text is a slice of a larger
+    input (e.g. one JSON Lines record).
+    backend selects the decoder (see core.backends); whatever it is, values
+    and errors are those of the stdlib decoder.
+    object_pairs_hook is json.loads' (see core.compact); hooks need the
+    stdlib decoder, backend is then ignored.
+    pause_gc disables the cyclic GC while decoding (a decoded document holds
+    no reference cycles, collecting while it is allocated is wasted work)
+    and then restores its previous state. GC state is process-wide: only
+    single-threaded, one-shot callers (the CLI) should ask for it.
     """
+    from .backends import get_backend
+
+    loads = get_backend(backend)[1] if object_pairs_hook is None else None
+    gc_enabled = pause_gc and gc.isenabled()
+    if gc_enabled:
+        gc.disable()
+    try:
+        if loads is not None:
+            try:
+                return loads(text)
+            except Exception:
+                pass  # Rejected: the stdlib decoder decides, and reports errors
+        return _parse_stdlib(text, line_offset, object_pairs_hook)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def _parse_stdlib(text: str, line_offset: int, object_pairs_hook=None) -> Any:
     try:
-        return json.loads(text)
+        return json.loads(text, object_pairs_hook=object_pairs_hook)
     except json.JSONDecodeError as e:
-        snippet = _make_snippet(text, e.pos, e.lineno, e.colno)
+        lineno = e.lineno + line_offset
+        snippet = _make_snippet(text, e.pos, lineno, e.colno)
         raise JsonParseError(
             message=e.msg,
-            lineno=e.lineno,
+            lineno=lineno,
             colno=e.colno,
             snippet=snippet,
         ) from None
+    except RecursionError:
+        # The C decoder itself recurses per nesting level
+        raise JsonParseError(
+            message="Document is nested too deeply for the in-memory parser (use --stream)",
+        ) from None
 
 
 def pretty_json(value: Any) -> str:
@@ -53,10 +154,10 @@ def _make_snippet(text: str, pos: int, lineno: int, colno: int, radius: int = 60
     start = max(0, pos - radius)
     end = min(len(text), pos + radius)
 
-    segment = text[start:end]
-    segment = segment.replace("\r\n", "\n").replace("\r", "\n")
+    segment = _normalize_newlines(text[start:end])
 
-    caret_pos = pos - start
+    # Inputs keep their line endings: count the caret on normalized text too
+    caret_pos = len(_normalize_newlines(text[start:pos]))
     if caret_pos < 0:
         caret_pos = 0
     if caret_pos > len(segment):
@@ -68,3 +169,7 @@ def _make_snippet(text: str, pos: int, lineno: int, colno: int, radius: int = 60
 
     header = f"Near line {lineno}, col {colno}:"
     return f"{header}\n{segment}\n{caret_line}"
+
+
+def _normalize_newlines(s: str) -> str:
+    return s.replace("\r\n", "\n").replace("\r", "\n")
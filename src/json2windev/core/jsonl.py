@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Callable, Iterator, Optional, Tuple
+
+from .input import JsonParseError, parse_json
+from .infer import InferStats, SamplingOptions, SchemaAccumulator
+from .schema import SchemaNode
+
+
+@dataclass
+class JsonlStats:
+    records: int = 0
+    skipped: int = 0
+    bytes_read: int = 0
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        secs = self.seconds or 1e-9
+        return (
+            f"JSONL: {self.records} records ({self.skipped} skipped), "
+            f"{self.bytes_read / 1_000_000:.1f} MB in {self.seconds:.2f} s "
+            f"({self.records / secs:.0f} records/s, {self.bytes_read / 1_000_000 / secs:.1f} MB/s)"
+        )
+
+
+def iter_jsonl(
+    fp: BinaryIO,
+    skip_errors: bool = False,
+    on_error: Optional[Callable[[JsonParseError], None]] = None,
+    stats: Optional[JsonlStats] = None,
+    backend: str = "auto",
+) -> Iterator[Any]:
+    """
+    Yield one parsed value per non-blank line of a JSON Lines stream.
+    Parse errors carry the line number in the whole stream; with
+    skip_errors they are reported through on_error and the line is dropped.
+    """
+    stats = stats if stats is not None else JsonlStats()
+    for lineno, raw in enumerate(fp, start=1):
+        stats.bytes_read += len(raw)
+        if not raw.strip():
+            continue
+        try:
+            try:
+                text = raw.decode("utf-8").rstrip("\r\n")
+            except UnicodeDecodeError as e:
+                raise JsonParseError(message=f"Invalid UTF-8: {e.reason}", lineno=lineno, colno=e.start + 1) from None
+            value = parse_json(text, line_offset=lineno - 1, backend=backend)
+        except JsonParseError as e:
+            if not skip_errors:
+                raise
+            stats.skipped += 1
+            if on_error is not None:
+                on_error(e)
+            continue
+        stats.records += 1
+        yield value
+
+
+def infer_jsonl(
+    fp: BinaryIO,
+    skip_errors: bool = False,
+    on_error: Optional[Callable[[JsonParseError], None]] = None,
+    sampling: Optional[SamplingOptions] = None,
+    infer_stats: Optional[InferStats] = None,
+    backend: str = "auto",
+) -> Tuple[SchemaNode, JsonlStats]:
+    """
+    Fold every record of a JSON Lines stream into a single schema.
+    Only the running schema is kept, so memory does not grow with the record count.
+    """
+    stats = JsonlStats()
+    start = time.perf_counter()
+    # Records are merged in place into one evolving schema: a record whose
+    # shape is already known builds nothing.
+    acc = SchemaAccumulator(sampling, infer_stats)
+    for value in iter_jsonl(fp, skip_errors, on_error, stats, backend):
+        acc.add(value)
+    stats.seconds = time.perf_counter() - start
+    if not stats.records:
+        raise ValueError("No JSON records found in JSON Lines input.")
+    return acc.result(), stats
@@ -1,23 +1,94 @@
 from __future__ import annotations
-from .schema import SchemaNode
+from typing import List, Optional, Tuple
+from .schema import SchemaNode, leaf
+
+# (a, b, parent, key): merge a and b, then store the result in
+# parent.fields[key] (key is a str), parent.item (key is None) or return it
+# (parent is None).
+_Task = Tuple[SchemaNode, SchemaNode, Optional[SchemaNode], Optional[str]]
+
 
 def merge(a: SchemaNode, b: SchemaNode) -> SchemaNode:
+    result = a
+    stack: List[_Task] = [(a, b, None, None)]
+    while stack:
+        a, b, parent, key = stack.pop()
+        # Identical subtrees (shared or hash-consed nodes) merge to themselves
+        node = a if a is b else _merge_shallow(a, b, stack)
+        if parent is None:
+            result = node
+        elif key is None:
+            parent.item = node
+        else:
+            parent.fields[key] = node
+    return result
+
+
+def merge_into(a: SchemaNode, b: SchemaNode) -> SchemaNode:
+    """
+    Same result as merge(a, b), computed in place: a is updated and returned
+    (or replaced where a kind changes) and b's nodes are adopted.
+
+    Both trees must be private to the caller apart from the shared scalar
+    leaves, which are never modified; b must not be used afterwards.
+    """
+    result = a
+    stack: List[_Task] = [(a, b, None, None)]
+    while stack:
+        a, b, parent, key = stack.pop()
+        node = a if a is b else _merge_into_shallow(a, b, stack)
+        if parent is None:
+            result = node
+        elif key is None:
+            parent.item = node
+        else:
+            parent.fields[key] = node
+    return result
+
+
+def _merge_into_shallow(a: SchemaNode, b: SchemaNode, stack: List[_Task]) -> SchemaNode:
+    if a.kind == b.kind == "object":
+        fields = a.fields
+        for k, vb in b.fields.items():
+            if k in fields:
+                stack.append((fields[k], vb, a, k))
+            else:
+                fields[k] = vb
+        return a
+    if a.kind == b.kind == "array" and a.item is not None and b.item is not None:
+        stack.append((a.item, b.item, a, None))
+        return a
+    # Scalars and empty arrays: nothing to update in place
+    return _merge_shallow(a, b, stack)
+
+
+def _merge_shallow(a: SchemaNode, b: SchemaNode, stack: List[_Task]) -> SchemaNode:
+    """
+    Merge one level; nested merges are queued on stack and patched into the
+    returned node once computed.
+    """
     if a.kind == b.kind:
         if a.kind == "object":
             out = SchemaNode("object", fields=dict(a.fields))
+            fields = out.fields
             for k, vb in b.fields.items():
-                out.fields[k] = merge(out.fields[k], vb) if k in out.fields else vb
+                if k in fields:
+                    stack.append((fields[k], vb, out, k))
+                else:
+                    fields[k] = vb
             return out
         if a.kind == "array":
             if a.item is None: return b
             if b.item is None: return a
-            return SchemaNode("array", item=merge(a.item, b.item))
+            out = SchemaNode("array")
+            stack.append((a.item, b.item, out, None))
+            return out
         return a
 
     if "null" in {a.kind, b.kind}:
         return b if a.kind == "null" else a
 
     if {a.kind, b.kind} == {"number_int","number_real"}:
-        return SchemaNode("number_real")
+        return leaf("number_real")
 
-    return SchemaNode("variant")
+    return leaf("variant")
@@ -1,10 +1,110 @@
 from __future__ import annotations
-from dataclasses import dataclass, field
+import sys
+from dataclasses import dataclass
+from types import MappingProxyType
 from typing import Dict, Optional
 
-@dataclass
+# Shared read-only field mapping of every non-object node: leaves and
+# arrays don't carry a dict of their own.
+NO_FIELDS: Dict[str, "SchemaNode"] = MappingProxyType({})  # type: ignore[assignment]
+
+LEAF_KINDS = ("null", "boolean", "number_int", "number_real", "string", "variant")
+
+
+@dataclass(slots=True)
 class SchemaNode:
     kind: str
-    fields: Dict[str, "SchemaNode"] = field(default_factory=dict)
+    # None stands for NO_FIELDS: Python 3.11 dataclasses reject an
+    # unhashable default such as a mapping proxy
+    fields: Dict[str, "SchemaNode"] = None  # type: ignore[assignment]
     item: Optional["SchemaNode"] = None
     type_name: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        if self.fields is None or self.fields is NO_FIELDS:
+            self.fields = {} if self.kind == "object" else NO_FIELDS
+
+    def __reduce__(self):
+        # The shared read-only mapping can't be pickled
+        fields = None if self.fields is NO_FIELDS else self.fields
+        return _make_node, (self.kind, fields, self.item, self.type_name)
+
+
+def _make_node(kind: str, fields: Optional[Dict[str, SchemaNode]], item: Optional[SchemaNode], type_name: Optional[str]) -> SchemaNode:
+    return SchemaNode(kind, NO_FIELDS if fields is None else fields, item, type_name)
+
+
+# One shared node per scalar kind. Leaves are never mutated: a leaf whose
+# kind changes is replaced, so every schema can point to the same ones.
+_LEAVES = {kind: SchemaNode(kind) for kind in LEAF_KINDS}
+
+
+def leaf(kind: str) -> SchemaNode:
+    return _LEAVES[kind]
+
+
+def schema_equal(a: SchemaNode, b: SchemaNode) -> bool:
+    """
+    Structural equality (same as ==) without recursion, for deep schemas.
+    """
+    stack = [(a, b)]
+    while stack:
+        a, b = stack.pop()
+        if a is b:
+            continue
+        if a.kind != b.kind or a.type_name != b.type_name:
+            return False
+        if (a.item is None) != (b.item is None) or a.fields.keys() != b.fields.keys():
+            return False
+        if a.item is not None:
+            stack.append((a.item, b.item))
+        for k, child in a.fields.items():
+            stack.append((child, b.fields[k]))
+    return True
+
+
+@dataclass
+class SchemaFootprint:
+    nodes: int = 0          # size of the tree, shared subtrees counted at every occurrence
+    unique_nodes: int = 0   # distinct node objects
+    objects: int = 0
+    fields: int = 0
+    bytes: int = 0          # shallow sizes of the distinct nodes and their field dicts
+
+    def summary(self) -> str:
+        return (
+            f"Schema: {self.nodes} nodes ({self.unique_nodes} distinct, "
+            f"{self.objects} objects, {self.fields} fields), ~{self.bytes / 1024:.1f} KiB"
+        )
+
+
+def schema_footprint(root: SchemaNode) -> SchemaFootprint:
+    """
+    Node counts and approximate memory of a schema. Shared subtrees
+    (hash-consed shapes, scalar leaves) are sized once.
+    """
+    fp = SchemaFootprint()
+    # Tree size of each distinct node, filled in post-order
+    sizes: Dict[int, int] = {}
+    stack = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        children = list(node.fields.values())
+        if node.item is not None:
+            children.append(node.item)
+        if expanded:
+            sizes[id(node)] = 1 + sum(sizes[id(c)] for c in children)
+            continue
+        if id(node) in sizes:
+            continue
+        sizes[id(node)] = 0
+        fp.unique_nodes += 1
+        fp.bytes += sys.getsizeof(node)
+        if node.fields is not NO_FIELDS:
+            fp.objects += 1
+            fp.fields += len(node.fields)
+            fp.bytes += sys.getsizeof(node.fields)
+        stack.append((node, True))
+        stack.extend((c, False) for c in children)
+    fp.nodes = sizes[id(root)]
+    return fp
@@ -0,0 +1,115 @@
+from __future__ import annotations
+from typing import Dict, List, Set, Tuple
+from .schema import LEAF_KINDS, SchemaNode, leaf
+from .merge import merge as _merge
+
+
+class ShapeTable:
+    """
+    Hash-consing table for schema shapes.
+
+    Every node handed out is canonical: two canonical nodes are structurally
+    equal (same kind, same field order, same children) only if they are the
+    same object. A node's key is built from the ids of its canonical children,
+    so it plays the role of a Merkle hash computed once per distinct shape.
+
+    Merging two canonical nodes is memoized; merging a shape with itself is a
+    pointer comparison.
+
+    Canonical nodes are shared across the tree: they must not be mutated
+    (apart from type_name, set once by the naming stage).
+    """
+
+    def __init__(self) -> None:
+        self._canonical: Dict[tuple, SchemaNode] = {}
+        self._ids: Set[int] = set()
+        self._merged: Dict[Tuple[int, int], SchemaNode] = {}
+        self.merge_hits = 0
+        # Shared scalar leaves are the canonical ones
+        for kind in LEAF_KINDS:
+            self.intern(leaf(kind))
+
+    def __len__(self) -> int:
+        return len(self._canonical)
+
+    def leaf(self, kind: str) -> SchemaNode:
+        return leaf(kind)
+
+    def intern(self, node: SchemaNode) -> SchemaNode:
+        """
+        Canonical node for node's shape. Non-canonical nodes reachable from
+        node are adopted: their children are replaced in place by canonical
+        ones.
+        """
+        ids = self._ids
+        if id(node) in ids:
+            return node
+        table = self._canonical
+        item = node.item
+        if (item is None or id(item) in ids) and all(id(c) in ids for c in node.fields.values()):
+            # Children already canonical (the usual bottom-up case)
+            key = self._key(node)
+            canon = table.get(key)
+            if canon is None:
+                canon = table[key] = node
+                ids.add(id(node))
+            return canon
+
+        done: Dict[int, SchemaNode] = {}
+        stack: List[Tuple[SchemaNode, bool]] = [(node, False)]
+        while stack:
+            n, expanded = stack.pop()
+            if not expanded:
+                if id(n) in done:
+                    continue
+                stack.append((n, True))
+                for child in n.fields.values():
+                    if id(child) not in ids:
+                        stack.append((child, False))
+                if n.item is not None and id(n.item) not in ids:
+                    stack.append((n.item, False))
+                continue
+
+            fields = n.fields
+            for k, child in list(fields.items()):
+                if id(child) not in ids:
+                    fields[k] = done[id(child)]
+            if n.item is not None and id(n.item) not in ids:
+                n.item = done[id(n.item)]
+
+            key = self._key(n)
+            canon = table.get(key)
+            if canon is None:
+                canon = table[key] = n
+                ids.add(id(n))
+            done[id(n)] = canon
+        return done[id(node)]
+
+    @staticmethod
+    def _key(node: SchemaNode) -> tuple:
+        # Children are canonical: their ids stand for their whole shape
+        fields = node.fields
+        return (
+            node.kind,
+            node.type_name,
+            id(node.item) if node.item is not None else None,
+            tuple(fields),
+            tuple(map(id, fields.values())),
+        )
+
+    def merge(self, a: SchemaNode, b: SchemaNode) -> SchemaNode:
+        """
+        Same result as core.merge.merge, canonical and memoized.
+        """
+        a = self.intern(a)
+        b = self.intern(b)
+        if a is b:
+            return a
+        key = (id(a), id(b))
+        out = self._merged.get(key)
+        if out is None:
+            out = self._merged[key] = self.intern(_merge(a, b))
+        else:
+            self.merge_hits += 1
+        return out
+
@@ -0,0 +1,149 @@
+"""
+Schema snapshots (--save-schema / --load-schema): an inferred schema, type
+names included, stored in a small versioned JSON file, so that new samples
+can be merged into it without re-reading the old ones.
+
+Shared nodes (hash-consed shapes) are written once: the file lists the
+distinct object and array nodes, children first, and refers to them by
+index. Scalar leaves are referred to by their kind.
+
+    {"format": "json2windev-schema", "version": 1, "tool": "0.1.0",
+     "rules": "<fingerprint of the rules that named it, or null>", "root": 1,
+     "nodes": [["object", {"zip": "string"}, "STAddress"],
+               ["object", {"id": "number_int", "address": 0}, "STResult"]]}
+
+An object node is ["object", {key: ref}, type_name]; an array node is
+["array", item ref or null]. Type names depend on the rules (type
+prefix, result name): the file records which rules assigned them.
+"""
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .schema import LEAF_KINDS, SchemaNode, leaf
+
+SNAPSHOT_FORMAT = "json2windev-schema"
+SNAPSHOT_VERSION = 1
+
+Ref = Union[int, str]
+
+
+class SchemaFileError(ValueError):
+    pass
+
+
+@dataclass
+class Snapshot:
+    root: SchemaNode
+    # Fingerprint of the rules its type names were assigned with (None: unnamed)
+    rules_key: Optional[str] = None
+
+
+def schema_to_dict(root: SchemaNode, rules_key: Optional[str] = None) -> Dict[str, Any]:
+    from json2windev import __version__
+
+    index: Dict[int, int] = {}
+    nodes: List[list] = []
+
+    def ref(node: SchemaNode) -> Ref:
+        return node.kind if node.kind in LEAF_KINDS else index[id(node)]
+
+    # Post-order (explicit stack: schemas may be deeper than the recursion limit)
+    stack: List[Tuple[SchemaNode, bool]] = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if node.kind in LEAF_KINDS or id(node) in index:
+            continue
+        if not expanded:
+            stack.append((node, True))
+            if node.item is not None:
+                stack.append((node.item, False))
+            stack.extend((child, False) for child in reversed(node.fields.values()))
+            continue
+        if node.kind == "object":
+            entry: list = ["object", {k: ref(child) for k, child in node.fields.items()}, node.type_name]
+        else:
+            entry = [node.kind, None if node.item is None else ref(node.item)]
+        index[id(node)] = len(nodes)
+        nodes.append(entry)
+
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "tool": __version__,
+        "rules": rules_key,
+        "root": ref(root),
+        "nodes": nodes,
+    }
+
+
+def schema_from_dict(doc: Any) -> Snapshot:
+    if not isinstance(doc, dict) or doc.get("format") != SNAPSHOT_FORMAT:
+        raise SchemaFileError("Not a json2windev schema file")
+    if doc.get("version") != SNAPSHOT_VERSION:
+        raise SchemaFileError(f"Unsupported schema file version: {doc.get('version')} (expected {SNAPSHOT_VERSION})")
+
+    nodes: List[SchemaNode] = []
+
+    def resolve(ref: Any) -> SchemaNode:
+        if isinstance(ref, str) and ref in LEAF_KINDS:
+            return leaf(ref)
+        # Children come first: a reference can only point backwards
+        if type(ref) is int and 0 <= ref < len(nodes):
+            return nodes[ref]
+        raise SchemaFileError(f"Invalid node reference in schema file: {ref!r}")
+
+    try:
+        for entry in doc["nodes"]:
+            if entry[0] == "object":
+                node = SchemaNode("object", {str(k): resolve(r) for k, r in entry[1].items()}, type_name=entry[2])
+            elif entry[0] == "array":
+                node = SchemaNode("array", item=None if entry[1] is None else resolve(entry[1]))
+            else:
+                raise SchemaFileError(f"Unknown node kind in schema file: {entry[0]!r}")
+            nodes.append(node)
+        return Snapshot(resolve(doc["root"]), doc.get("rules"))
+    except (KeyError, IndexError, TypeError, AttributeError) as e:
+        raise SchemaFileError(f"Malformed schema file ({type(e).__name__}: {e})") from None
+
+
+def save_schema(root: SchemaNode, path: Union[str, Path], rules_key: Optional[str] = None) -> None:
+    """
+    Write root to path (replaced atomically: an interrupted run keeps the
+    previous snapshot). rules_key identifies the rules root was named with.
+    """
+    path = Path(path)
+    text = json.dumps(schema_to_dict(root, rules_key), ensure_ascii=False, separators=(",", ":"))
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(text + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def load_schema(path: Union[str, Path]) -> Snapshot:
+    try:
+        doc = json.loads(Path(path).read_bytes())
+    except ValueError as e:
+        raise SchemaFileError(f"{path}: not a json2windev schema file ({e})") from None
+    try:
+        return schema_from_dict(doc)
+    except SchemaFileError as e:
+        raise SchemaFileError(f"{path}: {e}") from None
+
+
+def merge_samples(stored: SchemaNode, new: SchemaNode) -> SchemaNode:
+    """
+    stored with the schema of new samples merged in (core.merge.merge), as
+    if all samples had been inferred at once. Type names are dropped: they
+    are assigned again over the merged schema.
+    """
+    from .merge import merge
+    from .shapes import ShapeTable
+    from .type_naming import clear_type_names
+
+    merged = merge(stored, new)
+    clear_type_names(merged)
+    return ShapeTable().intern(merged)
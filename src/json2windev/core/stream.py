@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import json
+import re
+from json.decoder import scanstring
+from typing import Iterator, List, Optional, TextIO, Tuple
+
+from .input import JsonParseError, _make_snippet
+from .merge import merge_into
+from .schema import SchemaNode, leaf
+from .shapes import ShapeTable
+
+# Files at least this large are inferred with the streaming engine by default.
+AUTO_STREAM_THRESHOLD = 64 * 1024 * 1024
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+# Parse events
+START_MAP = "start_map"
+MAP_KEY = "map_key"
+END_MAP = "end_map"
+START_ARRAY = "start_array"
+END_ARRAY = "end_array"
+SCALAR = "scalar"
+
+_WS = re.compile(r"[ \t\n\r]*").match
+_NUM_CHARS = re.compile(r"[0-9+\-.eE]*").match
+_NUMBER = re.compile(r"(-?(?:0|[1-9]\d*))(\.\d+)?([eE][-+]?\d+)?").match
+
+_CONSTANTS = (
+    ("null", "null"),
+    ("true", "boolean"),
+    ("false", "boolean"),
+    ("NaN", "number_real"),
+    ("Infinity", "number_real"),
+    ("-Infinity", "number_real"),
+)
+
+
+def _reports_trailing_comma() -> bool:
+    # Newer json versions report "Illegal trailing comma" at the comma itself.
+    try:
+        json.loads("[1,]")
+    except json.JSONDecodeError as e:
+        return e.msg.startswith("Illegal trailing comma")
+    return False
+
+
+_TRAILING_COMMA = _reports_trailing_comma()
+
+# Scanner states
+_VALUE, _VALUE_OR_END, _KEY, _KEY_OR_END, _AFTER_VALUE = range(5)
+
+
+class _Source:
+    """
+    Sliding text buffer over a stream.
+    Keeps enough bookkeeping to report absolute line/col on errors.
+    """
+
+    def __init__(self, fp: TextIO, chunk_size: int) -> None:
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.eof = False
+        self.lines = 0       # newlines dropped before buf[0]
+        self.offset = 0      # absolute position of buf[0]
+        self.line_start = 0  # absolute position of the line containing buf[0]
+
+    def fill(self, keep_from: int) -> int:
+        """
+        Drop everything before keep_from, append the next chunk.
+        Returns the new position of keep_from (always 0).
+        """
+        if keep_from:
+            dropped = self.buf[:keep_from]
+            n = dropped.count("\n")
+            if n:
+                self.lines += n
+                self.line_start = self.offset + dropped.rindex("\n") + 1
+            self.offset += keep_from
+            self.buf = self.buf[keep_from:]
+        chunk = self.fp.read(self.chunk_size)
+        if chunk:
+            self.buf += chunk
+        else:
+            self.eof = True
+        return 0
+
+    def error(self, message: str, pos: int) -> JsonParseError:
+        buf = self.buf
+        nl = buf.count("\n", 0, pos)
+        lineno = self.lines + nl + 1
+        if nl:
+            colno = pos - buf.rindex("\n", 0, pos)
+        else:
+            colno = self.offset + pos - self.line_start + 1
+        return JsonParseError(
+            message=message,
+            lineno=lineno,
+            colno=colno,
+            snippet=_make_snippet(buf, pos, lineno, colno),
+        )
+
+
+def iter_events(fp: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[str, Optional[str]]]:
+    """
+    Tokenize JSON incrementally from a text stream.
+
+    Yields (event, value) pairs:
+    - (START_MAP | END_MAP | START_ARRAY | END_ARRAY, None)
+    - (MAP_KEY, key)
+    - (SCALAR, kind) where kind is one of the SchemaNode scalar kinds
+
+    Accepts exactly what json.loads accepts and raises JsonParseError
+    with the same messages and line/col positions.
+    """
+    src = _Source(fp, chunk_size)
+    buf = src.buf
+    pos = 0
+
+    def skip_ws(pos: int) -> int:
+        nonlocal buf
+        while True:
+            pos = _WS(buf, pos).end()
+            if pos < len(buf) or src.eof:
+                return pos
+            pos = src.fill(pos)
+            buf = src.buf
+
+    def need(pos: int, n: int) -> int:
+        nonlocal buf
+        while len(buf) - pos < n and not src.eof:
+            pos = src.fill(pos)
+            buf = src.buf
+        return pos
+
+    def scan_string(pos: int) -> Tuple[str, int]:
+        nonlocal buf
+        search = pos + 1
+        while True:
+            q = buf.find('"', search)
+            if q == -1:
+                if src.eof:
+                    break
+                search -= pos
+                pos = src.fill(pos)
+                buf = src.buf
+                continue
+            b = q - 1
+            while buf[b] == "\\":
+                b -= 1
+            if (q - 1 - b) % 2 == 0:
+                break
+            search = q + 1
+        try:
+            return scanstring(buf, pos + 1, True)
+        except json.JSONDecodeError as e:
+            raise src.error(e.msg, e.pos) from None
+
+    def scan_scalar(pos: int) -> Tuple[str, int]:
+        nonlocal buf
+        c = buf[pos]
+        if c == '"':
+            return "string", scan_string(pos)[1]
+        if c in "ntfNI-":
+            pos = need(pos, 9)
+            for literal, kind in _CONSTANTS:
+                if buf.startswith(literal, pos):
+                    return kind, pos + len(literal)
+        while True:
+            end = _NUM_CHARS(buf, pos).end()
+            if end < len(buf) or src.eof:
+                break
+            pos = src.fill(pos)
+            buf = src.buf
+        m = _NUMBER(buf, pos)
+        if m is None:
+            raise src.error("Expecting value", pos)
+        kind = "number_real" if m.group(2) or m.group(3) else "number_int"
+        return kind, m.end()
+
+    pos = src.fill(0)
+    buf = src.buf
+    if buf.startswith("\ufeff"):
+        raise src.error("Unexpected UTF-8 BOM (decode using utf-8-sig)", 0)
+
+    stack: List[str] = []
+    state = _VALUE
+    while True:
+        pos = skip_ws(pos)
+        c = buf[pos] if pos < len(buf) else ""
+
+        if state == _VALUE:
+            if c == "{":
+                pos += 1
+                stack.append("{")
+                state = _KEY_OR_END
+                yield START_MAP, None
+                continue
+            if c == "[":
+                pos += 1
+                stack.append("[")
+                state = _VALUE_OR_END
+                yield START_ARRAY, None
+                continue
+            if not c:
+                raise src.error("Expecting value", pos)
+            kind, pos = scan_scalar(pos)
+            state = _AFTER_VALUE
+            yield SCALAR, kind
+
+        elif state == _VALUE_OR_END:
+            if c == "]":
+                pos += 1
+                stack.pop()
+                state = _AFTER_VALUE
+                yield END_ARRAY, None
+            else:
+                state = _VALUE
+
+        elif state == _KEY_OR_END:
+            if c == "}":
+                pos += 1
+                stack.pop()
+                state = _AFTER_VALUE
+                yield END_MAP, None
+            else:
+                state = _KEY
+
+        elif state == _KEY:
+            if c != '"':
+                raise src.error("Expecting property name enclosed in double quotes", pos)
+            key, pos = scan_string(pos)
+            pos = skip_ws(pos)
+            if buf[pos:pos + 1] != ":":
+                raise src.error("Expecting ':' delimiter", pos)
+            pos += 1
+            state = _VALUE
+            yield MAP_KEY, key
+
+        else:  # _AFTER_VALUE
+            if not stack:
+                if c:
+                    raise src.error("Extra data", pos)
+                return
+            top = stack[-1]
+            if c == ",":
+                comma = pos
+                while True:
+                    pos = _WS(buf, comma + 1).end()
+                    if pos < len(buf) or src.eof:
+                        break
+                    comma = src.fill(comma)
+                    buf = src.buf
+                if _TRAILING_COMMA and buf[pos:pos + 1] == ("}" if top == "{" else "]"):
+                    container = "object" if top == "{" else "array"
+                    raise src.error(f"Illegal trailing comma before end of {container}", comma)
+                state = _KEY if top == "{" else _VALUE
+            elif c == "}" and top == "{":
+                pos += 1
+                stack.pop()
+                yield END_MAP, None
+            elif c == "]" and top == "[":
+                pos += 1
+                stack.pop()
+                yield END_ARRAY, None
+            else:
+                raise src.error("Expecting ',' delimiter", pos)
+
+
+def infer_schema_stream(fp: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> SchemaNode:
+    """
+    Same result as infer_schema(parse_json(fp.read())), built directly from
+    parse events: memory stays proportional to the schema and nesting depth,
+    not to the document size.
+    """
+    # Object frames are [node, current_key], array frames are [item_or_None].
+    stack: List[list] = []
+    root: Optional[SchemaNode] = None
+    # Nodes are private to this walk until the end: array elements are
+    # folded into the frame's item in place and then dropped, so nothing is
+    # kept per element.
+
+    for event, value in iter_events(fp, chunk_size):
+        if event == MAP_KEY:
+            stack[-1][1] = value
+            continue
+        if event == START_MAP:
+            stack.append([SchemaNode("object"), None])
+            continue
+        if event == START_ARRAY:
+            stack.append([None])
+            continue
+
+        if event == SCALAR:
+            node = leaf(value)
+        elif event == END_MAP:
+            node = stack.pop()[0]
+        else:
+            item = stack.pop()[0]
+            node = SchemaNode("array", item=item if item is not None else leaf("null"))
+
+        if not stack:
+            root = node
+            continue
+        frame = stack[-1]
+        if len(frame) == 2:
+            frame[0].fields[frame[1]] = node
+        else:
+            frame[0] = node if frame[0] is None else merge_into(frame[0], node)
+
+    assert root is not None
+    return ShapeTable().intern(root)
@@ -1,33 +1,154 @@
 from __future__ import annotations
 
-from typing import Dict, List, Set
+import hashlib
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
 from json2windev.core.schema import SchemaNode
 from json2windev.rules.loader import Rules
 from json2windev.utils.naming import pascal_case
 
 
-def assign_type_names(root: SchemaNode, rules: Rules) -> None:
+@dataclass
+class NameMap:
+    """
+    Type names given by a previous run (--name-map), to keep them
+    stable: structure signature digest -> type name, and JSON path of a
+    structure's first occurrence -> type name (the name a structure keeps
+    when its signature changes).
+    """
+    names: Dict[str, str] = field(default_factory=dict)
+    paths: Dict[str, str] = field(default_factory=dict)
+
+    def record(self, signatures: List[Tuple[SchemaNode, str, str]]) -> None:
+        """
+        Replace the map with the names the structures of signatures (see
+        object_signatures) carry now.
+        """
+        self.names = {}
+        self.paths = {}
+        for node, digest, path in signatures:
+            if node.type_name is not None:
+                self.names.setdefault(digest, node.type_name)
+                self.paths[path] = node.type_name
+
+
+def object_signatures(root: SchemaNode) -> List[Tuple[SchemaNode, str, str]]:
+    """
+    (object node, signature digest, JSON path of its first occurrence) for
+    the distinct object nodes of root, in the pre-order assign_type_names
+    names them in.
+
+    The digest is that of the structural signature names are reused for
+    (sorted keys and child signatures, array items excluded), stable
+    across runs. A path is "/"-separated keys ("~" "/" "[" escaped as
+    "~0" "~1" "~2"), "[]" standing for "an item of": "/lines[]/address".
+    """
+    order: List[Tuple[SchemaNode, str]] = []
+    seen: Set[int] = set()
+    stack: List[Tuple[SchemaNode, str]] = [(root, "")]
+    while stack:
+        node, path = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        if node.kind == "object":
+            order.append((node, path))
+            for key, child in reversed(node.fields.items()):
+                stack.append((child, path + "/" + key.replace("~", "~0").replace("/", "~1").replace("[", "~2")))
+        elif node.kind == "array" and node.item is not None:
+            stack.append((node.item, path + "[]"))
+
+    # Children before parents: a DAG's pre-order reversed is not enough
+    # (a shared child is first met under its first parent), so post-order
+    digests: Dict[int, str] = {}
+    post: List[Tuple[SchemaNode, bool]] = [(node, False) for node, _ in reversed(order)]
+    while post:
+        node, expanded = post.pop()
+        if id(node) in digests:
+            continue
+        if not expanded:
+            post.append((node, True))
+            post.extend(
+                (child, False) for child in node.fields.values() if child.kind == "object" and id(child) not in digests
+            )
+            continue
+        pairs = sorted((k, digests.get(id(child), child.kind)) for k, child in node.fields.items())
+        digests[id(node)] = hashlib.blake2b(repr(pairs).encode("utf-8"), digest_size=12).hexdigest()
+    return [(node, digests[id(node)], path) for node, path in order]
+
+
+def assign_type_names(root: SchemaNode, rules: Rules, name_map: Optional[NameMap] = None) -> None:
     """
     Assigns .type_name on object nodes, deterministically.
     Single source of truth used by all renderers.
+
+    With name_map, a structure gets back the name its signature had in
+    the previous run, else the name its JSON path had, if free; names the
+    map holds for signatures still present are kept out of the fresh ones.
+    name_map is then updated to the names root carries.
     """
 
     if root.kind != "object":
         raise ValueError("Root JSON must be an object to assign WinDev type names.")
 
-    type_prefix: str = rules.structure["type_prefix"]
-    root_name: str = rules.result["type_name"]
+    type_prefix: str = rules.compiled.type_prefix
+    root_name: str = rules.compiled.result_type_name
 
     used_type_names: Set[str] = set()
-    sig_to_name: Dict[str, str] = {}
-
-    def node_signature(node: SchemaNode) -> str:
-        if node.kind != "object":
-            return node.kind
-        parts: List[str] = []
-        for k in sorted(node.fields.keys()):
-            parts.append(k + ":" + node_signature(node.fields[k]))
-        return "object{" + ",".join(parts) + "}"
+    sig_to_name: Dict[int, str] = {}
+    # Next numeric suffix to try per base name. Names are never released,
+    # so the search for a free "{base}{n}" resumes where it last stopped.
+    next_suffix: Dict[str, int] = {}
+
+    # Structural signatures as small ints: an object's signature is the
+    # sorted (key, child signature) pairs; any other node's is its kind
+    # (array items are not part of it). Cached per node, so each subtree is
+    # hashed once and hash-consed nodes share the work.
+    sig_ids: Dict[tuple, int] = {}
+    node_sigs: Dict[int, int] = {}
+
+    entries: List[Tuple[SchemaNode, str, str]] = []
+    # id(object node) -> (signature digest, JSON path), with name_map
+    signatures: Dict[int, Tuple[str, str]] = {}
+    # Names the previous run gave to signatures still present
+    reserved: Set[str] = set()
+    if name_map is not None:
+        entries = object_signatures(root)
+        signatures = {id(node): (digest, path) for node, digest, path in entries}
+        reserved = {name_map.names[d] for d, _ in signatures.values() if d in name_map.names}
+
+    def previous_name(node: SchemaNode) -> Optional[str]:
+        digest, path = signatures[id(node)]
+        name = name_map.names.get(digest)
+        if name is not None and name not in used_type_names:
+            return name
+        name = name_map.paths.get(path)
+        if name is not None and name not in used_type_names and name not in reserved:
+            return name
+        return None
+
+    def node_signature(node: SchemaNode) -> int:
+        sig = node_sigs.get(id(node))
+        if sig is not None:
+            return sig
+        # Post-order over nested objects (explicit stack, no recursion)
+        stack: List[Tuple[SchemaNode, bool]] = [(node, False)]
+        while stack:
+            n, expanded = stack.pop()
+            if id(n) in node_sigs:
+                continue
+            if n.kind != "object":
+                key: tuple = (n.kind,)
+            elif expanded:
+                key = tuple(sorted((k, node_sigs[id(child)]) for k, child in n.fields.items()))
+            else:
+                stack.append((n, True))
+                for child in n.fields.values():
+                    if id(child) not in node_sigs:
+                        stack.append((child, False))
+                continue
+            node_sigs[id(n)] = sig_ids.setdefault(key, len(sig_ids))
+        return node_sigs[id(node)]
 
     def unique_type_name(proposed: str, node: SchemaNode) -> str:
         sig = node_signature(node)
@@ -35,47 +156,86 @@ def assign_type_names(root: SchemaNode, rules: Rules) -> None:
         if sig in sig_to_name:
             return sig_to_name[sig]
 
-        base = proposed
-        name = base
-        n = 1
-        while name in used_type_names:
-            n += 1
-            name = f"{base}{n}"
+        name = previous_name(node) if name_map is not None else None
+        if name is None:
+            base = proposed
+            n = next_suffix.get(base, 1)
+            name = base if n == 1 else f"{base}{n}"
+            while name in used_type_names or name in reserved:
+                n += 1
+                name = f"{base}{n}"
+            next_suffix[base] = n
 
         used_type_names.add(name)
         sig_to_name[sig] = name
         return name
 
     def assign(node: SchemaNode, suggested: str) -> None:
-        if node.kind == "object":
-            if node.type_name is None:
-                node.type_name = unique_type_name(suggested, node)
-
-            # Recurse fields
-            for key, child in node.fields.items():
+        # Pre-order walk driven by an explicit stack. A field's suggestion
+        # depends on names given to earlier siblings' subtrees, so field
+        # tasks are resolved when popped, not when pushed.
+        stack: List[tuple] = [(node, suggested)]
+        while stack:
+            task = stack.pop()
+            if len(task) == 2:
+                node, suggested = task
+            else:
+                parent, key, child, parent_suggested = task
                 if child.kind == "object":
                     sugg = type_prefix + pascal_case(key)
-                    if sugg in used_type_names:
+                    if sugg in used_type_names or sugg in reserved:
                         # add parent context
-                        parent_base = node.type_name.replace(type_prefix, "")
+                        parent_base = parent.type_name.replace(type_prefix, "")
                         sugg = type_prefix + pascal_case(parent_base) + pascal_case(key)
-                    assign(child, sugg)
+                    node, suggested = child, sugg
 
                 elif child.kind == "array" and child.item is not None and child.item.kind == "object":
                     sugg = type_prefix + pascal_case(key) + "Item"
-                    if sugg in used_type_names:
-                        parent_base = node.type_name.replace(type_prefix, "")
+                    if sugg in used_type_names or sugg in reserved:
+                        parent_base = parent.type_name.replace(type_prefix, "")
                         sugg = type_prefix + pascal_case(parent_base) + pascal_case(key) + "Item"
-                    assign(child.item, sugg)
+                    node, suggested = child.item, sugg
 
                 elif child.kind == "array" and child.item is not None:
                     # recurse inside arrays even if scalar/variant (may contain nested arrays/objects)
-                    assign(child.item, suggested)
+                    node, suggested = child.item, parent_suggested
 
-        elif node.kind == "array" and node.item is not None:
-            assign(node.item, suggested)
+                else:
+                    continue
+
+            if node.kind == "object":
+                if node.type_name is None:
+                    node.type_name = unique_type_name(suggested, node)
+
+                # Fields, processed in order
+                for key, child in reversed(node.fields.items()):
+                    stack.append((node, key, child, suggested))
+
+            elif node.kind == "array" and node.item is not None:
+                stack.append((node.item, suggested))
 
     # Root
     root.type_name = root_name
     used_type_names.add(root_name)
     assign(root, root_name)
+    if name_map is not None:
+        name_map.record(entries)
+
+
+def clear_type_names(root: SchemaNode) -> None:
+    """
+    Forget the names given by assign_type_names, so that the same schema
+    can be named again with other rules.
+    """
+    seen: Set[int] = set()
+    stack: List[SchemaNode] = [root]
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        if node.kind == "object":
+            node.type_name = None
+            stack.extend(node.fields.values())
+        elif node.kind == "array" and node.item is not None:
+            stack.append(node.item)
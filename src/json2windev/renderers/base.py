@@ -1,11 +1,33 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
+from typing import Iterator, TextIO
 from json2windev.core.schema import SchemaNode
 from json2windev.rules.loader import Rules
+from .ir import RenderIR, build_ir
 
 class Renderer(ABC):
     def __init__(self, rules: Rules):
         self.rules = rules
+        self.compiled = rules.compiled
+
+    def render(self, root: SchemaNode) -> str:
+        return self.render_ir(build_ir(root, self.rules))
+
+    def render_ir(self, ir: RenderIR) -> str:
+        return "".join(self.iter_chunks(ir))
+
+    def render_to(self, root: SchemaNode, fp: TextIO) -> None:
+        """
+        Write the output to fp as it is produced, one structure (or table
+        row) at a time: the whole output text is never held. WinDev output
+        resolves one structure at a time; Markdown resolves them all first
+        for its summary (see RenderIR).
+        """
+        for chunk in self.iter_chunks(build_ir(root, self.rules)):
+            fp.write(chunk)
 
     @abstractmethod
-    def render(self, root: SchemaNode) -> str: ...
+    def iter_chunks(self, ir: RenderIR) -> Iterator[str]:
+        """
+        The output as consecutive text chunks, newlines included.
+        """
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Set, Tuple
+
+from json2windev.core.schema import SchemaNode
+from json2windev.core.type_naming import NameMap, assign_type_names
+from json2windev.rules.loader import Rules
+from json2windev.rules.models import CompiledRules
+from json2windev.utils.dedupe import NameRegistry
+
+if TYPE_CHECKING:
+    from json2windev.utils.metrics import Metrics
+
+
+@dataclass(slots=True)
+class FieldIR:
+    json_key: str
+    name: str          # WinDev field name, unique within its structure
+    base_name: str     # before de-duplication (dependency labels)
+    wd_type: str
+    serialize: str     # serialize attribute, "" when disabled
+
+
+@dataclass(slots=True)
+class StructureIR:
+    type_name: str
+    fields: List[FieldIR]
+
+
+@dataclass(frozen=True)
+class RenderIR:
+    """
+    Everything the renderers format, from one pass over the schema:
+    structures (children first, one per type name) with their fields'
+    names and types. Structures are resolved on use: iter_structures()
+    resolves one at a time (WinDev output holds one structure), the
+    structures list all of them (Markdown needs them all before its
+    summary). Structure dependencies and tree stats are derived from the
+    same traversal, on first use (WinDev output needs neither).
+    """
+    root_type: str
+    # Object nodes declaring a structure, children before parents
+    structure_nodes: List[SchemaNode] = field(repr=False)
+    compiled: CompiledRules = field(repr=False, compare=False)
+    # Distinct schema nodes, children before parents
+    nodes: List[SchemaNode] = field(repr=False, compare=False)
+    # (json key, kind) -> field name for this render
+    field_names: Dict[Tuple[str, str], str] = field(default_factory=dict, repr=False, compare=False)
+
+    def field_name(self, json_key: str, kind: str) -> str:
+        key = (json_key, kind)
+        name = self.field_names.get(key)
+        if name is None:
+            name = self.field_names[key] = self.compiled.field_name(json_key, kind)
+        return name
+
+    def iter_structures(self) -> Iterator[StructureIR]:
+        """
+        The structures resolved one at a time (nothing is kept, unless
+        the structures list was already built).
+        """
+        if "structures" in self.__dict__:
+            yield from self.structures
+            return
+        for node in self.structure_nodes:
+            yield _structure(node, self)
+
+    @cached_property
+    def structures(self) -> List[StructureIR]:
+        return list(self.iter_structures())
+
+    @cached_property
+    def max_depth(self) -> int:
+        heights: Dict[int, int] = {}
+        for node in self.nodes:
+            if node.kind == "object":
+                heights[id(node)] = max((1 + heights[id(child)] for child in node.fields.values()), default=0)
+            elif node.kind == "array" and node.item is not None:
+                heights[id(node)] = 1 + heights[id(node.item)]
+            else:
+                heights[id(node)] = 0
+        return heights[id(self.nodes[-1])]
+
+    @cached_property
+    def dependencies(self) -> Dict[Tuple[str, str, str], int]:
+        """
+        (parent type, field name, child type) -> occurrences in the document
+        tree: a structure nested under a repeated parent counts once per
+        parent occurrence.
+        """
+        # Reverse post-order visits parents first: occurrences flow downwards
+        occurrences: Dict[int, int] = {id(self.nodes[-1]): 1}
+        dependencies: Dict[Tuple[str, str, str], int] = {}
+        for node in reversed(self.nodes):
+            count = occurrences[id(node)]
+            if node.kind == "array":
+                if node.item is not None:
+                    occurrences[id(node.item)] = occurrences.get(id(node.item), 0) + count
+                continue
+            if node.kind != "object":
+                continue
+            for json_key, child in node.fields.items():
+                occurrences[id(child)] = occurrences.get(id(child), 0) + count
+                if child.kind == "object":
+                    target = child
+                elif child.kind == "array" and child.item is not None and child.item.kind == "object":
+                    target = child.item
+                else:
+                    continue
+                edge = (node.type_name or "STUnknown", self.field_name(json_key, child.kind), target.type_name or "STUnknown")
+                dependencies[edge] = dependencies.get(edge, 0) + count
+        return dependencies
+
+
+def build_ir(
+    root: SchemaNode, rules: Rules, metrics: Optional[Metrics] = None, name_map: Optional[NameMap] = None
+) -> RenderIR:
+    """
+    Assign type names (kept stable with name_map, see assign_type_names),
+    then resolve the render IR of root.
+
+    Hash-consed schemas share subtrees: each distinct node is visited once
+    (occurrences in the document tree are counted, not re-walked).
+    Structures and fields are only resolved by the renderers (see
+    RenderIR): the pass keeps one pointer per distinct node.
+    With metrics, naming is timed as the "names" stage and the structures
+    and fields emitted are counted.
+    """
+    if root.kind != "object":
+        raise ValueError("Root JSON must be an object to generate STResult.")
+
+    assign_type_names(root, rules, name_map)
+    if metrics is not None:
+        metrics.lap("names")
+    c = rules.compiled
+
+    # Post-order (children before parents) over distinct nodes, explicit stack
+    nodes: List[SchemaNode] = []
+    structure_nodes: List[SchemaNode] = []
+    declared: Set[str] = set()
+    seen: Set[int] = set()
+    stack: List[Tuple[SchemaNode, bool]] = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if expanded:
+            nodes.append(node)
+            if node.kind == "object" and node.type_name and node.type_name not in declared:
+                declared.add(node.type_name)
+                structure_nodes.append(node)
+            continue
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        stack.append((node, True))
+        if node.kind == "object":
+            for child in reversed(node.fields.values()):
+                stack.append((child, False))
+        elif node.kind == "array" and node.item is not None:
+            stack.append((node.item, False))
+
+    if metrics is not None:
+        metrics.count("structures", len(structure_nodes))
+        metrics.count("fields", sum(len(n.fields) for n in structure_nodes))
+    return RenderIR(root_type=root.type_name or "STUnknown", structure_nodes=structure_nodes, compiled=c, nodes=nodes)
+
+
+def _structure(node: SchemaNode, ir: RenderIR) -> StructureIR:
+    c = ir.compiled
+    field_name = ir.field_name
+    registry = NameRegistry()
+    fields: List[FieldIR] = []
+    for json_key, child in node.fields.items():
+        base_name = field_name(json_key, child.kind)
+        # Positional: this runs once per field of every structure
+        fields.append(FieldIR(json_key, registry.unique(base_name), base_name, c.wd_type(child), c.serialize_attribute_for(json_key)))
+    return StructureIR(type_name=node.type_name, fields=fields)
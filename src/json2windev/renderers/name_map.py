@@ -0,0 +1,168 @@
+"""
+Persisted name map (--name-map FILE): the type names of the last run,
+carried from run to run so that names stay put when the schema changes
+(core.type_naming.NameMap), with a content key per structure to tell
+which structures were added, removed, changed or renamed.
+
+    {"format": "json2windev-names", "version": 1, "tool": "0.1.0",
+     "rules": "<fingerprint of the rules>",
+     "names": {"<signature digest>": "STAddress"},
+     "paths": {"/address": "STAddress"},
+     "structures": {"STAddress": "<content key>"}}
+
+Names depend on the rules (type prefix, result name): the file records
+which rules gave them, and is started over for other rules.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from json2windev.core.type_naming import NameMap
+
+from .ir import RenderIR, StructureIR
+
+NAME_MAP_FORMAT = "json2windev-names"
+NAME_MAP_VERSION = 1
+
+
+class NameMapFileError(ValueError):
+    pass
+
+
+@dataclass
+class NameMapState:
+    # Fingerprint of the rules the names were given with
+    rules_key: Optional[str] = None
+    names: NameMap = field(default_factory=NameMap)
+    # Type name -> content key, for the structures of the last run
+    structures: Dict[str, str] = field(default_factory=dict)
+
+
+def structure_key(structure: StructureIR) -> str:
+    """
+    Digest of everything a structure is rendered from (name, fields, types).
+    """
+    content = (structure.type_name, [(f.json_key, f.name, f.wd_type, f.serialize) for f in structure.fields])
+    return hashlib.blake2b(repr(content).encode("utf-8"), digest_size=16).hexdigest()
+
+
+@dataclass
+class RenderChanges:
+    structures: int
+    # Same name, same content as in the previous run
+    unchanged: int
+    added: List[str]
+    removed: List[str]
+    changed: List[str]
+    # (old name, new name) of structures whose signature changed name
+    renamed: List[Tuple[str, str]]
+    # No previous run to compare with
+    first_run: bool = False
+
+    def summary(self) -> str:
+        if self.first_run:
+            return f"Name map: no previous run, {self.structures} structures named"
+        lines = [
+            f"Name map: {self.structures} structures, {self.unchanged} unchanged, {len(self.changed)} changed, "
+            f"{len(self.added)} added, {len(self.removed)} removed, {len(self.renamed)} renamed"
+        ]
+        for label, names in (("changed", self.changed), ("added", self.added), ("removed", self.removed)):
+            if names:
+                lines.append(f"  {label}: {', '.join(names)}")
+        if self.renamed:
+            lines.append(f"  renamed: {', '.join(f'{old} -> {new}' for old, new in self.renamed)}")
+        return "\n".join(lines)
+
+
+def update_state(state: NameMapState, names: NameMap, ir: RenderIR) -> RenderChanges:
+    """
+    Move state on to this run (names: the map assign_type_names started
+    from state.names and updated, ir: what was rendered with it) and tell
+    what changed since the previous one.
+    """
+    renamed = [
+        (old, names.names[digest])
+        for digest, old in state.names.names.items()
+        if digest in names.names and names.names[digest] != old
+    ]
+    old_names = {old for old, _ in renamed}
+    new_names = {new for _, new in renamed}
+    current = {s.type_name: structure_key(s) for s in ir.structures}
+    previous = state.structures
+    changes = RenderChanges(
+        structures=len(current),
+        unchanged=sum(1 for name, key in current.items() if previous.get(name) == key),
+        added=[name for name in current if name not in previous and name not in new_names],
+        removed=[name for name in previous if name not in current and name not in old_names],
+        changed=[name for name, key in current.items() if name in previous and previous[name] != key],
+        renamed=renamed,
+        first_run=not previous,
+    )
+    state.names = names
+    state.structures = current
+    return changes
+
+
+def state_to_dict(state: NameMapState) -> Dict[str, Any]:
+    from json2windev import __version__
+
+    return {
+        "format": NAME_MAP_FORMAT,
+        "version": NAME_MAP_VERSION,
+        "tool": __version__,
+        "rules": state.rules_key,
+        "names": state.names.names,
+        "paths": state.names.paths,
+        "structures": state.structures,
+    }
+
+
+def state_from_dict(doc: Any) -> NameMapState:
+    if not isinstance(doc, dict) or doc.get("format") != NAME_MAP_FORMAT:
+        raise NameMapFileError("Not a json2windev name map file")
+    if doc.get("version") != NAME_MAP_VERSION:
+        raise NameMapFileError(f"Unsupported name map file version: {doc.get('version')} (expected {NAME_MAP_VERSION})")
+    try:
+        return NameMapState(
+            rules_key=doc.get("rules"),
+            names=NameMap(_strings(doc["names"]), _strings(doc["paths"])),
+            structures=_strings(doc["structures"]),
+        )
+    except (KeyError, TypeError, AttributeError) as e:
+        raise NameMapFileError(f"Malformed name map file ({type(e).__name__}: {e})") from None
+
+
+def _strings(mapping: Any) -> Dict[str, str]:
+    if not all(isinstance(k, str) and isinstance(v, str) for k, v in mapping.items()):
+        raise TypeError("expected an object of strings")
+    return mapping
+
+
+def load_name_map(path: Union[str, Path]) -> NameMapState:
+    """
+    The state saved at path; an empty one when there is no file yet.
+    """
+    try:
+        raw = Path(path).read_bytes()
+    except FileNotFoundError:
+        return NameMapState()
+    try:
+        return state_from_dict(json.loads(raw))
+    except ValueError as e:
+        raise NameMapFileError(f"{path}: {e}") from None
+
+
+def save_name_map(state: NameMapState, path: Union[str, Path]) -> None:
+    """
+    Write state to path (replaced atomically, as schema snapshots are).
+    """
+    path = Path(path)
+    text = json.dumps(state_to_dict(state), ensure_ascii=False, separators=(",", ":"))
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(text + "\n", encoding="utf-8")
+    os.replace(tmp, path)
@@ -1,8 +1,10 @@
 from __future__ import annotations
+import copy
 from dataclasses import dataclass
+from functools import cached_property
 from pathlib import Path
-from typing import Any, Dict
-import yaml
+from typing import Any, Dict, Tuple
+from .models import CompiledRules
 
 class RulesError(ValueError):
     pass
@@ -31,14 +33,65 @@ class Rules:
     def generation(self): return self.raw.get("generation", {"order":"children_first"})
     @property
     def fmt(self): return self.raw["format"]
+    @property
+    def inference(self): return self.raw.get("inference", {})
+
+    @cached_property
+    def compiled(self) -> CompiledRules:
+        return CompiledRules.from_raw(self.raw)
+
+    def with_overrides(self, overrides: Dict[str, Dict[str, Any]]) -> "Rules":
+        """
+        Derived rules with some keys replaced, per section, e.g.
+        {"naming": {"serialize_attribute": False}}. self is left untouched.
+        """
+        raw = copy.deepcopy(self.raw)
+        for section, values in overrides.items():
+            raw[section] = {**raw.get(section, {}), **values}
+        return Rules(raw)
 
 REQUIRED_TOP_LEVEL = ["structure","result","types","array","naming","prefixes","format"]
 
+
+
 def load_rules(path: str | Path) -> Rules:
     path = Path(path)
     if not path.exists():
         raise RulesError(f"Rules file not found: {path}")
-    data = yaml.safe_load(path.read_text(encoding="utf-8"))
+    return _parse_rules(path.read_bytes())
+
+
+def load_rules_cached(path: str | Path, cache_dir: Path) -> Tuple[Rules, bool]:
+    """
+    load_rules through the per-user rules cache (the validated raw rules
+    are stored as JSON; compiled again on use). Returns (rules, served
+    from cache).
+    """
+    from json2windev.utils.cache import RulesCache, code_version
+
+    path = Path(path)
+    if not path.exists():
+        raise RulesError(f"Rules file not found: {path}")
+    raw, cached = RulesCache(cache_dir, code_version()).load(path, _build_cached_rules)
+    if cached:
+        # Entries are only data, but still outside our control
+        try:
+            _validate_rules(raw)
+        except (RulesError, LookupError, TypeError, AttributeError):
+            return load_rules(path), False
+    return Rules(raw), cached
+
+
+def _build_cached_rules(content: bytes) -> Dict[str, Any]:
+    return _parse_rules(content).raw
+
+
+def _parse_rules(content: bytes) -> Rules:
+    # PyYAML is only imported on a rules cache miss. libyaml's C loader when
+    # PyYAML was built with it (same results, much faster).
+    import yaml
+
+    data = yaml.load(content.decode("utf-8"), Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
     if not isinstance(data, dict):
         raise RulesError("Rules YAML must be a mapping (dict)")
     _validate_rules(data)
@@ -55,3 +108,11 @@ def _validate_rules(r: Dict[str, Any]) -> None:
     generic = r["array"].get("generic","")
     if "{item}" not in generic:
         raise RulesError("array.generic must contain '{item}' placeholder")
+    sampling = (r.get("inference") or {}).get("sampling") or {}
+    mode = sampling.get("mode", "off")
+    # An unquoted YAML `off` loads as False
+    if mode is not False and mode not in ("off", "first", "reservoir", "spread"):
+        raise RulesError("inference.sampling.mode must be one of: off, first, reservoir, spread")
+    size = sampling.get("size", 1000)
+    if not isinstance(size, int) or isinstance(size, bool) or size < 1:
+        raise RulesError("inference.sampling.size must be a positive integer")
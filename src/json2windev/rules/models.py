@@ -1 +1,127 @@
 # Rule models
+from __future__ import annotations
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Pattern
+
+from json2windev.core.schema import SchemaNode
+from json2windev.utils.naming import pascal_case, sanitize_identifier
+
+# Array items that map to a dedicated WinDev array type instead of wrapping
+# their own type into array.generic.
+_DIRECT_ARRAY_ITEMS = ("null", "variant", "string", "object")
+
+
+@dataclass(frozen=True)
+class CompiledRules:
+    """
+    Rules resolved once into what the renderers look up per field:
+    compiled forbidden-chars regex, uppercase reserved words, and
+    kind -> prefix / kind -> WinDev type tables.
+
+    Immutable (nothing is cached on it: a daemon keeps its rules for its
+    whole life) and picklable, so it can be shipped to batch worker
+    processes as is. field_name is pure; renders memoize it per render.
+    """
+    type_prefix: str
+    result_type_name: str
+    result_var_name: str
+    result_assignment: str
+    structure_keyword: str
+    structure_end: str
+    indent: str
+    blank_line_after_structure: bool
+    forbidden: Pattern[str]
+    reserved: FrozenSet[str]
+    escape_template: str
+    use_variable_prefixes: bool
+    serialize_attribute: bool
+    prefix_by_kind: Dict[str, str]
+    type_by_kind: Dict[str, str]
+    array_empty: str
+    array_string_plural: str
+    array_generic: str
+
+    @classmethod
+    def from_raw(cls, raw: Dict[str, Any]) -> "CompiledRules":
+        naming = raw["naming"]
+        p = raw["prefixes"]
+        t = raw["types"]
+        a = raw["array"]
+        fmt = raw["format"]
+        return cls(
+            type_prefix=raw["structure"]["type_prefix"],
+            result_type_name=raw["result"]["type_name"],
+            result_var_name=raw["result"]["var_name"],
+            result_assignment=raw["result"]["assignment"],
+            structure_keyword=raw["structure"]["keyword"],
+            structure_end=raw["structure"]["end"],
+            indent=fmt["indent"],
+            blank_line_after_structure=fmt.get("blank_line_after_structure", True),
+            forbidden=re.compile(naming.get("forbidden_chars", r"[^A-Za-z0-9_]")),
+            reserved=frozenset(w.upper() for w in naming.get("reserved_words", [])),
+            escape_template=naming.get("escape_reserved", "_{name}"),
+            use_variable_prefixes=naming.get("use_variable_prefixes", False),
+            serialize_attribute=naming.get("serialize_attribute", False),
+            prefix_by_kind={
+                "string": p["string"],
+                "boolean": p["boolean"],
+                "number_int": p["int"],
+                "number_real": p["real"],
+                "array": p["array"],
+                "object": p["structure"],
+                "null": p["variant"],
+                "variant": p["variant"],
+            },
+            type_by_kind={
+                "null": t["variant"],
+                "variant": t["variant"],
+                "string": t["string"],
+                "boolean": t["boolean"],
+                "number_int": t["int"],
+                "number_real": t["real"],
+            },
+            array_empty=a["empty"],
+            array_string_plural=a["string_plural"],
+            array_generic=a["generic"],
+        )
+
+    def field_name(self, json_key: str, kind: str) -> str:
+        if self.use_variable_prefixes:
+            prefix = self.prefix_by_kind.get(kind, self.prefix_by_kind["variant"])
+            name = prefix + pascal_case(sanitize_identifier(json_key, self.forbidden))
+        else:
+            name = sanitize_identifier(json_key, self.forbidden)
+        if name.upper() in self.reserved:
+            name = self.escape_template.format(name=name)
+        return name
+
+    def serialize_attribute_for(self, json_key: str) -> str:
+        return f'<serialize="{json_key}">' if self.serialize_attribute else ""
+
+    def wd_type(self, node: SchemaNode) -> str:
+        # Arrays of scalars/arrays wrap their item type: unwind the chain
+        # first, then wrap from the innermost type outwards.
+        depth = 0
+        while node.kind == "array" and node.item is not None and node.item.kind not in _DIRECT_ARRAY_ITEMS:
+            node = node.item
+            depth += 1
+        wd_type = self._wd_type_base(node)
+        for _ in range(depth):
+            item = wd_type.replace("un ", "").replace("une ", "")
+            wd_type = self.array_generic.format(item=item)
+        return wd_type
+
+    def _wd_type_base(self, node: SchemaNode) -> str:
+        kind = node.kind
+        if kind == "object":
+            return f"un {node.type_name}"
+        if kind == "array":
+            item = node.item
+            if item is None or item.kind in ("null", "variant"):
+                return self.array_empty
+            if item.kind == "string":
+                return self.array_string_plural
+            if item.kind == "object":
+                return self.array_generic.format(item=item.type_name)
+        return self.type_by_kind.get(kind, self.type_by_kind["variant"])
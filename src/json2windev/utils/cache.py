@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+
+def default_cache_dir() -> Path:
+    """
+    Per-user cache directory (JSON2WINDEV_CACHE_DIR overrides it).
+    """
+    env = os.environ.get("JSON2WINDEV_CACHE_DIR")
+    if env:
+        return Path(env)
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "json2windev"
+
+
+_code_version: Optional[str] = None
+
+
+def code_version() -> str:
+    """
+    Package version plus a fingerprint of its source files (path, mtime,
+    size): cache entries are keyed on it, so any edit or reinstall of the
+    code invalidates them even when __version__ is not bumped.
+    """
+    global _code_version
+    if _code_version is None:
+        from json2windev import __version__
+
+        package = Path(__file__).resolve().parents[1]
+        h = hashlib.sha256()
+        for dirpath, dirnames, filenames in os.walk(package):
+            dirnames[:] = sorted(d for d in dirnames if d != "__pycache__")
+            for name in sorted(filenames):
+                if name.endswith(".py"):
+                    st = os.stat(os.path.join(dirpath, name))
+                    rel = os.path.relpath(os.path.join(dirpath, name), package)
+                    h.update(f"{rel}\0{st.st_mtime_ns}\0{st.st_size}\n".encode("utf-8"))
+        _code_version = f"{__version__}+{h.hexdigest()[:16]}"
+    return _code_version
+
+
+def _atomic_write(entry: Path, data: bytes) -> None:
+    entry.parent.mkdir(parents=True, exist_ok=True)
+    # Write-then-rename so concurrent processes never see partial entries
+    fd, tmp = tempfile.mkstemp(dir=entry.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(data)
+        os.replace(tmp, entry)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+class RenderCache:
+    """
+    Content-addressed store of rendered outputs.
+
+    Entries are keyed by a hash of the input bytes and of everything else
+    that affects the output (see context). Least recently used entries are
+    evicted by prune() once the store exceeds max_bytes; an entry's mtime
+    is its last use.
+    """
+
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = Path(root) / "render"
+        self.max_bytes = max_bytes
+
+    def key(self, path: Path, context: bytes) -> str:
+        return self.keys(path, (context,))[0]
+
+    def keys(self, path: Path, contexts: Sequence[bytes]) -> List[str]:
+        """
+        One key per context for the same input, hashing the input once.
+        """
+        with open(path, "rb") as fp:
+            digest = hashlib.file_digest(fp, "sha256").digest()
+        return [hashlib.sha256(context + b"\0" + digest).hexdigest() for context in contexts]
+
+    def _entry(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entry(key)
+        try:
+            content = entry.read_bytes().decode("utf-8")
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        return content
+
+    def put(self, key: str, content: str) -> None:
+        _atomic_write(self._entry(key), content.encode("utf-8"))
+
+    def clear(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def prune(self) -> int:
+        """
+        Evict least recently used entries until the store fits in max_bytes.
+        Returns the number of evicted entries.
+        """
+        if not self.root.is_dir():
+            return 0
+        entries = []
+        total = 0
+        for sub in os.scandir(self.root):
+            if not sub.is_dir():
+                continue
+            for e in os.scandir(sub.path):
+                st = e.stat()
+                entries.append((st.st_mtime_ns, st.st_size, e.path))
+                total += st.st_size
+        if total <= self.max_bytes:
+            return 0
+        entries.sort()
+        evicted = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        return evicted
+
+
+class RulesCache:
+    """
+    Loaded rules files, stored as JSON one entry per rules path.
+
+    An entry is reused as is while the file's mtime and size are unchanged.
+    When they changed, the content hash decides (touch, checkout, copy
+    keep the entry); only a real edit runs build() again. Entries written
+    by other code (another code_version) are ignored.
+
+    Entries are plain data, never unpickled: the cache dir can be anywhere
+    (JSON2WINDEV_CACHE_DIR, --cache-dir), and a file planted there must not
+    run code. build() must return JSON data; values that do not survive a
+    JSON round trip unchanged are not cached.
+    """
+
+    def __init__(self, root: Path, version: str) -> None:
+        self.root = Path(root) / "rules"
+        self.version = version
+
+    def load(self, path: Path, build: Callable[[bytes], Any]) -> Tuple[Any, bool]:
+        """
+        Value for the rules file at path, and whether it came from the cache.
+        build(content) is called on a miss; its errors are not cached.
+        """
+        path = Path(path)
+        st = path.stat()
+        stamp = [st.st_mtime_ns, st.st_size]
+        entry = self.root / hashlib.sha256(str(path.resolve()).encode("utf-8")).hexdigest()
+
+        record = None
+        try:
+            record = json.loads(entry.read_bytes())
+            if not isinstance(record, dict) or record.get("version") != self.version:
+                record = None
+        except (OSError, ValueError):
+            # Missing, unreadable or stale entry: treated as a miss
+            record = None
+
+        if record is not None and record.get("stamp") == stamp:
+            return record["value"], True
+
+        content = path.read_bytes()
+        digest = hashlib.sha256(content).hexdigest()
+        if record is not None and record.get("digest") == digest:
+            value, hit = record["value"], True
+        else:
+            value, hit = build(content), False
+
+        try:
+            data = json.dumps({"version": self.version, "stamp": stamp, "digest": digest, "value": value}, ensure_ascii=False)
+            if json.loads(data)["value"] == value:
+                _atomic_write(entry, data.encode("utf-8"))
+        except (OSError, TypeError, ValueError):
+            pass
+        return value, hit
+
+    def clear(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
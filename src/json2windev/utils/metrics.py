@@ -0,0 +1,82 @@
+"""
+Run instrumentation (--timings / --metrics-json): wall time per stage and
+counters.
+
+Code paths take an optional Metrics and skip all bookkeeping when it is
+None, so a run without the flags pays one `is not None` test per stage.
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Dict
+
+
+class Metrics:
+    """
+    Wall time per stage (seconds, summed when a stage repeats) and integer
+    counters of one run, or of one file in batch mode.
+
+    Stages are timed as laps: lap(stage) charges the time elapsed since the
+    previous lap, minus what add() charged to other stages in between (time
+    spent writing while rendering streams its output, for instance).
+    """
+
+    def __init__(self) -> None:
+        self.start = self._last = time.perf_counter()
+        self._added = 0.0
+        self.stages: Dict[str, float] = {}
+        self.notes: Dict[str, str] = {}
+        self.counters: Dict[str, int] = {}
+
+    def lap(self, stage: str, note: str = "") -> None:
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + (now - self._last - self._added)
+        self._last = now
+        self._added = 0.0
+        if note:
+            self.notes[stage] = note
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+        self._added += seconds
+
+    def count(self, counter: str, n: int = 1) -> None:
+        self.counters[counter] = self.counters.get(counter, 0) + n
+
+    def total(self) -> float:
+        return time.perf_counter() - self.start
+
+    def merge(self, other: Dict[str, Any]) -> None:
+        """
+        Add the stages and counters of another run's to_dict() (batch files
+        are measured in workers and aggregated here).
+        """
+        for stage, ms in other["stages_ms"].items():
+            self.stages[stage] = self.stages.get(stage, 0.0) + ms / 1000
+        for counter, n in other["counters"].items():
+            self.count(counter, n)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total_ms": round(self.total() * 1000, 3),
+            "stages_ms": {stage: round(sec * 1000, 3) for stage, sec in self.stages.items()},
+            "notes": dict(self.notes),
+            "counters": dict(self.counters),
+        }
+
+    def summary(self, label: str = "Timings") -> str:
+        return summarize(self.to_dict(), label)
+
+
+def summarize(report: Dict[str, Any], label: str = "Timings") -> str:
+    """
+    One-line human summary of a Metrics.to_dict() report.
+    """
+    notes = report.get("notes", {})
+    parts = [f"{stage} {ms:.1f} ms" + (f" ({notes[stage]})" if stage in notes else "") for stage, ms in report["stages_ms"].items()]
+    if "total_ms" in report:
+        parts.append(f"total {report['total_ms']:.1f} ms")
+    s = f"{label}: " + ", ".join(parts)
+    if report["counters"]:
+        s += "; " + ", ".join(f"{counter} {n}" for counter, n in report["counters"].items())
+    return s
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Callable, List
+
+import pytest
+
+
+@pytest.fixture
+def run_cli(tmp_path: Path) -> Callable[[List[str]], subprocess.CompletedProcess]:
+    """
+    Run `python -m json2windev` with its own cache dir (tmp_path/"cache"):
+    the per-user cache would serve outputs of earlier runs.
+    """
+    cache_dir = tmp_path / "cache"
+
+    def run(args: List[str]) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [sys.executable, "-m", "json2windev", *args],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "JSON2WINDEV_CACHE_DIR": str(cache_dir)},
+        )
+
+    return run
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SUITE = ROOT / "benchmarks" / "suite.py"
+
+
+def suite(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, str(SUITE), *args], capture_output=True, text=True, cwd=ROOT)
+
+
+def test_run_writes_results_and_compare_flags_regressions(tmp_path: Path):
+    results = tmp_path / "results.json"
+    proc = suite("run", "--scale", "0.05", "--repeat", "1", "--corpus", "wide,batch", "--max-exponent", "10", "--out", str(results))
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+
+    report = json.loads(results.read_text(encoding="utf-8"))
+    assert set(report["results"]) == {"wide", "batch"}
+    wide = report["results"]["wide"]
+    assert wide["sizes"] == [200, 400, 800]
+    assert set(wide["stages"]) == {"parse", "infer", "compact", "names", "windev", "markdown"}
+    assert all(len(entry["seconds"]) == 3 and entry["peak_kib"] >= 0 for entry in wide["stages"].values())
+
+    assert suite("compare", str(results), str(results)).returncode == 0
+
+    # A baseline twice as fast (and half the memory) as the current results
+    faster = json.loads(results.read_text(encoding="utf-8"))
+    for corpus in faster["results"].values():
+        for entry in corpus["stages"].values():
+            entry["seconds"] = [s / 2 for s in entry["seconds"]]
+            entry["peak_kib"] //= 2
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(faster), encoding="utf-8")
+    proc = suite("compare", str(baseline), str(results))
+    assert proc.returncode == 1
+    assert "REGRESSION: batch/end_to_end" in proc.stdout
@@ -1,19 +1,9 @@
 from __future__ import annotations
 
-import subprocess
-import sys
 from pathlib import Path
 
 
-def run_cli(args: list[str]) -> subprocess.CompletedProcess:
-    return subprocess.run(
-        [sys.executable, "-m", "json2windev", *args],
-        capture_output=True,
-        text=True,
-    )
-
-
-def test_cli_batch_generates_outputs(tmp_path: Path):
+def test_cli_batch_generates_outputs(tmp_path: Path, run_cli):
     repo = Path(__file__).resolve().parents[1]
     in_dir = repo / "tests" / "fixtures" / "batch"
     out_dir = tmp_path / "out"
@@ -31,3 +21,20 @@ def test_cli_batch_generates_outputs(tmp_path: Path):
     r2 = run_cli([str(in_dir), "--output-dir", str(out_dir2), "--format", "markdown", "--continue-on-error"])
     assert r2.returncode in (0, 2)
     assert (out_dir2 / "ok.md").exists()
+
+
+def test_cli_batch_jobs_matches_serial_run(tmp_path: Path, run_cli):
+    repo = Path(__file__).resolve().parents[1]
+    in_dir = repo / "tests" / "fixtures" / "batch"
+
+    # --no-cache: both runs render (a cache hit would skip the workers)
+    args = ["--continue-on-error", "--no-cache"]
+    serial = run_cli([str(in_dir), "--output-dir", str(tmp_path / "serial"), *args])
+    parallel = run_cli([str(in_dir), "--output-dir", str(tmp_path / "jobs"), *args, "--jobs", "2"])
+
+    assert parallel.returncode == serial.returncode
+    assert parallel.stdout == serial.stdout
+    assert "Done. OK=1, FAIL=1" in parallel.stdout
+    assert (tmp_path / "jobs" / "ok.txt").read_text(encoding="utf-8") == (
+        tmp_path / "serial" / "ok.txt"
+    ).read_text(encoding="utf-8")
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+
+def test_cli_batch_reuses_cached_outputs(tmp_path: Path, run_cli):
+    repo = Path(__file__).resolve().parents[1]
+    in_dir = repo / "tests" / "fixtures" / "batch"
+    out_dir = tmp_path / "out"
+    args = [str(in_dir), "--output-dir", str(out_dir), "--continue-on-error"]
+
+    first = run_cli(args)
+    assert "[OK] ok.json\n" in first.stdout
+    assert "Cache: 0 of 1 files served from the cache" in first.stderr
+    expected = (out_dir / "ok.txt").read_text(encoding="utf-8")
+
+    (out_dir / "ok.txt").unlink()
+    second = run_cli(args)
+    assert second.stdout == first.stdout
+    assert "Cache: 1 of 1 files served from the cache" in second.stderr
+    assert (out_dir / "ok.txt").read_text(encoding="utf-8") == expected
+
+    # Rules overrides are part of the cache key
+    third = run_cli([*args, "--no-prefixes"])
+    assert "Cache: 0 of 1 files" in third.stderr
+
+    uncached = run_cli([*args, "--no-cache"])
+    assert uncached.stdout == first.stdout
+    assert "Cache:" not in uncached.stderr
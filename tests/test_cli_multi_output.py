@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from json2windev.app.cli import main
+
+REPO = Path(__file__).resolve().parents[1]
+RULES = REPO / "config" / "windev_rules.yaml"
+DOC = '{"id": 1, "owner": {"name": "x"}, "items": [{"sku": "a"}]}'
+
+
+@pytest.fixture
+def profiles(tmp_path: Path, monkeypatch) -> tuple[Path, Path]:
+    monkeypatch.setenv("JSON2WINDEV_CACHE_DIR", str(tmp_path / "cache"))
+    a = tmp_path / "a.yaml"
+    b = tmp_path / "b.yaml"
+    a.write_text(RULES.read_text(encoding="utf-8"), encoding="utf-8")
+    b.write_text(RULES.read_text(encoding="utf-8").replace("type_prefix: ST", "type_prefix: Z"), encoding="utf-8")
+    return a, b
+
+
+def run_single(doc: Path, rules: Path, fmt: str, out: Path) -> str:
+    main([str(doc), "--rules", str(rules), "--format", fmt, "-o", str(out), "--no-server"])
+    return out.read_text(encoding="utf-8")
+
+
+def test_one_inference_many_outputs(tmp_path: Path, profiles):
+    a, b = profiles
+    doc = tmp_path / "doc.json"
+    doc.write_text(DOC, encoding="utf-8")
+
+    main([str(doc), "--format", "windev,markdown", "--rules", str(a), "--rules", str(b), "-o", str(tmp_path / "res.txt")])
+
+    for rules in (a, b):
+        for fmt, ext in (("windev", ".txt"), ("markdown", ".md")):
+            written = (tmp_path / f"res.{rules.stem}{ext}").read_text(encoding="utf-8")
+            assert written == run_single(doc, rules, fmt, tmp_path / "single.out")
+    # Names were resolved again for the second rules set
+    assert "ZOwner est une structure" in (tmp_path / "res.b.txt").read_text(encoding="utf-8")
+
+
+def test_several_outputs_need_a_base_name(tmp_path: Path, profiles, capsys):
+    doc = tmp_path / "doc.json"
+    doc.write_text(DOC, encoding="utf-8")
+    with pytest.raises(SystemExit):
+        main([str(doc), "--format", "windev", "--format", "markdown"])
+    assert "several outputs need --output" in capsys.readouterr().err
+
+
+def test_batch_writes_every_format(tmp_path: Path, profiles, capsys):
+    in_dir = tmp_path / "in"
+    (in_dir / "sub").mkdir(parents=True)
+    (in_dir / "sub" / "doc.json").write_text(DOC, encoding="utf-8")
+    out_dir = tmp_path / "out"
+    args = [str(in_dir), "--output-dir", str(out_dir), "--format", "windev,markdown", "--rules", str(profiles[0])]
+
+    main(args)
+    assert "[OK] sub/doc.json\n" in capsys.readouterr().out.replace("\\", "/")
+    assert (out_dir / "sub" / "doc.txt").read_text(encoding="utf-8").startswith("STOwner")
+    assert (out_dir / "sub" / "doc.md").read_text(encoding="utf-8").startswith("# JSON")
+
+    main(args)
+    assert "Cache: 1 of 1 files served from the cache" in capsys.readouterr().err
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from json2windev.app import cli
+from json2windev.core.backends import JSON_BACKENDS
+from json2windev.core.infer import SAMPLING_MODES
+from json2windev.core.stream import AUTO_STREAM_THRESHOLD
+
+
+def imported_modules(args: list[str], tmp_path: Path) -> set[str]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "JSON2WINDEV_CACHE_DIR": str(tmp_path / "cache")},
+    )
+    assert proc.returncode == 0, proc.stderr
+    return {line.rsplit("|", 1)[1].strip() for line in proc.stderr.splitlines() if line.startswith("import time:")}
+
+
+def test_cli_import_is_lazy(tmp_path: Path):
+    modules = imported_modules(["-c", "import json2windev.app.cli"], tmp_path)
+    assert "json2windev.app.cli" in modules
+    assert "yaml" not in modules
+    assert "json2windev.renderers.windev" not in modules
+
+
+def test_pretty_and_validate_only_skip_rules_and_renderers(tmp_path: Path):
+    doc = tmp_path / "doc.json"
+    doc.write_text('{"a": [1, 2], "b": {"c": null}}', encoding="utf-8")
+    for flag in ("--pretty", "--validate-only"):
+        modules = imported_modules(["-m", "json2windev", str(doc), flag], tmp_path)
+        assert not {m for m in modules if m.startswith(("yaml", "json2windev.rules", "json2windev.renderers"))}, flag
+
+
+def test_cli_copies_of_core_constants():
+    assert cli._SAMPLING_MODES == SAMPLING_MODES
+    assert cli._JSON_BACKENDS == JSON_BACKENDS
+    assert cli._AUTO_STREAM_THRESHOLD == AUTO_STREAM_THRESHOLD
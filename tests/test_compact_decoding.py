@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import json
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from json2windev.app.cli import main
+from json2windev.core import compact
+from json2windev.core.compact import infer_compact
+from json2windev.core.infer import SamplingOptions, infer_schema
+from json2windev.core.input import JsonParseError, parse_json
+from json2windev.core.schema import schema_equal
+
+ROOT = Path(__file__).resolve().parents[1]
+RULES = str(ROOT / "config" / "windev_rules.yaml")
+
+RECORDS = [
+    {"id": i, "name": f"c{i}", "tags": ["a"] * (i % 3), "address": {"zip": "75001", "geo": [1.5, i]}, "notes": None if i % 4 else "vip"}
+    for i in range(50)
+]
+
+DOCS = [
+    {"customers": RECORDS},
+    RECORDS,
+    [[{"a": 1}], [{"b": None}, {"a": 2.5}], [], [[{"c": True}]]],
+    {"dup": 1, "x": {"y": []}, "dup": {"z": "s"}},
+    [None, {"a": 1}, None, 3],
+    {"empty": {}, "nested": [{}, {"k": {}}]},
+    "scalar",
+]
+
+SAMPLINGS = [None, SamplingOptions("spread", 10), SamplingOptions("reservoir", 5, escalate=True)]
+
+
+@pytest.mark.parametrize("sampling", SAMPLINGS)
+def test_compact_schema_matches_infer_schema(sampling):
+    for doc in DOCS:
+        text = json.dumps(doc)
+        assert schema_equal(infer_compact(text, sampling), infer_schema(parse_json(text), sampling)), text
+
+
+def test_nested_arrays_under_a_sampled_array():
+    # Every record's tags are decoded, only the first 10 records are sampled
+    text = json.dumps({"rows": [{"tags": list(range(20))}] * 99 + [{"tags": ["late"], "extra": True}]})
+    sampling = SamplingOptions("first", 10)
+    expected = infer_schema(parse_json(text), sampling)
+    assert "extra" not in expected.fields["rows"].item.fields
+    assert schema_equal(infer_compact(text, sampling), expected)
+
+
+def test_cli_compact_has_no_inference_counters(tmp_path: Path, capsys):
+    doc = tmp_path / "doc.json"
+    doc.write_text(json.dumps({"rows": [{"tags": list(range(20))}] * 100}), encoding="utf-8")
+    base = [str(doc), "--rules", RULES, "--no-server", "--no-cache", "--compact"]
+    main([*base, "-o", str(tmp_path / "out.txt"), "--sample", "first", "--sample-size", "10"])
+    assert "Sampling:" not in capsys.readouterr().err
+    with pytest.raises(SystemExit) as ex:
+        main([*base, "--infer-stats"])
+    assert ex.value.code == 2
+    assert "--infer-stats" in capsys.readouterr().err
+
+
+def test_duplicate_keys_keep_first_position_last_value():
+    schema = infer_compact('{"a": 1, "b": true, "a": "s"}')
+    assert list(schema.fields) == ["a", "b"]
+    assert schema.fields["a"].kind == "string"
+
+
+def test_signature_cache_starting_over_keeps_schemas(monkeypatch):
+    monkeypatch.setattr(compact, "CACHE_LIMIT", 2)
+    text = json.dumps({"customers": RECORDS})
+    assert schema_equal(infer_compact(text), infer_schema(parse_json(text)))
+
+
+def test_parse_errors_are_those_of_parse_json():
+    text = '{"a": [1, 2,]}'
+    with pytest.raises(JsonParseError) as expected:
+        parse_json(text, line_offset=2)
+    with pytest.raises(JsonParseError) as ex:
+        infer_compact(text, line_offset=2)
+    assert ex.value == expected.value
+
+
+def _peak(fn) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_records_are_not_kept_alive():
+    text = json.dumps([{"id": i, "name": f"customer {i}", "city": "Paris", "tags": ["b2b"]} for i in range(20000)])
+    # The parsed list of dicts, against one pointer per record
+    assert _peak(lambda: infer_compact(text)) * 5 < _peak(lambda: parse_json(text, backend="stdlib"))
+
+
+def test_cli_compact_renders_the_same_output(tmp_path: Path):
+    doc = tmp_path / "doc.json"
+    doc.write_text(json.dumps({"customers": RECORDS}), encoding="utf-8")
+    outputs = []
+    for flags in ([], ["--compact"]):
+        out = tmp_path / f"out{len(outputs)}.md"
+        main([str(doc), "--rules", RULES, "--format", "markdown", "--no-server", "--no-cache", "-o", str(out), *flags])
+        outputs.append(out.read_text(encoding="utf-8"))
+    assert outputs[0] == outputs[1]
@@ -0,0 +1,51 @@
+from pathlib import Path
+
+from json2windev.core.infer import infer_schema
+from json2windev.core.merge import merge
+from json2windev.rules.loader import load_rules
+from json2windev.renderers.markdown import MarkdownRenderer
+from json2windev.renderers.windev import WinDevRenderer
+
+DEPTH = 3000
+
+
+def _nested(depth):
+    # {"level": 0, "child0": {"level": 1, "child1": ... {"leaf": [[[1]]]}}}
+    value = {"leaf": [[[1]]]}
+    for i in reversed(range(depth)):
+        value = {"level": i, f"child{i}": value, "items": [{"id": i}]}
+    return value
+
+
+def test_deeply_nested_document_infers_and_renders():
+    repo = Path(__file__).resolve().parents[1]
+    rules = load_rules(repo / "config" / "windev_rules.yaml")
+
+    data = _nested(DEPTH)
+    schema = merge(infer_schema(data), infer_schema(data))
+
+    node = schema
+    for i in range(DEPTH):
+        assert list(node.fields) == ["level", f"child{i}", "items"]
+        node = node.fields[f"child{i}"]
+    assert node.fields["leaf"].item.item.item.kind == "number_int"
+
+    code = WinDevRenderer(rules).render(schema)
+    md = MarkdownRenderer(rules).render(schema)
+
+    # Children are declared before their parents
+    assert code.index("STChild2999 est") < code.index("STChild0 est") < code.index("STResult est")
+    assert "`STChild2999`" in md
+
+
+def test_deeply_nested_arrays():
+    value = [1]
+    for _ in range(DEPTH):
+        value = [value]
+    schema = infer_schema(value)
+    depth = 0
+    while schema.kind == "array":
+        schema = schema.item
+        depth += 1
+    assert depth == DEPTH + 1
+    assert schema.kind == "number_int"
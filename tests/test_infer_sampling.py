@@ -0,0 +1,43 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from json2windev.app.cli import main
+from json2windev.core.infer import InferStats, SamplingOptions, infer_schema
+
+
+def test_sampling_inspects_only_a_sample_and_flags_late_shapes():
+    data = [{"id": i} for i in range(5000)] + [{"id": 0, "late": True}]
+
+    stats = InferStats()
+    schema = infer_schema(data, SamplingOptions(mode="spread", size=90), stats)
+    assert list(schema.item.fields) == ["id", "late"]  # tail is part of the spread sample
+    assert stats.elements_inspected == 90
+    assert stats.elements_total == 5001
+    assert stats.unsettled_arrays == 1
+
+    stats = InferStats()
+    schema = infer_schema(data, SamplingOptions(mode="first", size=90), stats)
+    assert list(schema.item.fields) == ["id"]
+    assert stats.unsettled_arrays == 0
+
+
+def test_sampling_escalates_to_full_scan():
+    data = [{"k%d" % (i % 300): i} for i in range(3000)]
+
+    stats = InferStats()
+    schema = infer_schema(data, SamplingOptions(mode="reservoir", size=100, escalate=True), stats)
+    assert schema == infer_schema(data)
+    assert stats.escalations == 1
+    assert stats.elements_inspected == 3000
+
+
+@pytest.mark.parametrize("size", ["0", "-2", "x"])
+def test_cli_rejects_sample_sizes_below_one(tmp_path: Path, capsys, size):
+    doc = tmp_path / "doc.json"
+    doc.write_text(json.dumps({"values": list(range(20))}), encoding="utf-8")
+    with pytest.raises(SystemExit) as ex:
+        main([str(doc), "--sample", "first", "--sample-size", size, "--no-server", "--no-cache"])
+    assert ex.value.code == 2
+    assert "--sample-size" in capsys.readouterr().err
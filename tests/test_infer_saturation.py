@@ -0,0 +1,25 @@
+from json2windev.core.infer import InferStats, infer_schema
+from json2windev.core.merge import merge
+
+
+def _pairwise_fold(values):
+    item = infer_schema(values[0])
+    for v in values[1:]:
+        item = merge(item, infer_schema(v))
+    return item
+
+
+def test_fast_paths_keep_output_and_count_avoided_work():
+    homogeneous = [{"id": i, "tags": ["a"], "p": {"x": 1.5, "y": None}} for i in range(100)]
+    homogeneous.append({"id": 1.5, "extra": []})
+    heterogeneous = [1, "x"] + [{"a": i} for i in range(50)]
+
+    stats = InferStats()
+    schema = infer_schema({"h": homogeneous, "v": heterogeneous}, stats=stats)
+
+    assert schema.fields["h"].item == _pairwise_fold(homogeneous)
+    assert list(schema.fields["h"].item.fields) == ["id", "tags", "p", "extra"]
+    assert schema.fields["v"].item.kind == "variant"
+    assert stats.elements_absorbed == 99
+    assert stats.elements_merged == 2
+    assert stats.elements_saturated == 50
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import io
+from pathlib import Path
+
+import pytest
+
+from json2windev.core import input as json_input
+from json2windev.core.input import JsonParseError, input_size, parse_json, read_input
+
+DOC = '{\r\n  "name": "Élodie",\r\n  "tags": ["a", "b"]\r\n}\r\n'
+
+
+def test_memory_mapped_and_plain_reads_agree(tmp_path: Path, monkeypatch):
+    path = tmp_path / "doc.json"
+    path.write_bytes(DOC.encode("utf-8"))
+
+    plain = read_input(str(path))
+    monkeypatch.setattr(json_input, "MMAP_THRESHOLD", 1)
+    mapped = read_input(str(path))
+
+    # No newline translation: the text is the file's exact content
+    assert plain == mapped == DOC
+    assert parse_json(mapped) == {"name": "Élodie", "tags": ["a", "b"]}
+
+
+def test_stdin_is_read_as_bytes(monkeypatch):
+    monkeypatch.setattr("sys.stdin", io.TextIOWrapper(io.BytesIO(DOC.encode("utf-8")), encoding="latin-1"))
+    assert input_size("-") is None
+    assert read_input("-") == DOC
+
+
+def test_stdin_redirected_from_a_file_is_memory_mapped(tmp_path: Path, monkeypatch):
+    path = tmp_path / "doc.json"
+    path.write_bytes(DOC.encode("utf-8"))
+    monkeypatch.setattr(json_input, "MMAP_THRESHOLD", 1)
+    with open(path, encoding="utf-8") as fp:
+        monkeypatch.setattr("sys.stdin", fp)
+        assert input_size("-") == len(DOC.encode("utf-8"))
+        assert read_input("-") == DOC
+
+
+def test_snippet_caret_on_crlf_input():
+    bad = '{\r\n  "a": 1,\r\n  "b": }\r\n'
+    with pytest.raises(JsonParseError) as ex:
+        parse_json(bad)
+    err = ex.value
+    assert (err.lineno, err.colno) == (3, 8)
+    # The caret line indexes the (newline-normalized) segment above it
+    _, rest = err.snippet.split("\n", 1)
+    segment, caret = rest.rsplit("\n", 1)
+    assert "\r" not in segment
+    assert segment[caret.index("^")] == "}"
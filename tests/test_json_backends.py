@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import gc
+import importlib.util
+
+import pytest
+
+from json2windev.core import backends
+from json2windev.core.backends import get_backend
+from json2windev.core.infer import infer_schema
+from json2windev.core.input import JsonParseError, parse_json
+
+INSTALLED = ["stdlib", "auto"] + [name for name in ("msgspec",) if importlib.util.find_spec(name)]
+
+# Values the fast decoders reject or type differently from json.loads
+TRICKY = [
+    '{"id": 1, "ratio": 1.0, "big": 123456789012345678901234567890, "exp": 1e5}',
+    '{"huge": 18446744073709551616, "neg": -0, "negf": -0.0}',
+    '{"nan": NaN, "inf": Infinity, "over": 1E400}',
+    '{"lone": "\\ud800", "dup": 1, "dup": 2.5}',
+    "[" * 500 + "]" * 500,
+]
+
+INVALID = ['{"a": 1,}', "[1 2]", '{"a": "\t"}', "", "﻿{}", "[" * 100000]
+
+
+@pytest.mark.parametrize("backend", INSTALLED)
+def test_values_and_kinds_match_stdlib(backend):
+    for text in TRICKY:
+        expected = parse_json(text, backend="stdlib")
+        value = parse_json(text, backend=backend)
+        assert repr(value) == repr(expected)
+        if isinstance(expected, dict):
+            assert infer_schema(value) == infer_schema(expected)
+
+
+@pytest.mark.parametrize("backend", INSTALLED)
+def test_errors_match_stdlib(backend):
+    for text in INVALID:
+        with pytest.raises(JsonParseError) as expected:
+            parse_json(text, backend="stdlib")
+        with pytest.raises(JsonParseError) as ex:
+            parse_json(text, line_offset=4, backend=backend)
+        e, x = expected.value, ex.value
+        assert (x.message, x.colno, x.snippet) == (e.message, e.colno, e.snippet and e.snippet.replace(f"line {e.lineno},", f"line {e.lineno + 4},"))
+        assert x.lineno == (None if e.lineno is None else e.lineno + 4)
+
+
+def test_collector_is_only_paused_on_request():
+    seen = []
+
+    def hook(pairs):
+        seen.append(gc.isenabled())
+        return dict(pairs)
+
+    parse_json('{"a": {}}', object_pairs_hook=hook)
+    assert seen == [True, True]
+    parse_json('{"a": {}}', object_pairs_hook=hook, pause_gc=True)
+    assert seen[2:] == [False, False] and gc.isenabled()
+
+    # A collector the caller disabled stays disabled
+    gc.disable()
+    try:
+        parse_json('{"a": [1, 2]}', pause_gc=True)
+        assert not gc.isenabled()
+    finally:
+        gc.enable()
+
+
+def test_unknown_and_missing_backends(monkeypatch):
+    with pytest.raises(ValueError, match="Unknown JSON backend"):
+        get_backend("simdjson")
+
+    def missing():
+        raise ImportError
+
+    monkeypatch.setitem(backends._LOADERS, "msgspec", missing)
+    get_backend.cache_clear()
+    try:
+        with pytest.raises(ValueError, match="not installed"):
+            get_backend("msgspec")
+        assert get_backend("auto") == ("stdlib", None)
+    finally:
+        get_backend.cache_clear()
@@ -0,0 +1,27 @@
+import io
+
+import pytest
+
+from json2windev.core.input import JsonParseError
+from json2windev.core.jsonl import infer_jsonl
+
+RECORDS = b'{"id": 1, "name": "a"}\n\n{"id": 2.5, "tags": ["x"]}\n{"id": 3,}\n{"id": null}\n'
+
+
+def test_jsonl_records_merge_into_one_schema():
+    skipped = []
+    schema, stats = infer_jsonl(io.BytesIO(RECORDS), skip_errors=True, on_error=skipped.append)
+
+    assert list(schema.fields) == ["id", "name", "tags"]
+    assert schema.fields["id"].kind == "number_real"
+    assert stats.records == 3
+    assert stats.skipped == 1
+    assert stats.bytes_read == len(RECORDS)
+    assert [e.lineno for e in skipped] == [4]
+
+
+def test_jsonl_parse_error_reports_stream_line():
+    with pytest.raises(JsonParseError) as ex:
+        infer_jsonl(io.BytesIO(RECORDS))
+    assert ex.value.lineno == 4
+    assert ex.value.colno is not None
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import io
+import json
+import sys
+from pathlib import Path
+
+from json2windev.app.cli import main
+from json2windev.utils.metrics import Metrics, summarize
+
+ROOT = Path(__file__).resolve().parents[1]
+RULES = str(ROOT / "config" / "windev_rules.yaml")
+DOC = '{"id": 1, "owner": {"name": "a"}, "items": [{"n": 1}, {"n": 2}]}'
+
+
+def test_lap_excludes_time_added_to_other_stages():
+    m = Metrics()
+    m.add("write", 10.0)
+    m.lap("render", "streamed")
+    m.count("outputs")
+    m.count("outputs")
+    assert m.stages["write"] == 10.0
+    assert m.stages["render"] < 0  # the added time is not charged twice
+    assert m.counters == {"outputs": 2}
+    assert "render" in summarize(m.to_dict()) and "(streamed)" in m.summary()
+
+
+def test_metrics_json_single_file(tmp_path: Path, capsys):
+    doc = tmp_path / "doc.json"
+    doc.write_text(DOC, encoding="utf-8")
+    out = tmp_path / "out.txt"
+    report_path = tmp_path / "metrics.json"
+    main([str(doc), "--rules", RULES, "--no-server", "--no-cache", "-o", str(out), "--metrics-json", str(report_path)])
+
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    assert {"rules", "read", "parse", "infer", "names", "render", "write"} <= set(report["stages_ms"])
+    counters = report["counters"]
+    assert counters["bytes_read"] == len(DOC)
+    assert counters["bytes_written"] == out.stat().st_size
+    assert counters["structures"] == 3 and counters["outputs"] == 1
+    assert counters["nodes"] > 0 and counters["elements_absorbed"] == 1
+    # --metrics-json alone prints nothing
+    assert "Timings" not in capsys.readouterr().err
+
+
+
+def test_bytes_read_of_a_piped_input(tmp_path: Path, monkeypatch):
+    data = '{"nom": "é€", "n": 1}'.encode("utf-8")
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BytesIO(data), encoding="utf-8"))
+    report_path = tmp_path / "metrics.json"
+    main(["-", "--rules", RULES, "--no-cache", "-o", str(tmp_path / "out.txt"), "--metrics-json", str(report_path)])
+    assert json.loads(report_path.read_text(encoding="utf-8"))["counters"]["bytes_read"] == len(data)
+
+
+def test_metrics_per_file_and_total_in_batch(tmp_path: Path, capsys):
+    src = tmp_path / "in"
+    (src / "sub").mkdir(parents=True)
+    (src / "a.json").write_text(DOC, encoding="utf-8")
+    (src / "sub" / "b.json").write_text('{"x": [1, 2.5]}', encoding="utf-8")
+    report_path = tmp_path / "metrics.json"
+    main([str(src), "--rules", RULES, "--output-dir", str(tmp_path / "out"), "--no-cache", "--timings", "--metrics-json", str(report_path)])
+
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    assert set(report["files"]) == {"a.json", "sub/b.json"}
+    assert "batch" in report["stages_ms"]
+    total = report["files_total"]["counters"]
+    assert total["bytes_read"] == sum(f["counters"]["bytes_read"] for f in report["files"].values())
+    assert total["outputs"] == 2
+
+    err = capsys.readouterr().err
+    assert "Timings sub/b.json:" in err and "Timings all 2 files:" in err and "Timings: rules" in err
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from json2windev.app.cli import main
+from json2windev.core.infer import infer_schema
+from json2windev.core.type_naming import NameMap, assign_type_names
+from json2windev.renderers.ir import build_ir
+from json2windev.renderers.name_map import NameMapFileError, NameMapState, load_name_map, update_state
+from json2windev.rules.loader import load_rules
+
+ROOT = Path(__file__).resolve().parents[1]
+RULES = str(ROOT / "config" / "windev_rules.yaml")
+
+V1 = {"a": {"item": {"x": 1}}, "b": {"item": {"y": "s"}}, "lines": [{"sku": "a"}], "billing": {"zip": "1"}}
+V2 = {"a": {"item": {"x": 1, "z": True}}, "b": {"item": {"y": "s"}}, "lines": [{"sku": "a", "qty": 2}], "billing": {"zip": "1"}}
+V3 = {"b": {"item": {"y": "s"}}, "lines": [{"sku": "a", "qty": 2}], "billing": {"zip": "1"}, "extra": {"k": 1}}
+
+
+def _names(doc: dict, name_map: NameMap | None = None) -> dict:
+    schema = infer_schema(doc)
+    assign_type_names(schema, load_rules(RULES), name_map)
+    return {k: (v.item if v.kind == "array" else v).type_name for k, v in schema.fields.items()} | {
+        f"{k}.item": v.fields["item"].type_name for k, v in schema.fields.items() if k in ("a", "b")
+    }
+
+
+def _recorded(doc: dict) -> NameMap:
+    name_map = NameMap()
+    assign_type_names(infer_schema(doc), load_rules(RULES), name_map)
+    return name_map
+
+
+def test_empty_map_names_as_without_one():
+    assert _names(V1, NameMap()) == _names(V1) == {
+        "a": "STA",
+        "b": "STB",
+        "lines": "STLinesItem",
+        "billing": "STBilling",
+        "a.item": "STItem",
+        "b.item": "STBItem",
+    }
+
+
+def test_names_stay_put_when_other_structures_change():
+    # Without the map, b.item would take the name a.item leaves free
+    assert _names(V3)["b.item"] == "STItem"
+    assert _names(V3, _recorded(V1))["b.item"] == "STBItem"
+
+
+def test_changed_structure_keeps_the_name_of_its_place():
+    names = _names(V2, _recorded(V1))
+    assert names["a.item"] == "STItem" and names["lines"] == "STLinesItem"
+
+
+def test_names_of_present_signatures_are_not_given_to_new_structures():
+    name_map = _recorded({"other": {"item": {"w": 1}}, "b": {"item": {"y": "s"}}})
+    assert "STItem" in name_map.names.values()
+    # "STItem" belongs to other.item (still present): the new a.item is named around it
+    doc = {"a": {"item": {"x": 1}}, "other": {"item": {"w": 1}}}
+    schema = infer_schema(doc)
+    assign_type_names(schema, load_rules(RULES), name_map)
+    assert schema.fields["other"].fields["item"].type_name == "STItem"
+    assert schema.fields["a"].fields["item"].type_name == "STAItem"
+
+
+def test_changes_are_told_by_structure_content():
+    rules = load_rules(RULES)
+    state = NameMapState()
+    for doc in (V1, V2):
+        names = NameMap(state.names.names, state.names.paths)
+        changes = update_state(state, names, build_ir(infer_schema(doc), rules, name_map=names))
+    # STA's field still reads "un STItem": STA is unchanged
+    assert changes.changed == ["STItem", "STLinesItem"]
+    assert (changes.structures, changes.unchanged, changes.added, changes.removed) == (7, 5, [], [])
+
+
+def test_moved_structure_keeps_its_name():
+    rules = load_rules(RULES)
+    state = NameMapState()
+    # The same shape under "a", then under "c": its signature keeps STA
+    for doc in ({"a": {"x": 1}}, {"c": {"x": 1}}):
+        names = NameMap(state.names.names, state.names.paths)
+        changes = update_state(state, names, build_ir(infer_schema(doc), rules, name_map=names))
+    assert changes.renamed == [] and changes.changed == ["STResult"]
+    assert state.structures.keys() == {"STA", "STResult"}
+
+def _run(tmp_path: Path, doc: dict, *args: str, rules: str = RULES) -> str:
+    src, out = tmp_path / "doc.json", tmp_path / "out.txt"
+    src.write_text(json.dumps(doc), encoding="utf-8")
+    main([str(src), "--rules", rules, "--no-server", "--no-cache", "-o", str(out), *args])
+    return out.read_text(encoding="utf-8")
+
+
+def test_cli_reports_changes_and_keeps_names(tmp_path: Path, capsys):
+    state = str(tmp_path / "names.json")
+    _run(tmp_path, V1, "--name-map", state)
+    assert "no previous run, 7 structures" in capsys.readouterr().err
+
+    assert _run(tmp_path, V2, "--name-map", state, "--format", "markdown") == _run(tmp_path, V2, "--format", "markdown")
+    assert "7 structures, 5 unchanged, 2 changed, 0 added, 0 removed, 0 renamed" in capsys.readouterr().err
+
+    out = _run(tmp_path, V3, "--name-map", state)
+    err = capsys.readouterr().err
+    assert "STBItem est une structure" in out and "STItem " not in out
+    assert "changed: STResult\n  added: STExtra\n  removed: STItem, STA" in err
+
+
+def test_cli_starts_over_with_other_rules(tmp_path: Path, capsys):
+    other = tmp_path / "other_rules.yaml"
+    other.write_text(Path(RULES).read_text(encoding="utf-8").replace("type_prefix: ST", "type_prefix: T", 1), encoding="utf-8")
+    state = str(tmp_path / "names.json")
+    _run(tmp_path, V1, "--name-map", state)
+    assert _run(tmp_path, V1, "--name-map", state, rules=str(other)) == _run(tmp_path, V1, rules=str(other))
+    assert "no previous run" in capsys.readouterr().err
+    assert "TA" in load_name_map(state).structures
+
+
+def test_invalid_name_map_files_are_rejected(tmp_path: Path, capsys):
+    path = tmp_path / "names.json"
+    path.write_text(json.dumps({"format": "json2windev-names", "version": 1, "names": [], "paths": {}}), encoding="utf-8")
+    with pytest.raises(NameMapFileError):
+        load_name_map(path)
+    with pytest.raises(SystemExit):
+        _run(tmp_path, V1, "--name-map", str(path))
+    assert "Malformed name map file" in capsys.readouterr().err
@@ -0,0 +1,40 @@
+from pathlib import Path
+
+from json2windev.core.infer import infer_schema
+from json2windev.renderers.ir import build_ir
+from json2windev.renderers.markdown import MarkdownRenderer
+from json2windev.renderers.windev import WinDevRenderer
+from json2windev.rules.loader import load_rules
+
+RULES = load_rules(Path(__file__).resolve().parents[1] / "config" / "windev_rules.yaml")
+
+
+def test_ir_resolves_structures_dependencies_and_depth():
+    # "home" and "work" share one schema node: walked once, counted twice
+    doc = {
+        "home": {"geo": {"lat": 1.5}},
+        "work": {"geo": {"lat": 2.5}},
+        "tags": [[{"id": 1}]],
+    }
+    ir = build_ir(infer_schema(doc), RULES)
+
+    # Objects nested two arrays deep are named after the parent, not linked
+    assert [s.type_name for s in ir.structures] == ["STGeo", "STHome", "STResult2", "STResult"]
+    home = ir.structures[1]
+    assert [(f.json_key, f.name, f.wd_type) for f in home.fields] == [("geo", "stGeo", "un STGeo")]
+    assert ir.dependencies == {
+        ("STHome", "stGeo", "STGeo"): 2,
+        ("STResult", "stHome", "STHome"): 1,
+        ("STResult", "stWork", "STHome"): 1,
+    }
+    assert ir.max_depth == 4  # root -> tags -> inner array -> {} -> id
+
+
+def test_renderers_format_the_same_ir():
+    doc = {"a": {"b": [{"c": None}]}, "d": [1, 2]}
+    ir = build_ir(infer_schema(doc), RULES)
+
+    assert WinDevRenderer(RULES).render_ir(ir) == WinDevRenderer(RULES).render(infer_schema(doc))
+    markdown = MarkdownRenderer(RULES).render_ir(ir)
+    assert markdown == MarkdownRenderer(RULES).render(infer_schema(doc))
+    assert WinDevRenderer(RULES).render_ir(ir).rstrip("\n") in markdown
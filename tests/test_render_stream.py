@@ -0,0 +1,71 @@
+import io
+import subprocess
+import sys
+import tracemalloc
+from pathlib import Path
+
+from json2windev.core.infer import infer_schema
+from json2windev.renderers.ir import build_ir
+from json2windev.renderers.markdown import MarkdownRenderer
+from json2windev.renderers.windev import WinDevRenderer
+from json2windev.rules.loader import load_rules
+
+ROOT = Path(__file__).resolve().parents[1]
+RULES = load_rules(ROOT / "config" / "windev_rules.yaml")
+
+
+def _chain_doc(n: int = 200) -> dict:
+    # n small structures, each nested in the previous one
+    doc: dict = {"id": 1, "name": "leaf"}
+    for i in range(n):
+        doc = {"id": i, "name": f"n{i}", f"child{i}": doc}
+    return doc
+
+
+def test_render_to_writes_the_same_text_as_render():
+    doc = {"a": {"b": [{"c": None}]}, "d": [1, 2], "e": {"b": [{"c": None}]}}
+    for renderer_cls in (WinDevRenderer, MarkdownRenderer):
+        fp = io.StringIO()
+        renderer_cls(RULES).render_to(infer_schema(doc), fp)
+        assert fp.getvalue() == renderer_cls(RULES).render(infer_schema(doc))
+
+
+def test_chunks_hold_at_most_one_structure():
+    ir = build_ir(infer_schema(_chain_doc()), RULES)
+    for renderer_cls in (WinDevRenderer, MarkdownRenderer):
+        chunks = list(renderer_cls(RULES).iter_chunks(ir))
+        largest = max(len(chunk) for chunk in chunks)
+        # A structure of 5 fields, or a fixed section (rules snapshot, mermaid graph)
+        assert largest < len("".join(chunks)) // 10
+
+
+
+def _peak(fn) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_windev_output_resolves_one_structure_at_a_time():
+    ir = build_ir(infer_schema(_chain_doc(2000)), RULES)
+    streamed = _peak(lambda: all(WinDevRenderer(RULES).iter_chunks(ir)))
+    assert "structures" not in vars(ir)
+    # Against resolving them all, as Markdown does
+    assert streamed * 4 < _peak(lambda: ir.structures)
+
+
+def test_cli_streams_to_file_and_stdout(tmp_path):
+    doc = tmp_path / "doc.json"
+    doc.write_text('{"id": 1, "owner": {"name": "a"}}', encoding="utf-8")
+    out = tmp_path / "out.md"
+    cmd = [sys.executable, "-m", "json2windev", str(doc), "--format", "markdown", "--no-cache", "--no-server"]
+    env = {"PYTHONPATH": str(ROOT / "src"), "PATH": ""}
+    subprocess.run([*cmd, "-o", str(out)], check=True, cwd=ROOT, env=env)
+    stdout = subprocess.run(cmd, check=True, cwd=ROOT, env=env, capture_output=True, text=True).stdout
+
+    expected = MarkdownRenderer(RULES).render(infer_schema({"id": 1, "owner": {"name": "a"}}))
+    assert out.read_text(encoding="utf-8") == expected
+    assert stdout == expected
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from json2windev.rules.loader import load_rules, load_rules_cached
+from json2windev.utils import cache
+
+REPO = Path(__file__).resolve().parents[1]
+RULES = REPO / "config" / "windev_rules.yaml"
+
+
+def test_rules_cache_hits_until_content_changes(tmp_path: Path):
+    rules_path = tmp_path / "rules.yaml"
+    rules_path.write_bytes(RULES.read_bytes())
+    cache_dir = tmp_path / "cache"
+
+    first, hit = load_rules_cached(rules_path, cache_dir)
+    assert not hit
+    assert first.raw == load_rules(rules_path).raw
+
+    second, hit = load_rules_cached(rules_path, cache_dir)
+    assert hit
+    assert second.raw == first.raw
+    assert second.compiled == first.compiled
+
+    # Touched but unchanged: still served from the cache
+    st = rules_path.stat()
+    os.utime(rules_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000))
+    _, hit = load_rules_cached(rules_path, cache_dir)
+    assert hit
+
+    rules_path.write_text(RULES.read_text(encoding="utf-8").replace("type_prefix: ST", "type_prefix: Z"), encoding="utf-8")
+    edited, hit = load_rules_cached(rules_path, cache_dir)
+    assert not hit
+    assert edited.compiled.type_prefix == "Z"
+
+
+
+def test_rules_cache_misses_after_a_code_change(tmp_path: Path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    load_rules_cached(RULES, cache_dir)
+    assert load_rules_cached(RULES, cache_dir)[1]
+
+    # As after editing or reinstalling the package without a version bump
+    monkeypatch.setattr(cache, "_code_version", cache.code_version() + "-edited")
+    assert not load_rules_cached(RULES, cache_dir)[1]
+
+
+
+class _Planted:
+    # Unpickling it creates a directory
+    def __init__(self, path: Path) -> None:
+        self.path = str(path)
+
+    def __reduce__(self):
+        return (os.makedirs, (self.path,))
+
+
+def test_rules_cache_entries_are_data_only(tmp_path: Path):
+    import json
+    import pickle
+
+    cache_dir = tmp_path / "cache"
+    load_rules_cached(RULES, cache_dir)
+    (entry,) = (cache_dir / "rules").iterdir()
+
+    entry.write_bytes(pickle.dumps(_Planted(tmp_path / "planted")))
+    rules, hit = load_rules_cached(RULES, cache_dir)
+    assert not hit
+    assert not (tmp_path / "planted").exists()
+    assert rules.raw == load_rules(RULES).raw
+
+    # Valid JSON but not valid rules: rebuilt from the file
+    record = json.loads(entry.read_text(encoding="utf-8"))
+    del record["value"]["naming"]
+    entry.write_text(json.dumps(record), encoding="utf-8")
+    rules, hit = load_rules_cached(RULES, cache_dir)
+    assert not hit
+    assert rules.compiled == load_rules(RULES).compiled
+
+
+def test_cli_timings(tmp_path: Path):
+    doc = tmp_path / "doc.json"
+    doc.write_text('{"a": 1}', encoding="utf-8")
+    proc = subprocess.run(
+        [sys.executable, "-m", "json2windev", str(doc), "--timings"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "JSON2WINDEV_CACHE_DIR": str(tmp_path / "cache")},
+    )
+    assert proc.returncode == 0, proc.stderr
+    assert "Timings: rules" in proc.stderr
+    assert "infer" in proc.stderr and "render" in proc.stderr and "total" in proc.stderr
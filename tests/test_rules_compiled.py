@@ -0,0 +1,49 @@
+import pickle
+from pathlib import Path
+
+from json2windev.core.schema import SchemaNode
+from json2windev.rules.loader import load_rules
+
+
+def _rules():
+    repo = Path(__file__).resolve().parents[1]
+    return load_rules(repo / "config" / "windev_rules.yaml")
+
+
+def test_compiled_rules_lookups():
+    c = _rules().compiled
+
+    assert c.field_name("user-id", "number_int") == "nUserId"
+    assert c.field_name("fin", "string") == "sFin"
+    assert c.prefix_by_kind["null"] == c.prefix_by_kind["variant"]
+    assert "FIN" in c.reserved
+    assert c.wd_type(SchemaNode("array", item=SchemaNode("array", item=SchemaNode("boolean")))) == \
+        "un tableau de tableau de booléen"
+
+    clone = pickle.loads(pickle.dumps(c))
+    assert clone == c
+    assert clone.field_name("user-id", "number_int") == "nUserId"
+
+
+def test_overrides_derive_new_rules_without_mutating():
+    rules = _rules()
+    derived = rules.with_overrides({"naming": {"use_variable_prefixes": False, "serialize_attribute": False}})
+
+    assert rules.naming["use_variable_prefixes"] is True
+    assert derived.naming["use_variable_prefixes"] is False
+    assert derived.naming["reserved_words"] == rules.naming["reserved_words"]
+
+    assert rules.compiled.field_name("fin", "string") == "sFin"
+    assert derived.compiled.field_name("fin", "string") == "_fin"
+    assert derived.compiled.serialize_attribute_for("fin") == ""
+
+
+def test_rendering_leaves_compiled_rules_unchanged():
+    from json2windev.core.infer import infer_schema
+    from json2windev.renderers.ir import build_ir
+
+    rules = _rules()
+    before = pickle.dumps(rules.compiled)
+    ir = build_ir(infer_schema({"fin": "x", "items": [{"user-id": 1}]}), rules)
+    assert ir.dependencies
+    assert pickle.dumps(rules.compiled) == before
@@ -0,0 +1,42 @@
+from json2windev.core.infer import SchemaAccumulator, infer_schema
+from json2windev.core.merge import merge
+from json2windev.core.schema import schema_equal
+
+
+def _pairwise_fold(values):
+    schema = infer_schema(values[0])
+    for v in values[1:]:
+        schema = merge(schema, infer_schema(v))
+    return schema
+
+
+VALUES = [
+    {"id": 1, "tags": [], "p": None},
+    {"id": 2.5, "tags": ["a", None], "p": {"x": [1, [2]]}},
+    {"id": 3, "p": {"y": True, "x": [1.5]}, "new": [{"a": 1}, {"b": None}]},
+    {"tags": "not a list", "new": [{"a": "s"}]},
+    {"id": None, "p": {"x": None}},
+]
+
+
+def test_accumulator_matches_pairwise_fold():
+    acc = SchemaAccumulator()
+    changed = [acc.add(v) for v in VALUES]
+
+    expected = _pairwise_fold(VALUES)
+    assert schema_equal(acc.result(), expected)
+    assert list(acc.result().fields) == ["id", "tags", "p", "new"]
+    assert changed == [True, True, True, True, False]
+
+
+def test_accumulator_merges_schemas_and_keeps_going_after_result():
+    acc = SchemaAccumulator()
+    acc.add(VALUES[0])
+    first = acc.result()
+    assert acc.add_schema(infer_schema(VALUES[1])) is True
+    for v in VALUES[2:]:
+        acc.add(v)
+
+    assert schema_equal(acc.result(), _pairwise_fold(VALUES))
+    # Earlier results are not touched by later adds
+    assert schema_equal(first, infer_schema(VALUES[0]))
@@ -0,0 +1,29 @@
+import pickle
+
+from json2windev.core.infer import infer_schema
+from json2windev.core.schema import NO_FIELDS, SchemaNode, leaf, schema_footprint
+
+
+def test_leaves_are_shared_and_carry_no_dict():
+    schema = infer_schema({"a": "x", "b": ["y"], "c": {"d": "z"}})
+
+    assert schema.fields["a"] is leaf("string")
+    assert schema.fields["b"].item is leaf("string")
+    assert schema.fields["a"].fields is NO_FIELDS
+    assert schema.fields["b"].fields is NO_FIELDS
+    assert not hasattr(schema, "__dict__")
+    assert SchemaNode("object").fields == {}
+
+    assert pickle.loads(pickle.dumps(schema)) == schema
+
+
+def test_footprint_counts_shared_nodes_once():
+    schema = infer_schema({"a": {"x": 1}, "b": {"x": 2}, "c": [1, 2]})
+    fp = schema_footprint(schema)
+
+    assert fp.nodes == 7          # root, a, a.x, b, b.x, c, c[]
+    assert fp.unique_nodes == 4   # a and b share one node, ints share one leaf
+    assert fp.objects == 2
+    assert fp.fields == 4
+    assert fp.bytes > 0
+    assert "7 nodes (4 distinct" in fp.summary()
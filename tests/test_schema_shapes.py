@@ -0,0 +1,37 @@
+from json2windev.core.infer import infer_schema
+from json2windev.core.merge import merge
+from json2windev.core.schema import SchemaNode, schema_equal
+from json2windev.core.shapes import ShapeTable
+
+
+def test_identical_shapes_are_one_node():
+    schema = infer_schema({
+        "a": {"x": 1, "y": "s"},
+        "b": {"x": 2, "y": "t"},
+        "c": [{"x": 3, "y": "u"}],
+        "d": {"y": "s", "x": 1},
+    })
+
+    assert schema.fields["a"] is schema.fields["b"] is schema.fields["c"].item
+    # Field order is part of the shape (it drives rendering order)
+    assert schema.fields["d"] is not schema.fields["a"]
+    assert schema.fields["d"] == schema.fields["a"]
+
+
+def test_shape_table_merge_matches_merge_and_is_memoized():
+    shapes = ShapeTable()
+    a = infer_schema({"id": 1, "tags": ["x"], "p": None}, shapes=shapes)
+    b = infer_schema({"id": 1.5, "p": {"q": True}, "extra": []}, shapes=shapes)
+
+    merged = shapes.merge(a, b)
+    assert schema_equal(merged, merge(infer_schema({"id": 1, "tags": ["x"], "p": None}),
+                                      infer_schema({"id": 1.5, "p": {"q": True}, "extra": []})))
+    assert list(merged.fields) == ["id", "tags", "p", "extra"]
+
+    assert shapes.merge(a, b) is merged
+    assert shapes.merge(merged, merged) is merged
+    assert shapes.merge_hits == 1
+
+    # Hand-built trees are interned onto the same canonical nodes
+    item = SchemaNode("array", item=SchemaNode("string"))
+    assert shapes.intern(item) is a.fields["tags"]
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from json2windev.app.cli import main
+from json2windev.core.infer import SchemaAccumulator, infer_schema
+from json2windev.core.schema import SchemaNode, leaf, schema_equal
+from json2windev.core.snapshot import SchemaFileError, load_schema, merge_samples, save_schema, schema_from_dict, schema_to_dict
+from json2windev.core.type_naming import assign_type_names
+from json2windev.rules.loader import load_rules
+
+ROOT = Path(__file__).resolve().parents[1]
+RULES = str(ROOT / "config" / "windev_rules.yaml")
+
+OLD = {"id": 1, "billing": {"zip": "75001"}, "shipping": {"zip": "69001"}, "lines": [{"sku": "a", "qty": 1}]}
+NEW = {"id": 2.5, "billing": {"zip": "44000", "city": "Nantes"}, "lines": [{"sku": "b", "price": 1.5}], "note": None}
+
+
+def test_round_trip_keeps_names_and_writes_shared_shapes_once(tmp_path: Path):
+    schema = infer_schema(OLD)
+    assign_type_names(schema, load_rules(RULES))
+    path = tmp_path / "schema.json"
+    save_schema(schema, path, "key")
+
+    doc = json.loads(path.read_text(encoding="utf-8"))
+    # billing and shipping share one shape; lines is an array of objects
+    assert [entry[0] for entry in doc["nodes"]] == ["object", "object", "array", "object"]
+    snapshot = load_schema(path)
+    assert snapshot.rules_key == "key"
+    assert schema_equal(snapshot.root, schema)
+    assert snapshot.root.fields["billing"].type_name == "STBilling"
+
+
+def test_deep_schema_round_trips_without_recursion():
+    root = node = SchemaNode("object")
+    for _ in range(5000):
+        child = SchemaNode("array", item=SchemaNode("object"))
+        node.fields["next"] = child
+        node = child.item
+    node.fields["end"] = leaf("string")
+    assert schema_equal(schema_from_dict(schema_to_dict(root)).root, root)
+
+
+@pytest.mark.parametrize(
+    "doc",
+    [
+        {"format": "other", "version": 1},
+        {"format": "json2windev-schema", "version": 99, "root": "string", "nodes": []},
+        {"format": "json2windev-schema", "version": 1, "root": 0, "nodes": []},
+        {"format": "json2windev-schema", "version": 1, "root": 0, "nodes": [["array", 0]]},
+        {"format": "json2windev-schema", "version": 1, "root": 0, "nodes": [["set", None]]},
+        {"format": "json2windev-schema", "version": 1, "nodes": [["object", {}, None]]},
+    ],
+)
+def test_invalid_files_are_rejected(doc):
+    with pytest.raises(SchemaFileError):
+        schema_from_dict(doc)
+
+
+def test_merging_new_samples_matches_inferring_them_all():
+    stored = infer_schema(OLD)
+    assign_type_names(stored, load_rules(RULES))
+    merged = merge_samples(schema_from_dict(schema_to_dict(stored)).root, infer_schema(NEW))
+
+    acc = SchemaAccumulator()
+    acc.add(OLD)
+    acc.add(NEW)
+    assert schema_equal(merged, acc.result())
+    assert list(merged.fields) == ["id", "billing", "shipping", "lines", "note"]
+    # Names are assigned again over the merged schema
+    assert merged.type_name is None and merged.fields["shipping"].type_name is None
+
+
+def _run(tmp_path: Path, name: str, *args: str) -> str:
+    out = tmp_path / name
+    main([*args, "--no-server", "--no-cache", "-o", str(out)])
+    return out.read_text(encoding="utf-8")
+
+
+def test_cli_renders_from_snapshot_and_merges_new_samples(tmp_path: Path):
+    old, new, both = tmp_path / "old.json", tmp_path / "new.json", tmp_path / "both.jsonl"
+    old.write_text(json.dumps(OLD), encoding="utf-8")
+    new.write_text(json.dumps(NEW), encoding="utf-8")
+    both.write_text(json.dumps(OLD) + "\n" + json.dumps(NEW) + "\n", encoding="utf-8")
+    v1, v2 = str(tmp_path / "v1.json"), str(tmp_path / "v2.json")
+
+    direct = _run(tmp_path, "direct.txt", str(old), "--rules", RULES, "--save-schema", v1)
+    assert _run(tmp_path, "stored.txt", "--load-schema", v1, "--rules", RULES) == direct
+
+    merged = _run(tmp_path, "merged.txt", str(new), "--load-schema", v1, "--save-schema", v2, "--rules", RULES)
+    assert merged == _run(tmp_path, "full.txt", str(both), "--jsonl", "--rules", RULES)
+    assert _run(tmp_path, "stored2.txt", "--load-schema", v2, "--rules", RULES, "--format", "markdown") == _run(
+        tmp_path, "full.md", str(both), "--jsonl", "--rules", RULES, "--format", "markdown"
+    )
+
+
+def test_cli_names_again_with_other_rules(tmp_path: Path):
+    doc = tmp_path / "doc.json"
+    doc.write_text(json.dumps(OLD), encoding="utf-8")
+    other = tmp_path / "other_rules.yaml"
+    other.write_text(Path(RULES).read_text(encoding="utf-8").replace("type_prefix: ST", "type_prefix: T", 1), encoding="utf-8")
+    snapshot = str(tmp_path / "schema.json")
+
+    _run(tmp_path, "a.txt", str(doc), "--rules", RULES, "--save-schema", snapshot)
+    rendered = _run(tmp_path, "b.txt", "--load-schema", snapshot, "--rules", str(other))
+    assert rendered == _run(tmp_path, "c.txt", str(doc), "--rules", str(other))
+    assert "STBilling" not in rendered
+
+
+def test_cli_rejects_snapshots_in_batch_mode(tmp_path: Path, capsys):
+    (tmp_path / "in").mkdir()
+    (tmp_path / "in" / "a.json").write_text("{}", encoding="utf-8")
+    with pytest.raises(SystemExit):
+        main([str(tmp_path / "in"), "--output-dir", str(tmp_path / "out"), "--save-schema", str(tmp_path / "s.json"), "--no-cache"])
+    assert "single input" in capsys.readouterr().err
+
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from json2windev.app.cli import main
+from json2windev.app.client import STATE_FILE, ServerError, forward
+from json2windev.app.server import RenderService, make_server, serve_main
+from json2windev.core.infer import infer_schema
+from json2windev.core.input import parse_json
+from json2windev.renderers.windev import WinDevRenderer
+from json2windev.rules.loader import load_rules
+
+REPO = Path(__file__).resolve().parents[1]
+RULES = REPO / "config" / "windev_rules.yaml"
+DOC = b'{"id": 1, "owner": {"name": "x"}, "tags": ["a"]}'
+
+
+def _state(host: str, port: int, pid: int = os.getpid()) -> str:
+    return json.dumps({"host": host, "port": port, "pid": pid, "version": "0.1.0"})
+
+
+@pytest.fixture
+def daemon(tmp_path: Path):
+    service = RenderService([str(RULES), str(tmp_path / "rules.yaml")])
+    server = make_server(service)
+    host, port = server.server_address[:2]
+    (tmp_path / STATE_FILE).write_text(_state(host, port), encoding="utf-8")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield service
+    server.shutdown()
+    server.server_close()
+
+
+def test_forward_renders_like_local(tmp_path: Path, daemon: RenderService):
+    out = forward(tmp_path, DOC, {"format": "windev", "rules": str(RULES)})
+    assert out == WinDevRenderer(load_rules(RULES)).render(infer_schema(parse_json(DOC.decode())))
+
+    assert forward(tmp_path, DOC, {"format": "windev", "rules": str(RULES)}) == out
+    assert daemon.output_hits == 1
+
+    with pytest.raises(ServerError, match="Expecting"):
+        forward(tmp_path, b'{"a": }', {"format": "windev", "rules": str(RULES)})
+
+
+def test_rules_hot_reload(tmp_path: Path, daemon: RenderService):
+    rules_path = tmp_path / "rules.yaml"
+    rules_path.write_text(RULES.read_text(encoding="utf-8"), encoding="utf-8")
+    params = {"format": "windev", "rules": str(rules_path)}
+    assert "STOwner est une structure" in forward(tmp_path, DOC, params)
+
+    rules_path.write_text(RULES.read_text(encoding="utf-8").replace("type_prefix: ST", "type_prefix: Z"), encoding="utf-8")
+    assert "ZOwner est une structure" in forward(tmp_path, DOC, params)
+    assert daemon.rules_loads == 2
+
+
+def test_no_daemon(tmp_path: Path):
+    assert forward(tmp_path, DOC, {"format": "windev"}) is None
+
+
+def test_cli_forwards_to_daemon(tmp_path: Path, daemon: RenderService, monkeypatch, capsys):
+    monkeypatch.setenv("JSON2WINDEV_CACHE_DIR", str(tmp_path))
+    doc = tmp_path / "doc.json"
+    doc.write_bytes(DOC)
+
+    main([str(doc), "--rules", str(RULES), "--timings"])
+    forwarded = capsys.readouterr()
+    assert "Timings: server" in forwarded.err
+    assert daemon.rules_loads == 1
+
+    main([str(doc), "--rules", str(RULES), "--no-server"])
+    assert capsys.readouterr().out == forwarded.out
+
+
+def test_daemon_of_a_stale_state_file_is_not_used(tmp_path: Path, daemon: RenderService):
+    state = json.loads((tmp_path / STATE_FILE).read_text(encoding="utf-8"))
+    (tmp_path / STATE_FILE).write_text(_state(state["host"], state["port"], pid=-1), encoding="utf-8")
+    assert forward(tmp_path, DOC, {"format": "windev", "rules": str(RULES)}) is None
+    assert daemon.rules_loads == 0
+
+
+def test_other_service_on_the_port_falls_back_to_local(tmp_path: Path, monkeypatch, capsys):
+    posted = []
+
+    class Foreign(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            self.send_error(500)
+
+        def do_POST(self) -> None:
+            posted.append(self.path)
+            self.send_error(500)
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Foreign)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        (tmp_path / STATE_FILE).write_text(_state(*server.server_address[:2]), encoding="utf-8")
+        assert forward(tmp_path, DOC, {"format": "windev", "rules": str(RULES)}) is None
+
+        monkeypatch.setenv("JSON2WINDEV_CACHE_DIR", str(tmp_path))
+        doc = tmp_path / "doc.json"
+        doc.write_bytes(DOC)
+        main([str(doc), "--rules", str(RULES), "--no-cache"])
+        assert "STOwner est une structure" in capsys.readouterr().out
+        assert posted == []
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_silent_listener_is_not_waited_for(tmp_path: Path):
+    with socket.socket() as listener:
+        listener.bind(("127.0.0.1", 0))
+        listener.listen()
+        (tmp_path / STATE_FILE).write_text(_state(*listener.getsockname()), encoding="utf-8")
+        start = time.perf_counter()
+        assert forward(tmp_path, DOC, {"format": "windev"}) is None
+        assert time.perf_counter() - start < 5
+
+
+def test_only_the_rules_files_it_was_started_with_are_served(tmp_path: Path, daemon: RenderService, monkeypatch, capsys):
+    other = tmp_path / "other.yaml"
+    other.write_text(RULES.read_text(encoding="utf-8"), encoding="utf-8")
+    for path in (other, tmp_path / "missing.yaml", Path("/etc/passwd")):
+        # 403 without reading the file: the client renders locally
+        assert forward(tmp_path, DOC, {"format": "windev", "rules": str(path)}) is None
+    assert daemon.rules_loads == 0
+
+    monkeypatch.setenv("JSON2WINDEV_CACHE_DIR", str(tmp_path))
+    doc = tmp_path / "doc.json"
+    doc.write_bytes(DOC)
+    main([str(doc), "--rules", str(other), "--no-cache"])
+    assert "STOwner est une structure" in capsys.readouterr().out
+
+
+def test_refuses_non_loopback_hosts():
+    with pytest.raises(ValueError, match="loopback"):
+        make_server(RenderService(), host="0.0.0.0")
+    with pytest.raises(SystemExit):
+        serve_main(["--host", "0.0.0.0"])
@@ -0,0 +1,52 @@
+import io
+import json
+import random
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from json2windev.core.input import parse_json, JsonParseError
+from json2windev.core.infer import infer_schema
+from json2windev.core.stream import infer_schema_stream
+
+
+def test_stream_schema_matches_in_memory_inference():
+    repo = Path(__file__).resolve().parents[1]
+    for name in ("arrays_unions.json", "collisions.json", "dirty_keys.json", "glossary.json"):
+        json_text = (repo / "tests" / "fixtures" / name).read_text(encoding="utf-8")
+        expected = infer_schema(parse_json(json_text))
+        # Tiny chunks force tokens to straddle buffer boundaries
+        assert infer_schema_stream(io.StringIO(json_text), chunk_size=3) == expected
+
+
+def test_stream_errors_match_parse_json():
+    bad = '{\n  "a": [1,\n  2 3]\n}'
+    with pytest.raises(JsonParseError) as expected:
+        parse_json(bad)
+    with pytest.raises(JsonParseError) as ex:
+        infer_schema_stream(io.StringIO(bad), chunk_size=4)
+    err = ex.value
+    assert (err.message, err.lineno, err.colno) == (expected.value.message, expected.value.lineno, expected.value.colno)
+    assert "^" in err.snippet
+
+
+def _stream_peak(path, n_records):
+    # Records with varying key subsets: many distinct element shapes
+    rng = random.Random(0)
+    keys = [f"k{i}" for i in range(24)]
+    records = [{k: i for k in rng.sample(keys, 6)} for i in range(n_records)]
+    path.write_text(json.dumps(records), encoding="utf-8")
+    with path.open(encoding="utf-8") as fp:
+        tracemalloc.start()
+        try:
+            infer_schema_stream(fp, chunk_size=16 * 1024)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+
+def test_stream_memory_does_not_grow_with_distinct_shapes(tmp_path):
+    small = _stream_peak(tmp_path / "small.json", 1000)
+    large = _stream_peak(tmp_path / "large.json", 5000)
+    assert large < small * 1.5
@@ -0,0 +1,23 @@
+from pathlib import Path
+
+from json2windev.core.infer import infer_schema
+from json2windev.core.type_naming import assign_type_names
+from json2windev.rules.loader import load_rules
+
+
+def test_many_structures_sharing_a_base_name_get_sequential_suffixes():
+    repo = Path(__file__).resolve().parents[1]
+    rules = load_rules(repo / "config" / "windev_rules.yaml")
+
+    # "item", "item_", "item__", ... all suggest STItem, then STPItem
+    n = 2000
+    doc = {"p": {"item" + "_" * i: {f"k{i}": 1} for i in range(n)}, "same": {"k0": 2}}
+    schema = infer_schema(doc)
+    assign_type_names(schema, rules)
+
+    names = [child.type_name for child in schema.fields["p"].fields.values()]
+    assert names[:3] == ["STItem", "STPItem", "STPItem2"]
+    assert names[-1] == f"STPItem{n - 1}"
+    assert len(set(names)) == n
+    # Same structure, same name
+    assert schema.fields["same"].type_name == "STItem"